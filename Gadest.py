@@ -1,11 +1,44 @@
-from math import sqrt
-from numpy import array,zeros,copy,delete
-from numpy.linalg import solve
-from functions import cellStyle
-from openpyxl import Workbook
+from collections import Counter
+from contextlib import nullcontext
+from numpy import array,asarray,unique,searchsorted,zeros,ones,full,arange,argsort,ix_,hypot,where,stack,vstack,hstack,concatenate,flatnonzero,sqrt,pi,einsum,ndarray
+
+class ModelError(ValueError):
+    """Error de definición del modelo. Reúne todos los errores encontrados en errors."""
+    def __init__(self,errors):
+        self.errors = list(errors)
+        super().__init__(f"{len(self.errors)} error(es) en el modelo:\n" + "\n".join(self.errors[:50]))
+
+_OFF = nullcontext()    # Contexto de las fases cuando no hay perfilador
+
+ELEMENT_TYPES = {}      # Tipos de elemento registrados {nombre: clase del elemento}, ver element_type
+
+def element_type(cls):
+    """Registra una clase de elemento con el nombre cls.kind.
+
+    Cada tipo guarda sus elementos en su propio store (cls.Store, struct-of-arrays) que calcula en un solo paso
+    vectorizado las matrices de rigidez y masa (n,d,d) y los resultados de todos sus elementos, con d el número de
+    grados de libertad del elemento. TrussStructure ensambla los bloques de todos los tipos con la misma función
+    assemble y resuelve con la misma factorización.
+    """
+    ELEMENT_TYPES[cls.kind] = cls
+    return cls
+
+def _nnz(K):
+    from scipy.sparse import issparse
+    return int(K.nnz) if issparse(K) else int((K != 0).sum())
+
+def lookup(keys,names):
+    """Posición de cada clave en names, -1 si no existe (búsqueda vectorizada con searchsorted)."""
+    keys = asarray(keys)
+    names = asarray(names)
+    if len(names) == 0: return full(len(keys),-1)
+    order = argsort(names,kind="stable")
+    pos = searchsorted(names,keys,sorter=order).clip(0,len(names)-1)
+    idx = order[pos]
+    return where(names[idx] == keys,idx,-1)
 
 class Section():
-    def __init__(self,name,elasticity_mod=1.00,area=1.00,inertia=1.00):
+    def __init__(self,name,elasticity_mod=1.00,area=1.00,inertia=1.00,density=0.0):
         """Crea una sección con sus propiedades básicas.
         
         Parameters
@@ -18,11 +51,14 @@ class Section():
             Área de la sección transversal.
         inertia : float
             Momento de inercia de la sección.
+        density : float
+            Densidad de masa del material (masa por unidad de volumen), usada en el análisis modal.
         """
         self.name = name
         self.E = elasticity_mod
         self.A = area
         self.I = inertia
+        self.rho = density
 
 class Joint():
     """Crea un nudo.
@@ -46,10 +82,397 @@ class Joint():
         self.is_used = True
         self.GdL = lista_GdL
 
+class ElementStore():
+    """Tabla de elementos barra guardada como arreglos contiguos (struct-of-arrays).
+
+    Cada fila es un elemento. Las propiedades geométricas y las matrices de rigidez se calculan para todas las filas
+    en un solo paso vectorizado, recién cuando se necesitan.
+
+    Los tipos de elemento con otros grados de libertad (ver FrameStore) heredan de esta clase y cambian DOFS,
+    COLUMNS, AXIAL, LOCAL y los métodos _section, _stiffness, _local y mass.
+    """
+    kind = "truss"
+    DOFS = ("x","y")        # Grados de libertad de cada nudo
+    COLUMNS = ("xi","yi","xf","yf","E","A","rho")   # Columnas numéricas por fila
+    AXIAL = (0,1,2,3)       # Posición de ux_i, uy_i, ux_f, uy_f en el vector del elemento
+    LOCAL = 2               # Componentes de u_l y f_l
+
+    def __init__(self,capacity=16):
+        self.n = 0
+        self.names = []     # Nombre de cada elemento
+        self.sections = []  # Nombre de la sección de cada elemento
+        self.Ji = []        # Nombre del nudo inicial
+        self.Jf = []        # Nombre del nudo final
+        self.xi = zeros(capacity)
+        self.yi = zeros(capacity)
+        self.xf = zeros(capacity)
+        self.yf = zeros(capacity)
+        self.E = zeros(capacity)
+        self.A = zeros(capacity)
+        self.rho = zeros(capacity)  # Densidad de masa
+        for key in self.COLUMNS[7:]: setattr(self,key,zeros(capacity))     # Columnas propias del tipo
+        self.GdL = zeros((capacity,self.width),dtype=int)
+        self.active = zeros(capacity,dtype=bool)    # False para los elementos eliminados
+        self._valid = -1    # Filas cuyas propiedades derivadas ya fueron calculadas (-1: ninguna, ni los arreglos vacíos)
+        self.U = None       # Desplazamientos globales de la última llamada a deform
+        self._deformed = False  # Si u_g, f_g, u_l y f_l corresponden a U
+
+    @property
+    def width(self):
+        """Grados de libertad de cada elemento."""
+        return 2*len(self.DOFS)
+
+    def _grow(self):
+        cap = 2*len(self.E)
+        for key in self.COLUMNS:
+            new = zeros(cap)
+            new[:self.n] = getattr(self,key)[:self.n]
+            setattr(self,key,new)
+        GdL = zeros((cap,self.width),dtype=int)
+        GdL[:self.n] = self.GdL[:self.n]
+        self.GdL = GdL
+        active = zeros(cap,dtype=bool)
+        active[:self.n] = self.active[:self.n]
+        self.active = active
+
+    def append(self,Ji,Jf,section,name,row=None):
+        """Agrega un elemento a la tabla y devuelve su número de fila. Si se indica row, se reemplaza esa fila."""
+        if row is None:
+            if self.n == len(self.E): self._grow()
+            i = self.n
+            self.names.append(name)
+            self.sections.append(section.name)
+            self.Ji.append(Ji.name)
+            self.Jf.append(Jf.name)
+            self.n += 1
+        else:
+            i = row
+            self.names[i],self.sections[i],self.Ji[i],self.Jf[i] = name,section.name,Ji.name,Jf.name
+        self.xi[i],self.yi[i],self.xf[i],self.yf[i] = Ji.x,Ji.y,Jf.x,Jf.y
+        self._section(i,section)
+        self.active[i] = True
+        self._valid = min(self._valid,i)
+        return i
+
+    def extend(self,names,sections,Ji,Jf,xi,yi,xf,yf,E,A,GdL,rho=0.0):
+        """Agrega varios elementos de una vez a partir de columnas. Devuelve el rango de filas agregadas."""
+        m = len(names)
+        while self.n + m > len(self.E): self._grow()
+        rows = slice(self.n,self.n+m)
+        self.names.extend(names)
+        self.sections.extend(sections)
+        self.Ji.extend(Ji)
+        self.Jf.extend(Jf)
+        self.xi[rows],self.yi[rows],self.xf[rows],self.yf[rows] = xi,yi,xf,yf
+        self.E[rows],self.A[rows],self.rho[rows] = E,A,rho
+        self.GdL[rows] = GdL
+        self.active[rows] = True
+        self.n += m
+        return range(rows.start,rows.stop)
+
+    def copy(self):
+        """Copia de la tabla con sus propios arreglos, incluido el estado de deform."""
+        new = self.__class__.__new__(self.__class__)
+        new.__dict__ = {key: value.copy() if isinstance(value,(ndarray,list)) else value
+                        for key,value in self.__dict__.items()}
+        return new
+
+    def _section(self,row,section):
+        self.E[row],self.A[row],self.rho[row] = section.E,section.A,section.rho
+
+    def set_section(self,row,section):
+        """Cambia la sección de un elemento."""
+        self.sections[row] = section.name
+        self._section(row,section)
+        self._valid = min(self._valid,row)
+
+    def remove(self,row):
+        """Elimina un elemento, su fila queda en la tabla con rigidez nula."""
+        self.active[row] = False
+        self._valid = min(self._valid,row)
+
+    def by_name(self,values):
+        """Diccionario {elemento: valor} de los elementos activos para un arreglo con un valor por fila."""
+        return {self.names[i]: values[i] for i in flatnonzero(self.active[:self.n])}
+
+    def update(self):
+        """Calcula longitud, cosenos directores y rigideces de todos los elementos en un solo paso."""
+        if self._valid == self.n: return
+        n = self.n
+        self.dx = self.xf[:n] - self.xi[:n]     # Calcula el delta de x
+        self.dy = self.yf[:n] - self.yi[:n]     # Calcula el delta de y
+        self.L = hypot(self.dx,self.dy)         # Calcula la longitud de los elementos
+        start = max(self._valid,0)
+        for i in flatnonzero(self.L[start:] == 0) + start:
+            print(f"Error, elemento {self.names[i]} tiene longitud 0.")
+        nz = self.L != 0
+        L = where(nz,self.L,1.0)
+        self.cx = where(nz,self.dx/L,0.0)
+        self.cy = where(nz,self.dy/L,0.0)
+        self.k_axial = where(nz & self.active[:n],self.E[:n]*self.A[:n]/L,0.0)   # EA/L
+        self.k = self._stiffness(L)
+        self._valid = n
+
+    def _stiffness(self,L):
+        """Matrices de rigidez en ejes globales (n,4,4), con L sin ceros."""
+        c = stack((self.cx,self.cy,-self.cx,-self.cy),axis=1)  # Vector de transformación del elemento
+        return self.k_axial[:,None,None] * c[:,:,None] * c[:,None,:]
+
+    def deform(self,U,rows=None):
+        """Registra el vector U de la estructura como estado de los elementos.
+
+        Los desplazamientos y fuerzas de los elementos (u_g, f_g, u_l, f_l) se calculan recién cuando se leen,
+        para todas las filas en un solo paso.
+
+        Parameters
+        ----------
+        U : ndarray (nGdL,1)
+            Desplazamientos de la estructura.
+        rows : ndarray, optional
+            Filas que cambiaron. Si los resultados ya estaban calculados, solo se recalculan esas filas.
+        """
+        self.update()
+        partial = rows is not None and self._deformed and len(self._u_g) == self.n
+        self.U = U
+        if partial:
+            self._deform(rows)
+        else:
+            self._deformed = False
+
+    def _deform(self,rows=None):
+        if rows is None:
+            rows = slice(0,self.n)
+            self._u_g,self._f_g = zeros((self.n,self.width)),zeros((self.n,self.width))
+            self._u_l,self._f_l = zeros((self.n,self.LOCAL)),zeros((self.n,self.LOCAL))
+        u_g = self.U[self.GdL[rows],0]                          # (m,d)
+        f_g = (self.k[rows] @ u_g[:,:,None])[:,:,0]             # (m,d)
+        self._u_g[rows],self._f_g[rows] = u_g,f_g
+        self._u_l[rows],self._f_l[rows] = self._local(u_g,rows),self._local(f_g,rows)
+        self._deformed = True
+
+    def _local(self,v,rows):
+        """Componentes axiales (m,2) de vectores globales (m,4) de los elementos."""
+        cx,cy = self.cx[rows],self.cy[rows]
+        return stack((cx*v[:,0] + cy*v[:,1],cx*v[:,2] + cy*v[:,3]),axis=1)
+
+    def _state(self,key):
+        self.update()
+        if not self._deformed or len(self._u_g) != self.n: self._deform()
+        return getattr(self,key)
+
+    u_g = property(lambda self: self._state("_u_g"))    # Desplazamientos globales (n,4)
+    f_g = property(lambda self: self._state("_f_g"))    # Fuerzas globales (n,4)
+    u_l = property(lambda self: self._state("_u_l"))    # Desplazamientos locales (n,2), (n,6) en pórticos
+    f_l = property(lambda self: self._state("_f_l"))    # Fuerzas locales (n,2), (n,6) en pórticos
+
+    def elongation(self,U,rows=None):
+        """Alargamiento de los elementos para uno o varios vectores de desplazamientos U (nGdL,m)."""
+        self.update()
+        if rows is None: rows = slice(0,self.n)
+        u = U[self.GdL[rows]]    # (n,d,m), todos los desplazamientos de los elementos en una sola indexación
+        xi,yi,xf,yf = self.AXIAL
+        return self.cx[rows,None]*(u[:,xf]-u[:,xi]) + self.cy[rows,None]*(u[:,yf]-u[:,yi])
+
+    def axial(self,U,rows=None):
+        """Fuerza axial (tracción positiva) de los elementos para uno o varios vectores de desplazamientos.
+
+        Parameters
+        ----------
+        U : ndarray (nGdL,m)
+            Desplazamientos de la estructura, un caso de carga por columna.
+        rows : ndarray, optional
+            Filas a calcular. Por defecto todas.
+        """
+        if rows is None: rows = slice(0,self.n)
+        return self.k_axial[rows,None]*self.elongation(U,rows)
+
+    def recover(self,U,rows=None):
+        """Alargamiento, fuerza axial, esfuerzo (N/A) y deformación unitaria (alargamiento/L) de los elementos.
+
+        Returns
+        -------
+        elongation, N, stress, strain : ndarray (n,m)
+        """
+        if rows is None: rows = slice(0,self.n)
+        elong = self.elongation(U,rows)
+        N = self.k_axial[rows,None]*elong
+        A,L = self.A[:self.n][rows,None],self.L[rows,None]
+        stress = N/where(A != 0,A,1.0)
+        strain = where(L != 0,elong/where(L != 0,L,1.0),0.0)
+        return elong,N,stress,strain
+
+    def mass(self,kind="lumped"):
+        """Matrices de masa de todos los elementos en ejes globales (n,4,4).
+
+        La masa de la barra es ρ·A·L. La matriz concentrada pone la mitad en cada nudo; la consistente es
+        ρ·A·L/6·[[2I, I], [I, 2I]] con I la identidad de 2×2. Ambas son invariantes ante la rotación de la barra.
+        """
+        self.update()
+        n = self.n
+        m = where(self.active[:n],self.rho[:n]*self.A[:n]*self.L,0.0)
+        M = zeros((n,4,4))
+        i = arange(4)
+        if kind == "lumped":
+            M[:,i,i] = m[:,None]/2
+        elif kind == "consistent":
+            M[:,i,i] = m[:,None]/3
+            M[:,i,(i+2) % 4] = m[:,None]/6
+        else:
+            raise ValueError(f"Tipo de matriz de masa desconocido: {kind}")
+        return M
+
+class FrameStore(ElementStore):
+    """Tabla de elementos de pórtico plano (Euler-Bernoulli), 6 grados de libertad, (ux, uy, θz) en cada nudo.
+
+    Los vectores locales de desplazamientos y fuerzas u_l y f_l tienen las 6 componentes en ejes del elemento:
+    (N_i, V_i, M_i, N_f, V_f, M_f) en el caso de las fuerzas.
+    """
+    kind = "frame"
+    DOFS = ("x","y","rz")
+    COLUMNS = ElementStore.COLUMNS + ("I",)
+    AXIAL = (0,1,3,4)
+    LOCAL = 6
+
+    def _section(self,row,section):
+        super()._section(row,section)
+        self.I[row] = section.I
+
+    def _stiffness(self,L):
+        """Matrices de rigidez en ejes globales (n,6,6), T'·k_l·T con k_l la matriz local de la viga."""
+        n = self.n
+        EI = where((self.L != 0) & self.active[:n],self.E[:n]*self.I[:n],0.0)
+        a,b,c,d = self.k_axial,12*EI/L**3,6*EI/L**2,2*EI/L
+        k = zeros((n,6,6))
+        k[:,0,0] = k[:,3,3] = a
+        k[:,0,3] = k[:,3,0] = -a
+        k[:,1,1] = k[:,4,4] = b
+        k[:,1,4] = k[:,4,1] = -b
+        k[:,1,2] = k[:,2,1] = k[:,1,5] = k[:,5,1] = c
+        k[:,2,4] = k[:,4,2] = k[:,4,5] = k[:,5,4] = -c
+        k[:,2,2] = k[:,5,5] = 2*d
+        k[:,2,5] = k[:,5,2] = d
+        self.k_local = k
+        self.T = self._rotation(slice(0,n))
+        return einsum("nji,njk,nkl->nil",self.T,k,self.T)
+
+    def _rotation(self,rows):
+        """Matrices de transformación de ejes globales a locales (m,6,6)."""
+        cx,cy = self.cx[rows],self.cy[rows]
+        T = zeros((len(cx),6,6))
+        for i in (0,3):
+            T[:,i,i] = T[:,i+1,i+1] = cx
+            T[:,i,i+1],T[:,i+1,i] = cy,-cy
+            T[:,i+2,i+2] = 1.0
+        return T
+
+    def _local(self,v,rows):
+        """Componentes en ejes locales (m,6) de vectores globales (m,6) de los elementos."""
+        return (self.T[rows] @ v[:,:,None])[:,:,0]
+
+    def end_forces(self,U,rows=None):
+        """Fuerzas en los extremos en ejes locales (N_i, V_i, M_i, N_f, V_f, M_f) para uno o varios vectores U.
+
+        Returns
+        -------
+        ndarray (n,6,m)
+        """
+        self.update()
+        if rows is None: rows = slice(0,self.n)
+        return self.k_local[rows] @ (self.T[rows] @ U[self.GdL[rows]])
+
+    def mass(self,kind="lumped"):
+        """Matrices de masa de todos los elementos en ejes globales (n,6,6).
+
+        La matriz concentrada pone ρ·A·L/2 en las traslaciones de cada nudo, sin inercia rotacional. La consistente
+        es la de la viga de Euler-Bernoulli (ρ·A·L/420) rotada a ejes globales.
+        """
+        self.update()
+        n = self.n
+        L = self.L
+        m = where(self.active[:n],self.rho[:n]*self.A[:n]*L,0.0)
+        M = zeros((n,6,6))
+        if kind == "lumped":
+            for i in self.AXIAL: M[:,i,i] = m/2
+            return M
+        if kind != "consistent": raise ValueError(f"Tipo de matriz de masa desconocido: {kind}")
+        q = m/420
+        M[:,0,0] = M[:,3,3] = 140*q
+        M[:,0,3] = M[:,3,0] = 70*q
+        M[:,1,1] = M[:,4,4] = 156*q
+        M[:,1,4] = M[:,4,1] = 54*q
+        M[:,1,2] = M[:,2,1] = 22*L*q
+        M[:,4,5] = M[:,5,4] = -22*L*q
+        M[:,1,5] = M[:,5,1] = -13*L*q
+        M[:,2,4] = M[:,4,2] = 13*L*q
+        M[:,2,2] = M[:,5,5] = 4*L**2*q
+        M[:,2,5] = M[:,5,2] = -3*L**2*q
+        return einsum("nji,njk,nkl->nil",self.T,M,self.T)
+
+class ElementResults():
+    """Resultados axiales de los elementos activos para un caso de carga o combinación.
+
+    Los resultados son arreglos alineados con names; results["E1"] devuelve una vista del elemento que lee sus
+    valores de esos arreglos y results.as_dict("stress") un diccionario {elemento: valor}.
+
+    Attributes
+    ----------
+    names : list
+        Nombres de los elementos.
+    N, stress, strain, elongation : ndarray (m,)
+        Fuerza axial (tracción positiva), esfuerzo N/A, deformación unitaria y alargamiento.
+    """
+    FIELDS = ("N","stress","strain","elongation")
+
+    def __init__(self,names,N,stress,strain,elongation):
+        self.names = names
+        self.N,self.stress,self.strain,self.elongation = N,stress,strain,elongation
+        self._index = None
+
+    @property
+    def index(self):
+        """Diccionario {elemento: posición en los arreglos}, se crea en la primera consulta por nombre."""
+        if self._index is None: self._index = {name: i for i,name in enumerate(self.names)}
+        return self._index
+
+    def __len__(self):
+        return len(self.names)
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __contains__(self,name):
+        return name in self.index
+
+    def __getitem__(self,name):
+        return ElementResult(self,self.index[name])
+
+    def as_dict(self,field="N"):
+        """Diccionario {elemento: valor} de uno de los arreglos de resultados."""
+        return dict(zip(self.names,getattr(self,field).tolist()))
+
+class ElementResult():
+    """Vista de los resultados de un elemento dentro de un ElementResults."""
+    __slots__ = ("results","row")
+    def __init__(self,results,row):
+        self.results = results
+        self.row = row
+
+    name = property(lambda self: self.results.names[self.row])
+    N = property(lambda self: float(self.results.N[self.row]))
+    stress = property(lambda self: float(self.results.stress[self.row]))
+    strain = property(lambda self: float(self.results.strain[self.row]))
+    elongation = property(lambda self: float(self.results.elongation[self.row]))
+
+    def __repr__(self):
+        return f"ElementResult({self.name}: N={self.N:.6g}, stress={self.stress:.6g}, strain={self.strain:.6g})"
+
+@element_type
 class TrussElement():
     """
     Crea un elemento barra biarticulado, 4 grados de libertad, 2 en cada nudo
 
+    El elemento es una vista sobre una fila de un ElementStore, sus propiedades se leen de la tabla.
+
     Parameters
     ----------
     Ji : Joint object
@@ -60,31 +483,64 @@ class TrussElement():
         Sección del elemento.
     name : str
         Nombre del elemento.
+    store : ElementStore object, optional
+        Tabla donde se guarda el elemento. Si no se indica se crea una tabla propia.
+    row : int, optional
+        Fila del store que se reemplaza. Por defecto el elemento se agrega al final.
     """
-    def __init__(self,Ji,Jf,section,name):   # Ji y Jf son objetos de la clase Joint()
-        self.name = name
-        # Asignamos las propiedades de sección
-        self.section = section.name
-        self.A = section.A
-        self.E = section.E
-        # Asignamos las propiedades geométricas       
-        self.Ji = Ji.name   # Guarda el nombre del nudo inicial
-        self.Jf = Jf.name   # Guarda el nombre del nudo final
-        self.Xi = Ji.x
-        self.Xf = Jf.x
-        self.Yi = Ji.y
-        self.Yf = Jf.y
-        self.Δx = Jf.x - Ji.x   # Calcula el delta de x
-        self.Δy = Jf.y - Ji.y   # Calcula el delta de y
-        self.L = sqrt(self.Δx**2 + self.Δy**2)      # Calcula la longitud del elemento
-        if self.L != 0:
-            self.cx = self.Δx / self.L
-            self.cy = self.Δy / self.L
-            self.t_matrix = array([[ self.cx, self.cy, 0, 0], [ 0, 0, self.cx, self.cy]])
-            P = self.E * self.A / self.L
-            self.k_loc = array([[ P, -P], [-P, P]])
-            self.k_glob = self.t_matrix.T @ self.k_loc @ self.t_matrix
-        else: print(f"Error, elemento {name} tiene longitud 0.")
+    __slots__ = ("store","row")
+    kind = "truss"
+    Store = ElementStore
+
+    def __init__(self,Ji,Jf,section,name,store=None,row=None):   # Ji y Jf son objetos de la clase Joint()
+        if store is None:
+            store = self.Store(1)
+        self.store = store
+        self.row = store.append(Ji,Jf,section,name,row)
+
+    @classmethod
+    def view(cls,store,row):
+        """Crea la vista de una fila ya existente en el store."""
+        self = cls.__new__(cls)
+        self.store = store
+        self.row = row
+        return self
+
+    def _get(self,key):
+        self.store.update()
+        return getattr(self.store,key)[self.row]
+
+    name = property(lambda self: self.store.names[self.row])
+    section = property(lambda self: self.store.sections[self.row])
+    Ji = property(lambda self: self.store.Ji[self.row])
+    Jf = property(lambda self: self.store.Jf[self.row])
+    A = property(lambda self: self.store.A[self.row])
+    E = property(lambda self: self.store.E[self.row])
+    Xi = property(lambda self: self.store.xi[self.row])
+    Xf = property(lambda self: self.store.xf[self.row])
+    Yi = property(lambda self: self.store.yi[self.row])
+    Yf = property(lambda self: self.store.yf[self.row])
+    Δx = property(lambda self: self._get("dx"))
+    Δy = property(lambda self: self._get("dy"))
+    L = property(lambda self: self._get("L"))
+    cx = property(lambda self: self._get("cx"))
+    cy = property(lambda self: self._get("cy"))
+    k_glob = property(lambda self: self._get("k"))
+    GdL = property(lambda self: self.store.GdL[self.row].tolist())
+    u_g = property(lambda self: self.store.u_g[self.row].reshape(-1,1))
+    f_g = property(lambda self: self.store.f_g[self.row].reshape(-1,1))
+    u_l = property(lambda self: self.store.u_l[self.row].reshape(-1,1))
+    f_l = property(lambda self: self.store.f_l[self.row].reshape(-1,1))
+
+    @property
+    def t_matrix(self):
+        return array([[ self.cx, self.cy, 0, 0], [ 0, 0, self.cx, self.cy]])
+
+    @property
+    def k_loc(self):
+        P = self._get("k_axial")
+        return array([[ P, -P], [-P, P]])
+
     def assignGDL(self,GdL):
         """
         Asigna los grados de libertad globales del elemento.
@@ -94,16 +550,12 @@ class TrussElement():
         GdL : list
             Lista de los grados de libertad.
         """
-        self.GdL = GdL
+        self.store.GdL[self.row] = GdL
     def deform(self,U):
-        self.u_g = zeros((4,1))
-        for i in range(4):
-            self.u_g[i] = U[self.GdL[i]]
-        self.u_l = self.t_matrix @ self.u_g
-        self.f_g = self.k_glob @ self.u_g
-        self.f_l = self.t_matrix @ self.f_g
+        if self.store.U is not U: self.store.deform(U)
 
     def elemento_excel(self,sheet,c,r):
+        from functions import cellStyle
         cellStyle(sheet,col=c,ren=r,val=self.name,mergeCell=c+6,color="00FFFF",aline=True,bold=True)
         
         cellStyle(sheet,col=c,ren=r+2,val="Joint",color="99CCFF",aline=True,bold=True)
@@ -166,16 +618,91 @@ class TrussElement():
         for i in range(2):
             cellStyle(sheet,col=c+5+i,ren=r+6,val=self.f_l[i,0],color="9BFFEC",aline=True)
 
+@element_type
+class FrameElement(TrussElement):
+    """
+    Crea un elemento de pórtico plano, 6 grados de libertad, 3 en cada nudo (ux, uy, θz)
+
+    Igual que TrussElement es una vista sobre una fila de su store (FrameStore). u_l y f_l tienen las 6
+    componentes en ejes locales.
+    """
+    __slots__ = ()
+    kind = "frame"
+    Store = FrameStore
+
+    I = property(lambda self: self.store.I[self.row])
+    t_matrix = property(lambda self: self._get("T"))
+    k_loc = property(lambda self: self._get("k_local"))
 
 class TrussStructure():
     def __init__(self):     # Se crea la estructura reticulada
         self.J = {}     # Se crea un diccionario de los nudos que tiene la estructura
         self.Joints = {}    # Se crea un diccionario con los nudos que son usados en la estructura
         self.Elements = {}  # Se crea un diccionario con los elementos que tiene la estructura
+        self.Sections = {}  # Secciones usadas por los elementos
+        self.store = ElementStore()     # Tabla con las propiedades de todos los elementos barra
+        self.stores = {"truss": self.store}     # Tabla de cada tipo de elemento usado (ver element_type)
         self.nGdL = 0    # Número de grados de libertad de la estructura
         self.gdl = 0     # Variable auxiliar para asignar los grados de libertad a los nudos
         self.constraints = []
+        self.restrained = set()     # Registro de los grados de libertad restringidos, evita duplicados en constraints
         self.forces = []
+        self.settlements = {}   # Desplazamientos prescritos en apoyos {caso: {grado de libertad: valor}}
+        self.dof_rank = None    # Numeración interna de los grados de libertad (ver renumber)
+        self.load_cases = {"Default": self.forces}   # Casos de carga, "Default" es el que usa add_nodal_force por defecto
+        self.combinations = {}  # Combinaciones de carga {nombre: {caso: factor}}
+        self.profiler = None    # Registro opcional de las fases del análisis (ver profile)
+        self._element_results = {}  # Resultados de los elementos ya calculados, por caso (ver element_results)
+        self.modes = None       # Modos de vibración (ver Modal)
+        self._joint_index = None    # Índice espacial de los nudos (ver joint_index)
+        self.superelements = {}     # Paneles condensados (ver add_superelement)
+
+    def copy(self):
+        """Copia para resolver otras cargas con la factorización del último Analyze (ver solve_loads).
+
+        Comparte los nudos, las secciones, K, K_r y la factorización, que no cambian al resolver, y tiene sus propias
+        tablas de elementos, casos de carga, combinaciones y resultados, por lo que cada copia se puede resolver y
+        leer sin afectar a las demás.
+        """
+        T = self.__class__.__new__(self.__class__)
+        T.__dict__.update(self.__dict__)
+        T.stores = {kind: st.copy() for kind,st in self.stores.items()}
+        T.store = T.stores["truss"]
+        T.Elements = {name: type(e).view(T.stores[e.kind],e.row) for name,e in self.Elements.items()}
+        T.load_cases = {case: list(forces) for case,forces in self.load_cases.items()}
+        T.forces = T.load_cases["Default"]
+        T.settlements = {case: dict(values) for case,values in self.settlements.items()}
+        T.combinations = {name: dict(factors) for name,factors in self.combinations.items()}
+        T.superelements = {}
+        for name,inst in self.superelements.items():     # Las cargas de los paneles también son propias
+            new = T.superelements[name] = inst.__class__.__new__(inst.__class__)
+            new.__dict__.update(inst.__dict__)
+            new.loads = {case: f.copy() for case,f in inst.loads.items()}
+        T._element_results = {}
+        if self.profiler is not None: T.profiler = self.profiler.copy()
+        return T
+
+    @staticmethod
+    def from_json(path):
+        """Lee un modelo desde un archivo JSON (ver el esquema en modelio)."""
+        from modelio import load_json
+        return load_json(path)
+
+    @staticmethod
+    def from_csv(directory):
+        """Lee un modelo desde un directorio de archivos CSV (ver el esquema en modelio)."""
+        from modelio import load_csv
+        return load_csv(directory)
+
+    def to_json(self,path):
+        """Guarda el modelo en un archivo JSON."""
+        from modelio import save_json
+        save_json(self,path)
+
+    def to_csv(self,directory):
+        """Guarda el modelo como archivos CSV en un directorio."""
+        from modelio import save_csv
+        save_csv(self,directory)
 
     def add_joint(self,x,y,name):
         """Agrega un nudo a la estructura.
@@ -190,9 +717,10 @@ class TrussStructure():
             Nombre del nudo.
         """
         self.J[name] = Joint(x,y,name)
+        self._joint_index = None
 
-    def add_element(self,Ji,Jf,section,name):
-        """Agrega un elemento biarticulado a la estructura.
+    def add_element(self,Ji,Jf,section,name,kind="truss"):
+        """Agrega un elemento a la estructura.
 
         Parametros
         ----------
@@ -204,6 +732,9 @@ class TrussStructure():
             Sección del elemento.
         name : str
             Nombre del elemento.
+        kind : str
+            Tipo de elemento registrado en ELEMENT_TYPES: "truss" (barra biarticulada) o "frame" (pórtico plano,
+            agrega el giro θz a sus nudos).
         """
         if Ji not in self.J:
             print(f"Error al agregar el elemento {name}, el nudo inicial indicado no ha sido definido")
@@ -211,18 +742,260 @@ class TrussStructure():
         if Jf not in self.J:
             print(f"Error al agregar el elemento {name}, el nudo final indicado no ha sido definido")
             return 0
-        if not self.J[Ji].is_used:
-            self.Joints[Ji] = self.J[Ji]
-            self.Joints[Ji].use([self.gdl,self.gdl+1])
-            self.gdl += 2
-            self.nGdL += 2
-        if not self.J[Jf].is_used:
-            self.Joints[Jf] = self.J[Jf]
-            self.Joints[Jf].use([self.gdl,self.gdl+1])
+        store = self._store(kind)
+        d = len(store.DOFS)
+        self._activate(Ji,d)
+        self._activate(Jf,d)
+        self.Sections[section.name] = section
+        row = None
+        if name in self.Elements:   # Un elemento con el mismo nombre se reemplaza
+            old = self.Elements[name]
+            if old.store is store: row = old.row
+            else: old.store.remove(old.row)
+        self.Elements[name] = ELEMENT_TYPES[kind](self.Joints[Ji],self.Joints[Jf],section,name,store,row)
+        self.Elements[name].assignGDL(self.Joints[Ji].GdL[:d]+self.Joints[Jf].GdL[:d])
+
+    def _store(self,kind):
+        """Tabla de los elementos de un tipo, se crea con el primer elemento de ese tipo."""
+        if kind not in self.stores:
+            if kind not in ELEMENT_TYPES: raise ValueError(f"Tipo de elemento desconocido: {kind}")
+            self.stores[kind] = ELEMENT_TYPES[kind].Store()
+        return self.stores[kind]
+
+    def add_joints(self,x,y,names):
+        """Agrega varios nudos de una vez.
+
+        Parameters
+        ----------
+        x, y : array_like
+            Coordenadas de los nudos.
+        names : list
+            Nombres de los nudos.
+        """
+        for xj,yj,name in zip(asarray(x,dtype=float).tolist(),asarray(y,dtype=float).tolist(),names):
+            self.J[name] = Joint(xj,yj,name)
+        self._joint_index = None
+
+    def joint_index(self):
+        """Índice espacial (k-d tree) de los nudos, se crea en la primera consulta después de agregar nudos."""
+        if self._joint_index is None:
+            from spatial import JointIndex
+            self._joint_index = JointIndex(self)
+        return self._joint_index
+
+    def nearest_joint(self,x,y,tol=None):
+        """Nombre del nudo más cercano a un punto, o None si tol se indica y no hay ninguno a esa distancia."""
+        found = self.joint_index().nearest(x,y)
+        if not found or (tol is not None and found[0][1] > tol): return None
+        return found[0][0]
+
+    def merge_joints(self,tol=1e-6,drop_duplicates=False):
+        """Nueva estructura con los nudos coincidentes unidos y sus elementos, apoyos y cargas reasignados.
+
+        Ver spatial.merge_joints. Devuelve la nueva estructura y el reporte de los cambios.
+        """
+        from spatial import merge_joints
+        return merge_joints(self,tol,drop_duplicates)
+
+    def find_overlaps(self,tol=1e-6):
+        """Elementos repetidos, elementos colineales superpuestos y nudos sobre elementos sin conectar (ver
+        spatial.find_overlaps)."""
+        from spatial import find_overlaps
+        return find_overlaps(self,tol)
+
+    def add_elements(self,Ji,Jf,sections,names):
+        """Agrega varios elementos biarticulados de una vez, con validación y cálculo por columnas.
+
+        Los grados de libertad se asignan a los nudos nuevos en el mismo orden de primer uso que add_element.
+
+        Parameters
+        ----------
+        Ji, Jf : list
+            Nombres de los nudos inicial y final de cada elemento.
+        sections : list
+            Objeto Section de cada elemento.
+        names : list
+            Nombres de los elementos.
+        """
+        names = list(names)
+        jnames = array(list(self.J),dtype=str)
+        i = lookup(asarray(Ji,dtype=str),jnames)
+        f = lookup(asarray(Jf,dtype=str),jnames)
+        errors = [f"Elemento {names[k]}: el nudo inicial {Ji[k]} no ha sido definido" for k in flatnonzero(i < 0)]
+        errors += [f"Elemento {names[k]}: el nudo final {Jf[k]} no ha sido definido" for k in flatnonzero(f < 0)]
+        repeated = [n for n in names if n in self.Elements]
+        if len(set(names)) < len(names): repeated += [n for n,c in Counter(names).items() if c > 1]
+        errors += [f"Elemento {n} repetido" for n in repeated[:100]]
+        if errors: raise ModelError(errors)
+        joints = list(self.J.values())
+        # Nudos nuevos en orden de primer uso
+        seq = stack((i,f),axis=1).ravel()
+        new = array([not joints[k].is_used for k in range(len(joints))],dtype=bool)
+        first = unique(seq[new[seq]],return_index=True)
+        for k in first[0][argsort(first[1])].tolist():
+            J = joints[k]
+            self.Joints[J.name] = J
+            J.use([self.gdl,self.gdl+1])
             self.gdl += 2
             self.nGdL += 2
-        self.Elements[name] = TrussElement(self.Joints[Ji],self.Joints[Jf],section,name)
-        self.Elements[name].assignGDL(self.Joints[Ji].GdL+self.Joints[Jf].GdL)
+        x = array([J.x for J in joints])
+        y = array([J.y for J in joints])
+        dofs = array([J.GdL[:2] if J.is_used else [0,0] for J in joints],dtype=int).reshape(-1,2)
+        for s in sections: self.Sections[s.name] = s
+        E = array([s.E for s in sections],dtype=float)
+        A = array([s.A for s in sections],dtype=float)
+        rho = array([s.rho for s in sections],dtype=float)
+        rows = self.store.extend(names,[s.name for s in sections],list(Ji),list(Jf),x[i],y[i],x[f],y[f],E,A,
+                                 hstack((dofs[i],dofs[f])),rho)
+        for name,row in zip(names,rows):
+            self.Elements[name] = TrussElement.view(self.store,row)
+
+    def _activate(self,name,d=2):
+        """Asigna grados de libertad a un nudo hasta completar d (2: ux, uy; 3: ux, uy, θz)."""
+        J = self.J[name]
+        if not J.is_used:
+            self.Joints[name] = J
+            J.use([])
+        extra = d - len(J.GdL)
+        if extra > 0:   # Un nudo de barras que recibe un elemento de pórtico agrega su giro al final
+            J.GdL = J.GdL + list(range(self.gdl,self.gdl + extra))
+            self.gdl += extra
+            self.nGdL += extra
+
+    def add_superelement(self,substructure,name,origin=(0.0,0.0),angle=0.0,joints=None,tol=1e-6):
+        """Agrega una instancia de un panel condensado a sus nudos de borde (ver substructures.py).
+
+        Los nudos de borde se ubican en origin + R(angle)·(x, y) del panel. Cada uno se conecta al nudo indicado
+        en joints, al nudo existente a distancia tol o menor, o a un nudo nuevo "<name>.<nudo del panel>".
+
+        Parameters
+        ----------
+        substructure : Substructure object
+            Definición del panel.
+        name : str
+            Nombre de la instancia.
+        origin : tuple
+            Traslación del panel.
+        angle : float
+            Rotación del panel en radianes, alrededor del origen de sus ejes.
+        joints : dict, optional
+            {nudo de borde del panel: nudo de la estructura}.
+        tol : float
+            Distancia para conectar los nudos de borde con nudos existentes.
+
+        Returns
+        -------
+        SuperElement object
+        """
+        from substructures import SuperElement
+        if name in self.superelements: raise ModelError([f"Superelemento {name} repetido"])
+        joints = dict(joints or {})
+        missing = [j for j in joints.values() if j not in self.J]
+        if missing: raise ModelError([f"Superelemento {name}: el nudo {j} no ha sido definido" for j in missing])
+        inst = SuperElement(name,substructure,origin,angle,[],[])
+        xy = inst.position(substructure.xy[:len(substructure.boundary)]).tolist()
+        names = [joints.get(local) or self.nearest_joint(x,y,tol) for local,(x,y) in zip(substructure.boundary,xy)]
+        for k,local in enumerate(substructure.boundary):
+            if names[k] is None:
+                names[k] = f"{name}.{local}"
+                self.add_joint(xy[k][0],xy[k][1],names[k])
+            self._activate(names[k])
+        inst.joints = names
+        inst.GdL = [g for j in names for g in self.Joints[j].GdL[:2]]
+        self.superelements[name] = inst
+        return inst
+
+    def add_panel_force(self,superelement,joint,force={"x":0,"y":0},case="Default"):
+        """Agrega una fuerza nodal sobre un nudo (interior o de borde) de un superelemento.
+
+        Parameters
+        ----------
+        superelement : str
+            Nombre del superelemento.
+        joint : str
+            Nudo del panel.
+        force : dict
+            Componentes de la fuerza en ejes globales, por ejemplo {"y":-5}.
+        case : str
+            Nombre del caso de carga. Se crea si no existe.
+        """
+        self.load_cases.setdefault(case,[])
+        self.superelements[superelement].add_nodal_force(joint,force,case)
+
+    def _superelement_blocks(self,kind=None):
+        """Grados de libertad (m,nb) y matrices (m,nb,nb) de los superelementos, agrupados por número de nudos de
+        borde. kind None da las rigideces, "lumped" o "consistent" las masas."""
+        groups = {}
+        for inst in self.superelements.values():
+            G,k = groups.setdefault(inst.panel.nb,([],[]))
+            G.append(inst.GdL)
+            k.append(inst.stiffness if kind is None else inst.panel.mass(kind,inst.angle))
+        return [(array(G,dtype=int),array(k)) for G,k in groups.values()]
+
+    def _superelement_stiffness(self,kind=None):
+        from scipy.sparse import coo_matrix
+        from solvers import assemble
+        K = coo_matrix((self.nGdL,self.nGdL)).tocsr()
+        for G,k in self._superelement_blocks(kind): K = K + assemble(G,k,self.nGdL)
+        return K
+
+    def _element_blocks(self,kind=None):
+        """Grados de libertad (n,d) y matrices (n,d,d) de cada tipo de elemento. kind None da las rigideces,
+        "lumped" o "consistent" las masas."""
+        blocks = []
+        for st in self.stores.values():
+            st.update()
+            blocks.append((st.GdL[:st.n],st.k if kind is None else st.mass(kind)))
+        return blocks
+
+    def _assemble(self,kind=None):
+        from solvers import assemble
+        blocks = self._element_blocks(kind)
+        if self.superelements: blocks += self._superelement_blocks(kind)
+        K = assemble(*blocks[0],self.nGdL)
+        for G,k in blocks[1:]: K = K + assemble(G,k,self.nGdL)
+        return K
+
+    def stiffness(self):
+        """Matriz de rigidez global en formato CSR, con todos los tipos de elemento y los superelementos."""
+        return self._assemble()
+
+    def mass_matrix(self,kind="lumped"):
+        """Matriz de masa global en formato CSR, "lumped" o "consistent" (ver ElementStore.mass)."""
+        return self._assemble(kind)
+
+    def _element_dofs(self):
+        """Grados de libertad de los elementos activos de todos los tipos en una tabla (m,d), con d el mayor número
+        de grados de libertad por elemento; las filas más cortas repiten su último grado de libertad."""
+        tables = [st.GdL[:st.n][st.active[:st.n]] for st in self.stores.values()]
+        d = max(t.shape[1] for t in tables)
+        return vstack([hstack((t,t[:,-1:].repeat(d - t.shape[1],axis=1))) for t in tables])
+
+    def superelement_results(self,name,case="Default"):
+        """Desplazamientos interiores y resultados de los elementos de un superelemento, calculados a partir de los
+        desplazamientos de sus nudos de borde.
+
+        Parameters
+        ----------
+        name : str
+            Nombre del superelemento.
+        case : str
+            Caso de carga o combinación.
+
+        Returns
+        -------
+        ElementResults object
+            Resultados de los elementos del panel, con sus nombres en el panel.
+        dict
+            {nudo del panel: (ux, uy)} desplazamientos en ejes globales.
+        """
+        inst = self.superelements[name]
+        u_b = self._case_vector(case,self.U_cases)[inst.GdL,0]
+        u = inst.recover(u_b,self.combinations.get(case,case))
+        elong,N,stress,strain = inst.element_forces(u)
+        results = ElementResults(list(inst.sub.elements),N,stress,strain,elong)
+        u_g = (u.reshape(-1,2) @ inst.R.T).tolist()
+        return results,dict(zip(inst.sub.joints,map(tuple,u_g)))
 
     def add_constraint(self,J,const={"x":0,"y":0}):
         """Agrega restricciones de movimiento a un nudo de la estructura
@@ -233,44 +1006,764 @@ class TrussStructure():
             Nombre del nudo que será restringido.
         const : list
             Lista con los número de los grados de libertad restringidos. Siendo 1 dirección "x", 2 dirección "y". Ejemplos: [1],
-            [1,2], [2]
-        """
-        if "x" in const:
-            if const["x"] == 1: self.constraints.append(self.Joints[J].GdL[0])
-        if "y" in const:
-            if const["y"] == 1: self.constraints.append(self.Joints[J].GdL[1])
-
-    def add_nodal_force(self,J,force={"x":0, "y":0}):
-        if "x" in force:
-            if force["x"] != 0: self.forces.append([self.Joints[J].GdL[0],force["x"]])
-        if "y" in force:
-            if force["y"] != 0: self.forces.append([self.Joints[J].GdL[1],force["y"]])
-
-    def Analyze(self):
-        self.K = zeros((self.nGdL,self.nGdL))
-        for e in self.Elements:
-            for i in range(4):
-                for j in range(4):
-                    self.K[self.Elements[e].GdL[i],self.Elements[e].GdL[j]] += self.Elements[e].k_glob[i,j]
-        self.F = zeros((self.nGdL,1))
-        for g,v in self.forces:
-            self.F[g,0] += v
-        self.K_r = copy(self.K)
-        self.K_r = delete(self.K_r,self.constraints,axis=0)
-        self.K_r = delete(self.K_r,self.constraints,axis=1)
-        self.F_r = copy(self.F)
-        self.F_r = delete(self.F_r,self.constraints,axis=0)
-        self.U_r = solve(self.K_r,self.F_r)
-        self.U = zeros((self.nGdL,1))
-        j = 0
-        for i in range(self.nGdL):
-            if i not in self.constraints:
-                self.U[i] = self.U_r[j]
-                j += 1
-        for e in self.Elements:
-            self.Elements[e].deform(self.U)
+            [1,2], [2]. "rz" restringe el giro de los nudos con elementos de pórtico (empotramiento), en los demás
+            nudos se ignora.
+        """
+        GdL = self.Joints[J].GdL
+        for i,d in enumerate(("x","y","rz")[:len(GdL)]):
+            if const.get(d,0) == 1: self._restrain(GdL[i])
+
+    def _restrain(self,g):
+        if g not in self.restrained:
+            self.restrained.add(g)
+            self.constraints.append(g)
+
+    def add_support_displacement(self,J,disp={"x":0,"y":0},case="Default"):
+        """Agrega un desplazamiento prescrito (por ejemplo un asentamiento) en un apoyo. La dirección queda restringida.
+
+        Parameters
+        ----------
+        J : str
+            Nombre del nudo.
+        disp : dict
+            Desplazamientos impuestos, por ejemplo {"y":-0.01}, o giros {"rz":0.001} en nudos de pórticos.
+        case : str
+            Nombre del caso de carga. Se crea si no existe.
+        """
+        GdL = self.Joints[J].GdL
+        if "rz" in disp and len(GdL) < 3:
+            print(f"Error al agregar el desplazamiento, el nudo {J} no tiene giro (no tiene elementos de pórtico)")
+            return 0
+        self.load_cases.setdefault(case,[])
+        values = self.settlements.setdefault(case,{})
+        for i,d in enumerate(("x","y","rz")[:len(GdL)]):
+            if d in disp:
+                self._restrain(GdL[i])
+                values[GdL[i]] = disp[d]
+
+    def partition(self):
+        """Arreglos de los grados de libertad libres y restringidos.
+
+        Los libres quedan en el orden de la numeración interna si se llamó a renumber, de lo contrario en el orden
+        de Joint.GdL.
+        """
+        mask = zeros(self.nGdL,dtype=bool)
+        mask[self.constraints] = True
+        self.fixed = flatnonzero(mask)
+        self.free = flatnonzero(~mask)
+        if self.dof_rank is not None:
+            if len(self.dof_rank) != self.nGdL: self.renumber(self.reorder)    # Hay nudos nuevos desde renumber
+            if self.dof_rank is not None:
+                self.free = self.free[argsort(self.dof_rank[self.free],kind="stable")]
+        return self.free,self.fixed
+
+    def renumber(self,method="rcm"):
+        """Renumera internamente los grados de libertad para reducir el ancho de banda de K_r.
+
+        Joint.GdL y los resultados (U, F, R) conservan la numeración del usuario, solo cambia el orden de las
+        ecuaciones que se factorizan. Conviene usarlo con Analyze(solver="banded").
+
+        Parameters
+        ----------
+        method : str
+            "rcm" (Cuthill-McKee inverso sobre el grafo de nudos) o "none" para volver al orden de Joint.GdL.
+
+        Returns
+        -------
+        dict
+            Semiancho de banda y perfil de K_r antes y después de renumerar.
+        """
+        from renumbering import rcm_dof_rank,bandwidth_profile
+        GdL = self._element_dofs()
+        self.dof_rank = None
+        free,fixed = self.partition()
+        before = bandwidth_profile(GdL,free,self.nGdL)
+        if method == "rcm":
+            self.reorder = method
+            self.dof_rank = rcm_dof_rank(GdL,self.Joints,self.nGdL)
+            self.dof_map = argsort(self.dof_rank)   # dof_map[i] es el grado de libertad de usuario del número interno i
+        elif method != "none":
+            raise ValueError(f"Método de renumeración desconocido: {method}")
+        free,fixed = self.partition()
+        after = bandwidth_profile(GdL,free,self.nGdL)
+        self._base = None   # La factorización previa no corresponde al nuevo orden
+        self.renumber_report = {"bandwidth_before":before[0],"bandwidth_after":after[0],
+                                "profile_before":before[1],"profile_after":after[1]}
+        return self.renumber_report
+
+    def load_matrix(self):
+        """Fuerzas nodales y desplazamientos prescritos de todos los casos de carga, un caso por columna.
+
+        Returns
+        -------
+        F_cases, U_cases : ndarray (nGdL,casos)
+            U_cases solo tiene valores en los grados de libertad con desplazamiento prescrito.
+        """
+        self.cases = list(self.load_cases)
+        F_cases = zeros((self.nGdL,len(self.cases)))
+        U_cases = zeros((self.nGdL,len(self.cases)))
+        for c,case in enumerate(self.cases):
+            for g,v in self.load_cases[case]:
+                F_cases[g,c] += v
+            for g,v in self.settlements.get(case,{}).items():
+                U_cases[g,c] = v
+            for inst in self.superelements.values():    # Cargas interiores de los paneles condensadas al borde
+                fb = inst.condensed_load(case)
+                if fb is not None: F_cases[inst.GdL,c] += fb
+        return F_cases,U_cases
+
+    def _solve_cases(self):
+        """Resuelve todos los casos de carga con la factorización actual de K_r.
+
+        Incluye los desplazamientos prescritos en los apoyos y calcula las reacciones R = K_fu·U - F.
+        """
+        from profiling import residual
+        with self._phase("solve") as stats:
+            free,fixed = self.free,self.fixed
+            F_cases,U_cases = self.load_matrix()
+            K_s = self.K[fixed]     # Filas de los grados de libertad restringidos
+            rhs = F_cases[free]
+            if U_cases[fixed].any():
+                rhs = rhs - (K_s[:,free].T @ U_cases[fixed])    # K_uf·U_s = K_fu'·U_s por simetría
+            U_cases[free] = self.factor.solve(rhs).reshape(len(free),-1)
+            R_cases = zeros((self.nGdL,len(self.cases)))
+            R_cases[fixed] = K_s @ U_cases - F_cases[fixed]
+            if stats is not None:
+                stats.update(kind=self.factor.kind,cases=len(self.cases),residual=residual(self.K_r,U_cases[free],rhs))
+        return F_cases,U_cases,R_cases
+
+    def _set_default(self):
+        self.F = self.F_cases[:,:1]
+        self.F_r = self.F[self.free]
+        self.U = self.U_cases[:,:1]
+        self.U_r = self.U[self.free]
+        self.R = self.R_cases[:,:1]
+
+    def add_nodal_force(self,J,force={"x":0, "y":0},case="Default"):
+        """Agrega una fuerza nodal a un caso de carga.
+
+        Parameters
+        ----------
+        J : str
+            Nombre del nudo cargado.
+        force : dict
+            Componentes de la fuerza, por ejemplo {"x":10, "y":-5}, y el momento "rz" en nudos de pórticos.
+        case : str
+            Nombre del caso de carga. Se crea si no existe.
+        """
+        GdL = self.Joints[J].GdL
+        if force.get("rz",0) != 0 and len(GdL) < 3:
+            print(f"Error al agregar el momento, el nudo {J} no tiene giro (no tiene elementos de pórtico)")
+            return 0
+        forces = self.load_cases.setdefault(case,[])
+        for i,d in enumerate(("x","y","rz")[:len(GdL)]):
+            if force.get(d,0) != 0: forces.append([GdL[i],force[d]])
+
+    def add_load_case(self,name):
+        """Crea un caso de carga vacío.
+
+        Parameters
+        ----------
+        name : str
+            Nombre del caso de carga.
+        """
+        self.load_cases.setdefault(name,[])
+
+    def add_combination(self,name,factors):
+        """Agrega una combinación lineal de casos de carga.
+
+        Parameters
+        ----------
+        name : str
+            Nombre de la combinación.
+        factors : dict
+            Factor de cada caso, por ejemplo {"D":1.2, "L":1.6}.
+        """
+        for case in factors:
+            if case not in self.load_cases:
+                print(f"Error al agregar la combinación {name}, el caso de carga {case} no ha sido definido")
+                return 0
+        self.combinations[name] = dict(factors)
+        self._element_results.pop(name,None)
+
+    def check_stability(self,numeric=True,tol=1e-9):
+        """Revisa la estabilidad de la estructura antes de resolverla (ver stability.py).
+
+        Busca nudos sin usar, elementos de longitud nula, componentes desconectadas con apoyos insuficientes y,
+        si no hay errores topológicos, los nudos y grados de libertad que forman un mecanismo.
+
+        Parameters
+        ----------
+        numeric : bool
+            Hace también la revisión numérica del rango de K_r (una factorización dispersa).
+        tol : float
+            Pivote relativo por debajo del cual un grado de libertad se considera sin rigidez.
+
+        Returns
+        -------
+        StabilityReport object
+        """
+        from stability import check_stability as stability_report
+        self.stability = stability_report(self,numeric,tol)
+        return self.stability
+
+    def Analyze(self,solver="sparse",check=False):
+        """Ensambla la matriz de rigidez, resuelve los desplazamientos y calcula las fuerzas en los elementos.
+
+        Parameters
+        ----------
+        solver : str
+            "sparse" ensambla K en formato CSR y usa una factorización dispersa, "dense" usa matrices densas
+            (recomendado solo para modelos pequeños), "banded" usa Cholesky en banda sobre la numeración interna
+            (ver renumber). Todos entregan el mismo U.
+        check : bool
+            Revisa la estabilidad y lanza ModelError con los problemas encontrados si la estructura es inestable.
+            Antes de ensamblar se hace la etapa topológica de check_stability; la numérica solo si la factorización
+            de K_r falla o tiene pivotes casi nulos, sobre la misma K_r (ver stability.py).
+        """
+        from solvers import Factorization
+        from profiling import condition_estimate
+        if check:
+            from stability import check_stability as stability_report,mechanisms,needs_rank_check
+            with self._phase("stability") as stats:
+                report = self.stability = stability_report(self,numeric=False)
+                if stats is not None: stats.update(components=len(report.components))
+            if not report.ok: raise ModelError(report.errors)
+        with self._phase("assembly") as stats:
+            for st in self.stores.values(): st.update()
+            if solver == "dense":
+                self.K = zeros((self.nGdL,self.nGdL))
+                for e in self.Elements:
+                    GdL,k = self.Elements[e].GdL,self.Elements[e].k_glob
+                    for i in range(len(GdL)):
+                        for j in range(len(GdL)):
+                            self.K[GdL[i],GdL[j]] += k[i,j]
+                if self.superelements: self.K += self._superelement_stiffness().toarray()
+            elif solver in ("sparse","banded"):
+                self.K = self.stiffness()
+            else:
+                raise ValueError(f"Método de solución desconocido: {solver}")
+            if stats is not None: stats.update(n=self.nGdL,nnz=_nnz(self.K),elements=len(self.Elements))
+        with self._phase("reduction") as stats:
+            free,fixed = self.partition()
+            if solver == "dense":
+                self.K_r = self.K[ix_(free,free)]
+            else:
+                self.K_r = self.K[free][:,free]
+            if stats is not None: stats.update(n=len(free),nnz=_nnz(self.K_r),fixed=len(fixed))
+        with self._phase("factorization") as stats:
+            try:
+                self.factor = Factorization(self.K_r,solver)   # Una sola factorización para todos los casos
+            except Exception:
+                if not check: raise
+                self.factor = None  # K_r singular, el mecanismo se describe en la etapa numérica de la revisión
+            if stats is not None and self.factor is not None:
+                stats.update(solver=solver,kind=self.factor.kind)
+                if self.profiler.condition: stats["condition"] = condition_estimate(self.K_r,self.factor)
+        if check and (self.factor is None or needs_rank_check(self.factor,self.K_r)):
+            with self._phase("stability") as stats:
+                report = mechanisms(self,report,self.K_r,free)
+                if stats is not None: stats.update(rank_deficiency=report.rank_deficiency)
+            if not report.ok: raise ModelError(report.errors)
+            if self.factor is None: raise ModelError(["La factorización de K_r falló sin un mecanismo identificable"])
+        self.F_cases,self.U_cases,self.R_cases = self._solve_cases()
+        self._recover()
+        # Estado de referencia para el reanálisis incremental
+        self.solver = solver
+        self._base = {"factor":self.factor,"K":self.K,"K_r":self.K_r,"nGdL":self.nGdL,"constraints":set(self.restrained),
+                      "k_axial":self.store.k_axial.copy(),"cx":self.store.cx.copy(),"cy":self.store.cy.copy(),
+                      "GdL":self.store.GdL[:self.store.n].copy(),
+                      "superelements":len(self.superelements),
+                      "stores":{kind: st.k for kind,st in self.stores.items() if kind != "truss"}}
+
+    def _recover(self,rows=None):
+        """Fuerzas axiales de todos los casos y estado del caso por defecto en los elementos.
+
+        Los desplazamientos y fuerzas de cada elemento (ver ElementStore.deform) y los resultados de element_results
+        se calculan recién cuando se leen.
+        """
+        with self._phase("recovery") as stats:
+            if rows is None:   # Fuerza axial de cada elemento en cada caso, las filas de cada store una a continuación de otra
+                self.N_cases = vstack([st.axial(self.U_cases) for st in self.stores.values()])
+            self._set_default()
+            self.store.deform(self.U,rows)
+            for st in self._other_stores(): st.deform(self.U)
+            self._element_results = {}
+            if stats is not None: stats["elements"] = len(self.N_cases) if rows is None else len(rows)
+
+    def _other_stores(self):
+        """Tablas de los tipos de elemento distintos de la barra."""
+        return [st for kind,st in self.stores.items() if kind != "truss"]
+
+    def _by_name(self,values):
+        """Diccionario {elemento: valor} de los elementos activos de todos los tipos, values con las filas de
+        N_cases."""
+        out,start = {},0
+        for st in self.stores.values():
+            out.update(st.by_name(values[start:start + st.n]))
+            start += st.n
+        return out
+
+    def profile(self,enabled=True,memory=False,condition=False,hooks=(),label=None):
+        """Activa o desactiva el registro de las fases del análisis (ver profiling.py).
+
+        Sin perfilador cada fase solo comprueba un atributo, por lo que desactivado no tiene costo apreciable.
+
+        Parameters
+        ----------
+        enabled : bool
+            False quita el perfilador.
+        memory : bool
+            Mide la memoria pico de cada fase con tracemalloc.
+        condition : bool
+            Estima el número de condición de K_r al factorizar.
+        hooks : iterable
+            Funciones fn(label, record) que reciben cada registro.
+        label : str, optional
+            Nombre del modelo que se entrega a los hooks.
+
+        Returns
+        -------
+        Profiler object or None
+        """
+        from profiling import Profiler
+        self.profiler = Profiler(label,memory,condition,hooks) if enabled else None
+        return self.profiler
+
+    def _phase(self,name):
+        return _OFF if self.profiler is None else self.profiler.phase(name)
+
+    def solve_loads(self):
+        """Vuelve a resolver todos los casos de carga con la factorización del último Analyze.
+
+        Sirve cuando solo cambiaron las cargas o los desplazamientos prescritos, sin tocar elementos ni apoyos.
+        """
+        self.F_cases,self.U_cases,self.R_cases = self._solve_cases()
+        self._recover()
+
+    def Modal(self,n_modes=6,mass="lumped",sigma=0.0):
+        """Calcula las frecuencias y modos de vibración más bajos de la estructura.
+
+        Resuelve K_r·φ = ω²·M_r·φ con un solver disperso de valores propios (scipy.sparse.linalg.eigsh) en modo
+        shift-invert alrededor de sigma, que obtiene solo los n_modes valores más cercanos sin formar matrices
+        densas. En modelos con muy pocos grados de libertad se usa un solver denso. La masa de cada barra se calcula
+        con la densidad de su sección (Section.density).
+
+        Si el modelo no cambió desde el último Analyze se usa su K_r y, con sigma=0, su factorización como
+        operador inverso del modo shift-invert, sin ensamblar ni factorizar de nuevo.
+
+        Parameters
+        ----------
+        n_modes : int
+            Número de modos.
+        mass : str
+            "lumped" (masa concentrada en los nudos) o "consistent".
+        sigma : float
+            Valor de ω² alrededor del cual se buscan los modos, 0 para los más bajos.
+
+        Returns
+        -------
+        ndarray
+            Frecuencias en Hz, de menor a mayor. Quedan además en frequencies, omega (rad/s) y periods; los modos
+            normalizados respecto a la masa en modes (nGdL,n_modes) y la fracción de masa efectiva en X e Y de
+            cada modo en modal_mass (n_modes,2).
+        """
+        from scipy.linalg import eigh
+        from scipy.sparse import issparse
+        from scipy.sparse.linalg import LinearOperator,eigsh
+        with self._phase("modal") as stats:
+            self.M = self.mass_matrix(mass)
+            reuse = self._base_current()
+            free,fixed = self.partition()
+            K_r = self._base["K_r"] if reuse else self.stiffness()[free][:,free].tocsc()
+            M_r = self.M[free][:,free].tocsc()
+            massive = int((M_r.diagonal() > 0).sum())
+            if massive == 0:
+                raise ValueError("La estructura no tiene masa, indique la densidad de las secciones")
+            k = min(n_modes,massive)
+            if k >= min(len(free),massive) - 1:
+                K_d = K_r.toarray() if issparse(K_r) else K_r
+                mu,V = eigh(M_r.toarray(),K_d)      # μ = 1/ω², K_r es definida positiva si la estructura es estable
+                mu,V = mu[::-1][:k],V[:,::-1][:,:k]
+                w = 1/where(mu > 0,mu,float("inf"))
+                kind = "dense"
+            else:
+                # El espacio de Krylov no crece más allá del rango de M_r (los giros de los pórticos no tienen masa
+                # concentrada)
+                ncv = min(len(free),massive,max(2*k + 1,20))
+                OPinv = None
+                if reuse and sigma == 0:    # (K_r - 0·M_r)⁻¹ se aplica con la factorización de Analyze
+                    OPinv = LinearOperator(K_r.shape,matvec=self._base["factor"].solve,dtype=float)
+                w,V = eigsh(K_r,k,M_r,sigma=sigma,which="LM",ncv=ncv,OPinv=OPinv)
+                kind = "eigsh"
+            order = argsort(w)
+            w,V = w[order],V[:,order]
+            V = V/sqrt((V*(M_r @ V)).sum(axis=0))      # Normalización respecto a la masa: φ'·M·φ = 1
+            self.modes = zeros((self.nGdL,k))
+            self.modes[free] = V
+            self.omega = sqrt(where(w > 0,w,0.0))
+            self.frequencies = self.omega/(2*pi)
+            self.periods = 1/where(self.frequencies > 0,self.frequencies,float("nan"))
+            r = zeros((self.nGdL,2))     # Vectores de arrastre en X e Y
+            for J in self.Joints.values():
+                r[J.GdL[0],0] = r[J.GdL[1],1] = 1.0
+            Mr = M_r @ r[free]
+            total = (r[free]*Mr).sum(axis=0)
+            self.modal_mass = (V.T @ Mr)**2/where(total > 0,total,1.0)
+            if stats is not None: stats.update(n=len(free),modes=k,mass=mass,kind=kind,reused=reuse)
+        return self.frequencies
+
+    def mode_shape(self,i):
+        """Forma del modo i (desde 0) como vector (nGdL,1), en el mismo formato que displacements."""
+        return self.modes[:,[i]]
+
+    def set_section(self,name,section):
+        """Cambia la sección de un elemento. Los resultados se actualizan con Reanalyze.
+
+        Parameters
+        ----------
+        name : str
+            Nombre del elemento.
+        section : Section object
+            Nueva sección del elemento.
+        """
+        if name not in self.Elements:
+            print(f"Error al cambiar la sección, el elemento {name} no ha sido definido")
+            return 0
+        e = self.Elements[name]
+        self.Sections[section.name] = section
+        e.store.set_section(e.row,section)
+
+    def remove_element(self,name):
+        """Elimina un elemento de la estructura. Los resultados se actualizan con Reanalyze.
+
+        Parameters
+        ----------
+        name : str
+            Nombre del elemento.
+        """
+        if name not in self.Elements:
+            print(f"Error al eliminar el elemento, el elemento {name} no ha sido definido")
+            return 0
+        e = self.Elements.pop(name)
+        e.store.remove(e.row)
+
+    def _base_compatible(self):
+        """True si el último Analyze tiene los mismos nudos, apoyos y superelementos que el modelo actual, de modo
+        que los cambios de elementos se pueden incorporar sobre su factorización (ver Reanalyze)."""
+        base = getattr(self,"_base",None)
+        return (base is not None and base["nGdL"] == self.nGdL and base["constraints"] == self.restrained
+                and base["superelements"] == len(self.superelements))
+
+    def _edits(self):
+        """Barras modificadas desde el último Analyze, comparando EA/L, cosenos y grados de libertad con _base.
+
+        Returns
+        -------
+        rows : ndarray
+            Filas con otra rigidez (cambio de sección o de nudos, elementos agregados o eliminados).
+        moved : ndarray
+            Filas de rows cuya geometría cambió y que tenían rigidez, que se retira aparte.
+        same : ndarray (n,)
+            True en las filas con los mismos cosenos y grados de libertad.
+        k0, cx0, cy0, GdL0 : ndarray
+            Valores de _base, con ceros en las filas agregadas después.
+        """
+        base,st = self._base,self.store
+        st.update()
+        n0 = len(base["k_axial"])
+        k0,cx0,cy0,GdL0 = zeros(st.n),zeros(st.n),zeros(st.n),zeros((st.n,st.width),dtype=int)
+        k0[:n0],cx0[:n0],cy0[:n0],GdL0[:n0] = base["k_axial"],base["cx"],base["cy"],base["GdL"]
+        same = (cx0 == st.cx) & (cy0 == st.cy) & (GdL0 == st.GdL[:st.n]).all(axis=1)
+        rows = flatnonzero((k0 != st.k_axial) | ~same)
+        moved = rows[~same[rows] & (k0[rows] != 0)]
+        return rows,moved,same,k0,cx0,cy0,GdL0
+
+    def _base_current(self):
+        """True si la factorización del último Analyze (_base["factor"]) corresponde al modelo actual: mismos
+        nudos, apoyos y superelementos y ningún elemento modificado desde entonces."""
+        if not self._base_compatible() or len(self._edits()[0]): return False
+        others = self._base["stores"]
+        # update crea arreglos nuevos de rigidez con cada cambio, por lo que basta comparar la identidad
+        return all(st.k is others.get(kind) for kind,st in self.stores.items() if kind != "truss" and st.n)
+
+    def Reanalyze(self,max_updates=32,tol=1e-12):
+        """Actualiza los resultados después de cambios locales sin volver a ensamblar ni factorizar K_r.
+
+        Los elementos modificados desde el último Analyze (cambio de sección, elementos agregados entre nudos
+        existentes o eliminados) se incorporan como actualizaciones de rango 1 sobre la factorización existente.
+        Solo se recalculan los elementos cuyos desplazamientos cambiaron. Si hay nudos o restricciones nuevas, más
+        de max_updates elementos modificados o elementos de otros tipos que la barra, se hace un Analyze completo.
+
+        Parameters
+        ----------
+        max_updates : int
+            Número máximo de elementos modificados antes de volver a factorizar.
+        tol : float
+            Variación de desplazamiento, relativa al mayor desplazamiento de cada caso, por debajo de la cual un
+            grado de libertad se considera sin cambio (el redondeo de la actualización no cuenta como cambio).
+
+        Returns
+        -------
+        str
+            "woodbury" si se actualizó la factorización, "refactor" si se hizo un Analyze completo.
+        """
+        from scipy.sparse import coo_matrix
+        from solvers import UpdatedFactorization,assemble
+        if not self._base_compatible() or any(st.n for st in self._other_stores()):
+            self.Analyze(getattr(self,"solver","sparse"))
+            return "refactor"
+        base,st = self._base,self.store
+        rows,moved,same,k0,cx0,cy0,GdL0 = self._edits()
+        if len(rows) + len(moved) > max_updates:
+            self.Analyze(self.solver)
+            return "refactor"
+        with self._phase("reanalysis") as stats:
+            # Columnas de la actualización: (grados de libertad, cosenos, variación de EA/L)
+            G = vstack((st.GdL[rows],GdL0[moved]))
+            c = vstack((stack((st.cx[rows],st.cy[rows]),axis=1),stack((cx0[moved],cy0[moved]),axis=1)))
+            d = concatenate((st.k_axial[rows] - where(same[rows],k0[rows],0.0),-k0[moved]))
+            v = hstack((c,-c))      # Vector (cx,cy,-cx,-cy) de cada columna
+            fidx = full(self.nGdL,-1)
+            fidx[self.free] = arange(len(self.free))
+            dK = assemble(G,d[:,None,None]*v[:,:,None]*v[:,None,:],self.nGdL)
+            self.K = base["K"] + (dK.toarray() if self.solver == "dense" else dK)
+            self.K_r = base["K_r"] + (dK[self.free][:,self.free].toarray() if self.solver == "dense" else dK[self.free][:,self.free])
+            m = len(d)
+            r = fidx[G].ravel()
+            keep = r >= 0
+            C = coo_matrix((v.ravel()[keep],(r[keep],arange(m).repeat(4)[keep])),shape=(len(self.free),m))
+            self.factor = UpdatedFactorization(base["factor"],C,d) if m else base["factor"]
+            if stats is not None: stats.update(updates=m,kind=self.factor.kind)
+        # Nueva solución para todos los casos de carga
+        F_cases,U_cases,R_cases = self._solve_cases()
+        # Solo se recalculan los elementos con desplazamientos modificados
+        if U_cases.shape == self.U_cases.shape:
+            changed = (abs(U_cases - self.U_cases) > tol*abs(U_cases).max(axis=0)).any(axis=1)
+        else:
+            changed = ones(self.nGdL,dtype=bool)
+        mask = changed[st.GdL[:st.n]].any(axis=1)
+        mask[rows] = True
+        affected = flatnonzero(mask)
+        N_cases = zeros((st.n,len(self.cases)))
+        if U_cases.shape == self.U_cases.shape: N_cases[:len(self.N_cases)] = self.N_cases
+        N_cases[affected] = st.axial(U_cases,affected)
+        self.F_cases,self.U_cases,self.R_cases,self.N_cases = F_cases,U_cases,R_cases,N_cases
+        self._recover(affected)
+        return "woodbury"
+
+    def _case_vector(self,name,M):
+        """Columna de M (nGdL × casos) para un caso o una combinación."""
+        if name in self.load_cases:
+            return M[:,[self.cases.index(name)]]
+        factors = self.combinations[name]
+        v = zeros((M.shape[0],1))
+        for case,f in factors.items():
+            v[:,0] += f*M[:,self.cases.index(case)]
+        return v
+
+    def displacements(self,name="Default"):
+        """Vector de desplazamientos (nGdL,1) de un caso de carga o una combinación."""
+        return self._case_vector(name,self.U_cases)
+
+    def loads(self,name="Default"):
+        """Vector de fuerzas nodales (nGdL,1) de un caso de carga o una combinación."""
+        return self._case_vector(name,self.F_cases)
+
+    def reactions(self,name="Default"):
+        """Vector de reacciones (nGdL,1) de un caso de carga o una combinación, nulo en los grados de libertad libres."""
+        return self._case_vector(name,self.R_cases)
+
+    def axial_forces(self,name="Default"):
+        """Diccionario {elemento: fuerza axial} de un caso de carga o una combinación (tracción positiva)."""
+        N = self._case_vector(name,self.N_cases)[:,0]
+        return self._by_name(N.tolist())
+
+    def element_results(self,name="Default"):
+        """Fuerza axial, esfuerzo, deformación unitaria y alargamiento de todos los elementos para un caso de carga
+        o una combinación, calculados en un solo paso vectorizado la primera vez que se piden.
+
+        Returns
+        -------
+        ElementResults object
+        """
+        if name not in self._element_results:
+            U = self._case_vector(name,self.U_cases)
+            names,values = [],[]
+            for st in self.stores.values():
+                rows = flatnonzero(st.active[:st.n])
+                names += [st.names[k] for k in rows]
+                values.append(hstack(st.recover(U,rows)))     # Columnas: alargamiento, N, esfuerzo, deformación
+            elong,N,stress,strain = vstack(values).T
+            self._element_results[name] = ElementResults(names,N,stress,strain,elong)
+        return self._element_results[name]
+
+    def select_case(self,name):
+        """Toma un caso de carga o combinación como resultado activo (U, F y fuerzas de los elementos)."""
+        self.F = self.loads(name)
+        self.U = self.displacements(name)
+        self.R = self.reactions(name)
+        for st in self.stores.values(): st.deform(self.U)
+
+    def envelope(self,names=None):
+        """Envolvente de fuerzas axiales de los elementos.
+
+        Parameters
+        ----------
+        names : list, optional
+            Casos y combinaciones considerados. Por defecto todos.
+
+        Returns
+        -------
+        dict
+            {elemento: (N máxima, N mínima)}
+        """
+        if names is None: names = self.cases + list(self.combinations)
+        N = hstack([self._case_vector(name,self.N_cases) for name in names])
+        return self._by_name(list(zip(N.max(axis=1).tolist(),N.min(axis=1).tolist())))
+
+    def frame_forces(self,name="Default"):
+        """Fuerzas en los extremos de los elementos de pórtico en ejes locales para un caso de carga o una
+        combinación.
+
+        Returns
+        -------
+        dict
+            {elemento: (N_i, V_i, M_i, N_f, V_f, M_f)}, con la convención de f_l (N_f positiva en tracción).
+        """
+        st = self.stores.get("frame")
+        if st is None: return {}
+        f = st.end_forces(self._case_vector(name,self.U_cases))[:,:,0]
+        return st.by_name([tuple(row) for row in f.tolist()])
     
-    def to_excel(self):
+    def sweep(self,variants,processes=None,allowable=None):
+        """Analiza variantes de esta estructura en paralelo (ver sweep.sweep). Devuelve un generador de resúmenes."""
+        from sweep import sweep
+        return sweep(self,variants,processes,allowable)
+
+    def influence_lines(self,path,elements=None,load={"y":-1},method="auto"):
+        """Líneas de influencia de la fuerza axial para una carga unitaria que recorre los nudos de path, con una
+        sola factorización de K_r para todas las posiciones (ver influence.influence_lines).
+
+        Returns
+        -------
+        InfluenceLines object
+        """
+        from influence import influence_lines
+        return influence_lines(self,path,elements,load,method,getattr(self,"solver","sparse"))
+
+    def moving_load(self,path,train,elements=None,load={"y":-1},reverse=True):
+        """Envolvente de fuerzas axiales de un tren de cargas que recorre los nudos de path.
+
+        Parameters
+        ----------
+        path : list
+            Nudos de la trayectoria, en orden.
+        train : iterable
+            Ejes del tren como pares (distancia detrás del primer eje, carga), por ejemplo [(0,145),(4.3,145)].
+        elements : list, optional
+            Elementos pedidos. Por defecto todos.
+        load : dict
+            Dirección de las cargas del tren, por defecto {"y":-1} (hacia abajo).
+        reverse : bool
+            Considera también el tren recorriendo path en sentido contrario.
+
+        Returns
+        -------
+        dict
+            {elemento: (N máxima, N mínima, posición de la máxima, posición de la mínima)}
+        """
+        return self.influence_lines(path,elements,load).envelope(train,reverse=reverse)
+
+    def save_results(self,directory,include_K=False):
+        """Guarda el modelo y los resultados como arreglos binarios .npy (ver results.load_results para leerlos).
+
+        Parameters
+        ----------
+        directory : str
+            Directorio de destino.
+        include_K : bool
+            Guarda también la matriz de rigidez global en formato disperso.
+        """
+        from results import save_results
+        save_results(self,directory,include_K)
+
+    def _k_format(self,k_format,max_k):
+        if k_format == "auto": return "dense" if self.nGdL <= max_k else "sparse"
+        if k_format not in ("dense","sparse","none"):
+            raise ValueError(f"Formato de matriz de rigidez desconocido: {k_format}")
+        return k_format
+
+    def element_rows(self):
+        """Filas de la tabla resumen de elementos, la primera es el encabezado."""
+        yield ["Element","Joint i","Joint f","Section","E","A","L","cx","cy","N","Elongation"]
+        for st in self.stores.values():
+            st.update()
+            f = st.LOCAL//2     # Componente axial del nudo final en u_l y f_l
+            N = st.f_l[:,f].tolist()
+            elong = (st.u_l[:,f] - st.u_l[:,0]).tolist()
+            E,A,L,cx,cy = st.E.tolist(),st.A.tolist(),st.L.tolist(),st.cx.tolist(),st.cy.tolist()
+            for i in flatnonzero(st.active[:st.n]).tolist():
+                yield [st.names[i],st.Ji[i],st.Jf[i],st.sections[i],E[i],A[i],L[i],cx[i],cy[i],N[i],elong[i]]
+
+    def dof_rows(self):
+        """Filas de la tabla de grados de libertad (desplazamiento, fuerza y reacción), la primera es el encabezado."""
+        yield ["DoF","Joint","Dir.","Restrained","Disp.","Forces","Reactions"]
+        U,F,R = self.U[:,0].tolist(),self.F[:,0].tolist(),self.R[:,0].tolist()
+        for name,J in self.Joints.items():
+            for d,g in zip(("X","Y","RZ"),J.GdL):
+                yield [g,name,d,g in self.restrained,U[g],F[g],R[g]]
+
+    def mode_rows(self):
+        """Filas de la tabla de modos de vibración, la primera es el encabezado y la segunda las frecuencias."""
+        k = self.modes.shape[1]
+        yield ["DoF","Joint","Dir."] + [f"Mode {i+1}" for i in range(k)]
+        yield ["f (Hz)","",""] + self.frequencies.tolist()
+        modes = self.modes.tolist()
+        for name,J in self.Joints.items():
+            for d,g in zip(("X","Y","RZ"),J.GdL):
+                yield [g,name,d] + modes[g]
+
+    def k_rows(self):
+        """Términos no nulos del triángulo superior de K como filas (i, j, K_ij), la primera es el encabezado."""
+        from scipy.sparse import coo_matrix,triu
+        yield ["i","j","K_ij"]
+        K = triu(coo_matrix(self.K)).tocsr().tocoo()   # Ordenado por fila
+        yield from zip(K.row.tolist(),K.col.tolist(),K.data.tolist())
+
+    def to_excel(self,path=None,write_only=False,k_format="auto",max_k=200,max_blocks=100):
+        """Exporta el modelo y los resultados a un libro de Excel.
+
+        Parameters
+        ----------
+        path : str or file object, optional
+            Si se indica, el libro se guarda directamente en ese archivo o stream.
+        write_only : bool
+            Escribe en modo streaming (openpyxl write-only) con estilos con nombre compartidos: tablas de
+            elementos, grados de libertad y K en hojas separadas, sin guardar el libro completo en memoria.
+            En este modo path es obligatorio.
+        k_format : str
+            "dense" escribe la matriz K completa, "sparse" solo sus términos no nulos (i, j, K_ij) del triángulo
+            superior en la hoja "K", "none" no la escribe y "auto" usa "dense" hasta max_k grados de libertad.
+        max_k : int
+            Número de grados de libertad hasta el cual "auto" escribe K completa.
+        max_blocks : int
+            Con más elementos se escribe una tabla resumen en lugar de un bloque de 22 filas por elemento.
+
+        Returns
+        -------
+        Workbook object
+        """
+        k_format = self._k_format(k_format,max_k)
+        with self._phase("excel") as stats:
+            if stats is not None: stats.update(write_only=write_only,k_format=k_format,elements=len(self.Elements))
+            if write_only: return self._to_excel_stream(path,k_format)
+            return self._to_workbook(path,k_format,max_blocks)
+
+    def _to_workbook(self,path,k_format,max_blocks):
+        from openpyxl import Workbook
+        from functions import cellStyle
+        from scipy.sparse import issparse
         wb = Workbook()
         sh1 = wb.create_sheet("Truss",0)
         cellStyle(sh1,col=2,ren=2,val="GENERAL",mergeCell=8,color="FFFF00",aline=True,bold=True)
@@ -279,20 +1772,80 @@ class TrussStructure():
         cellStyle(sh1,col=2,ren=4,val="Joints:",mergeCell=6,color="00FFCC",aline=False,bold=True)
         cellStyle(sh1,col=7,ren=4,val=len(self.Joints),mergeCell=8,color="9BFFEC",aline=True)
         cellStyle(sh1,col=2,ren=5,val="Degrees of Freedom:",mergeCell=6,color="00FFCC",aline=False,bold=True)
-        cellStyle(sh1,col=7,ren=5,val=2*len(self.Joints),mergeCell=8,color="9BFFEC",aline=True)
+        cellStyle(sh1,col=7,ren=5,val=self.nGdL,mergeCell=8,color="9BFFEC",aline=True)
         cellStyle(sh1,col=2,ren=6,val="Reactions:",mergeCell=6,color="00FFCC",aline=False,bold=True)
         cellStyle(sh1,col=7,ren=6,val=len(self.constraints),mergeCell=8,color="9BFFEC",aline=True)
-        j = 9
-        for elem in self.Elements:
-            self.Elements[elem].elemento_excel(sh1,2,j)
-            j += 22
-        n = int(2*len(self.Joints))
-        for i in range(n):
-            for j in range(n):
-                color = "9BFFEC" if i in self.constraints or j in self.constraints else "00FFCC"
-                bold = False if i in self.constraints or j in self.constraints else True
-                cellStyle(sh1,col=10+j,ren=4+i,val=self.K[i,j],color=color,aline=True,bold=bold)
-            cellStyle(sh1,col=11+n,ren=4+i,val=self.U[i,0],color=color,aline=True,bold=bold)
-            cellStyle(sh1,col=13+n,ren=4+i,val=self.F[i,0],color=color,aline=True,bold=bold)
+        if len(self.Elements) <= max_blocks and not any(st.n for st in self._other_stores()):  # Bloques de barras
+            j = 9
+            for elem in self.Elements:
+                self.Elements[elem].elemento_excel(sh1,2,j)
+                j += 22
+        else:
+            sh2 = wb.create_sheet("Elements",1)
+            for r,row in enumerate(self.element_rows()):
+                for c,val in enumerate(row):
+                    cellStyle(sh2,col=2+c,ren=2+r,val=val,color="99CCFF" if r == 0 else "CCECFF",aline=True,bold=r == 0)
+        if k_format == "dense":
+            n = self.nGdL
+            K = self.K.toarray() if issparse(self.K) else self.K
+            for i in range(n):
+                for j in range(n):
+                    color = "9BFFEC" if i in self.restrained or j in self.restrained else "00FFCC"
+                    bold = False if i in self.restrained or j in self.restrained else True
+                    cellStyle(sh1,col=10+j,ren=4+i,val=K[i,j],color=color,aline=True,bold=bold)
+                cellStyle(sh1,col=11+n,ren=4+i,val=self.U[i,0],color=color,aline=True,bold=bold)
+                cellStyle(sh1,col=13+n,ren=4+i,val=self.F[i,0],color=color,aline=True,bold=bold)
+                cellStyle(sh1,col=15+n,ren=4+i,val=self.R[i,0],color=color,aline=True,bold=bold)
+        else:
+            for r,row in enumerate(self.dof_rows()):
+                color = "00FFCC" if r == 0 else ("9BFFEC" if row[3] else "CCECFF")
+                for c,val in enumerate(row):
+                    cellStyle(sh1,col=10+c,ren=2+r,val=val,color=color,aline=True,bold=r == 0)
+            if k_format == "sparse":
+                sh3 = wb.create_sheet("K")
+                for r,row in enumerate(self.k_rows()):
+                    for c,val in enumerate(row):
+                        cellStyle(sh3,col=2+c,ren=2+r,val=val,color="D88BFF" if r == 0 else "F1D5FF",aline=True,bold=r == 0)
+        if self.modes is not None:
+            sh4 = wb.create_sheet("Modes")
+            for r,row in enumerate(self.mode_rows()):
+                for c,val in enumerate(row):
+                    cellStyle(sh4,col=2+c,ren=2+r,val=val,color="FFCC99" if r < 2 else "FFE5CC",aline=True,bold=r < 2)
+        if path is not None: wb.save(path)
         return wb
 
+    def _to_excel_stream(self,path,k_format):
+        from scipy.sparse import issparse
+        if path is None:
+            raise ValueError("La exportación write-only necesita un archivo o stream de destino")
+        from openpyxl import Workbook
+        from functions import StyledRows
+        wb = Workbook(write_only=True)
+        rows = StyledRows(wb)
+        sh1 = wb.create_sheet("Truss")
+        rows.row(sh1,["GENERAL",""],"FFFF00",True)
+        for label,val in (("Elements:",len(self.Elements)),("Joints:",len(self.Joints)),
+                          ("Degrees of Freedom:",self.nGdL),("Reactions:",len(self.constraints))):
+            sh1.append([rows.cell(sh1,label,"00FFCC",True),rows.cell(sh1,val,"9BFFEC")])
+        sh2 = wb.create_sheet("Elements")
+        for r,row in enumerate(self.element_rows()):
+            rows.row(sh2,row,"99CCFF" if r == 0 else "CCECFF",r == 0)
+        sh3 = wb.create_sheet("DoF")
+        for r,row in enumerate(self.dof_rows()):
+            rows.row(sh3,row,"00FFCC" if r == 0 else ("9BFFEC" if row[3] else "CCECFF"),r == 0)
+        if k_format != "none":
+            sh4 = wb.create_sheet("K")
+            if k_format == "dense":
+                K = self.K.toarray() if issparse(self.K) else self.K
+                rows.row(sh4,["DoF"] + list(range(self.nGdL)),"E8B9FF",True)
+                for i in range(self.nGdL):
+                    sh4.append([rows.cell(sh4,i,"E8B9FF",True)] + [rows.cell(sh4,v,"F1D5FF") for v in K[i].tolist()])
+            else:
+                for r,row in enumerate(self.k_rows()):
+                    rows.row(sh4,row,"D88BFF" if r == 0 else "F1D5FF",r == 0)
+        if self.modes is not None:
+            sh5 = wb.create_sheet("Modes")
+            for r,row in enumerate(self.mode_rows()):
+                rows.row(sh5,row,"FFCC99" if r < 2 else "FFE5CC",r < 2)
+        wb.save(path)
+        return wb
@@ -1,17 +1,59 @@
 import streamlit as st
-import plotly_express as px
 from io import BytesIO
-from tempfile import NamedTemporaryFile
-from Gadest import TrussStructure,Section
+from numpy.linalg import LinAlgError
+from Gadest import TrussStructure,Section,ModelError
+from plotting import geometry_figure,deformed_figure,auto_scale
 
 st.set_page_config(layout="wide")
 
-Armadura = TrussStructure()
+# Etapas del cálculo con caché: cada una se repite solo si cambian sus datos de entrada. Los colores y unidades
+# no forman parte de ninguna, por lo que cambiarlos no vuelve a resolver la estructura.
+def build_model(geometry,supports=()):
+    T = TrussStructure()
+    sections = {label: Section(label,E,A) for label,E,A in geometry[0]}
+    for label,x,y in geometry[1]:
+        T.add_joint(x,y,label)
+    for label,Ji,Jf,S in geometry[2]:
+        T.add_element(Ji,Jf,sections[S],label)
+    for J,DX,DY in supports:
+        T.add_constraint(J,{"x":DX,"y":DY})
+    return T
+
+@st.cache_resource(max_entries=16)
+def build_geometry(geometry):
+    """Etapa 1: secciones, nudos y elementos."""
+    return build_model(geometry)
+
+@st.cache_resource(max_entries=16)
+def factorize(geometry,supports):
+    """Etapa 2: ensamblaje y factorización de K_r para una geometría y sus apoyos."""
+    T = build_model(geometry,supports)
+    T.profile(condition=True,label="app")   # Registro de fases para el panel de diagnóstico
+    T.Analyze(check=True)
+    return T
+
+@st.cache_resource(max_entries=32)
+def solve(geometry,supports,loads):
+    """Etapa 3: solución de las cargas reutilizando la factorización de la etapa 2."""
+    T = factorize(geometry,supports).copy()    # Tablas de elementos propias, la factorización es compartida
+    T.forces = []
+    T.load_cases = {"Default": T.forces}
+    T.settlements = {}
+    T.combinations = {}
+    for J,D,V in loads:
+        T.add_nodal_force(J,{"x":V} if D == "DX" else {"y":V})
+    T.solve_loads()
+    return T
+
+@st.cache_data(max_entries=8)
+def excel_bytes(geometry,supports,loads):
+    """Libro de Excel de los resultados, se genera solo cuando se pide la descarga."""
+    T = solve(geometry,supports,loads)
+    data = BytesIO()
+    T.to_excel(data)
+    return data.getvalue()
 
 dict_Sections = {}
-dict_N = {}
-dict_Nudos = {}
-dict_Elem = {}
 
 with st.sidebar:
     T1,T2,T3,T4,T5 = st.tabs(["[ General ]","[ Section Properties ]","[ Draw Geometry ]","[ Assign ]","[ Analyze ]"])
@@ -62,7 +104,7 @@ with T2: #SECTION PROPERTIES
         with c1: S_label = str(i+1).zfill(2)+"-"+st.text_input(lab_n,label_visibility="collapsed",value="section")
         with c2: S_elas = st.number_input(lab_E,value=1.0,label_visibility="collapsed")
         with c3: S_area = st.number_input(lab_A,value=1.0,label_visibility="collapsed")
-        dict_Sections[S_label] = Section(S_label,S_elas,S_area)
+        dict_Sections[S_label] = (S_label,S_elas,S_area)
         lab_n += " "
         lab_A += " "
         lab_E += " "
@@ -73,9 +115,9 @@ with T3: #DRAW GEOMETRY
     with T3_1: #JOINTS
         st.write("Number of joints:")
         nNudos = st.number_input("nNudos",2,100,2,1,label_visibility="collapsed")
-        plot1 = px.line(x=[0],y=[0],labels={"x":f"x ({length_unit})","y":f"y ({length_unit})"},height=600)
         labX = f"Coord X ({length_unit}):"
         labY = f"Coord Y ({length_unit}):"
+        list_joints = []
         c1,c2,c3 = st.columns([1,2,2],gap="medium")
         with c1: st.write("**Joint**")
         with c2: st.write("**"+labX+"**")
@@ -90,9 +132,7 @@ with T3: #DRAW GEOMETRY
                 coord_x = st.number_input(labX,label_visibility="collapsed")
             with c3:
                 coord_y = st.number_input(labY,label_visibility="collapsed")
-            Armadura.add_joint(coord_x,coord_y,label)
-            plot1.update_layout(showlegend=False)
-            #plot1.add_scatter(x=[coord_x],y=[coord_y],mode="markers+text",marker={"color":col_joint,"size":15},name=label,text=label,textposition="bottom center")
+            list_joints.append((label,coord_x,coord_y))
             labX += " "
             labY += " "
         
@@ -108,7 +148,8 @@ with T3: #DRAW GEOMETRY
         with c2: st.write("**"+lab_i+"**")
         with c3: st.write("**"+lab_f+"**")
         with c4: st.write("**"+lab_S+"**")
-        #plot1.data = []
+        list_elements = []
+        joint_labels = [J[0] for J in list_joints]
         for i in range(nElements):
             label = "T"+str(i+1).zfill(2)
             c1,c2,c3,c4 = st.columns([1.2,2,2,2])
@@ -116,39 +157,21 @@ with T3: #DRAW GEOMETRY
                 st.write(" ")
                 st.write("**"+label+"**")
             with c2:
-                Joint_i = st.selectbox(lab_i,options=list(Armadura.J.keys()),label_visibility="collapsed")
+                Joint_i = st.selectbox(lab_i,options=joint_labels,label_visibility="collapsed")
             with c3:
-                copiaListaNudos = list(Armadura.J.keys())[:]
+                copiaListaNudos = joint_labels[:]
                 copiaListaNudos.remove(Joint_i)
                 Joint_f = st.selectbox(lab_f,options=copiaListaNudos,label_visibility="collapsed")
             with c4:
                 Sect = st.selectbox(lab_S,options=dict_Sections,label_visibility="collapsed")
-            Armadura.add_element(Joint_i,Joint_f,dict_Sections[Sect],label)
-            #plot1.add_scatter(x=[dict_N[Joint_i].X,dict_N[Joint_f].X],y=[dict_N[Joint_i].Y,dict_N[Joint_f].Y],mode="lines",line={"color":col_elem,"width":4},name=label)
-            #plot1.add_scatter(x=[0.5*(dict_N[Joint_i].X+dict_N[Joint_f].X)],y=[0.5*(dict_N[Joint_i].Y+dict_N[Joint_f].Y)],mode="lines+text",line={"color":col_elem,"width":4},name=label,text=label,textposition="bottom center")
+            list_elements.append((label,Joint_i,Joint_f,Sect))
             lab_i += " "
             lab_f += " "
             lab_S += " "
-        GdL = 0
-        for i in dict_Nudos:
-            dict_Nudos[i].use(GdL,GdL+1,GdL+2)
-            GdL += 3
-            #plot1.add_scatter(x=[dict_Nudos[i].X],y=[dict_Nudos[i].Y],mode="markers",marker={"color":col_joint,"size":15},name=i)
-
-x_max = Armadura.Joints["J01"].x
-x_min = Armadura.Joints["J01"].x
-y_max = Armadura.Joints["J01"].y
-y_min = Armadura.Joints["J01"].y
-for nudo in Armadura.Joints:
-    if Armadura.Joints[nudo].x < x_min:
-        x_min = Armadura.Joints[nudo].x
-    if Armadura.Joints[nudo].x > x_max:
-        x_max = Armadura.Joints[nudo].x
-    if Armadura.Joints[nudo].y < y_min:
-        y_min = Armadura.Joints[nudo].y
-    if Armadura.Joints[nudo].y > y_max:
-        y_max = Armadura.Joints[nudo].y
-dist_max = max(x_max-x_min,y_max-y_min)/5
+
+geometry = (tuple(dict_Sections.values()),tuple(list_joints),tuple(list_elements))
+Armadura = build_geometry(geometry)
+
 
 with T4: #ASSIGN
     T4_1,T4_2 = st.tabs(["[ Constraints ]","[ Loads ]"])
@@ -159,7 +182,7 @@ with T4: #ASSIGN
         with c2: st.write("**Joint**")
         with c3: st.write("**RX**")
         with c4: st.write("**RY**")
-        const = []
+        list_supports = []
         for i in Armadura.Joints:
             c1,c2,c3,c4,c5 = st.columns([2,1,1,1,2])
             with c2: st.write(i)
@@ -167,13 +190,7 @@ with T4: #ASSIGN
             label += " "
             with c4: DY = st.checkbox(label=label)
             label += " "
-            Armadura.add_constraint(i,{"x":int(DX),"y":int(DY)})
-            # if DX:
-            #     const.append(Armadura.Joints[i].gdl[0])
-            #     plot1.add_scatter(x=[dict_Nudos[i].X],y=[dict_Nudos[i].Y],marker={"symbol":"48","size":20,"color":col_const})
-            # if DY:
-            #     const.append(Armadura.Joints[i].gdl[1])
-            #     plot1.add_scatter(x=[dict_Nudos[i].X],y=[dict_Nudos[i].Y],marker={"symbol":"45","size":20,"color":col_const})
+            list_supports.append((i,int(DX),int(DY)))
 
     with T4_2:
         c1,c2 = st.columns(2)
@@ -202,35 +219,45 @@ with T4: #ASSIGN
             labJForces += " "
             labDForces += " "
             labVForces += " "
-            if D == "DX":
-                Armadura.add_nodal_force(J,{"x":V})
-                
-                #list_forces.append([dict_Nudos[J].gdl[0],V])
-                triang = "48" if V >= 0 else "47"
-                posit = "top left" if V >=0 else "top right"
-                #if V != 0: plot1.add_scatter(x=[dict_Nudos[J].X],y=[dict_Nudos[J].Y],mode="markers+text",marker={"symbol":triang,"size":20,"color":col_forces},text=str(abs(V))+" "+force_unit,textposition=posit,textfont={"size":18,"color":col_forces})
-                factor = -0.8 if V >= 0 else 0.8
-                #if V != 0: plot1.add_scatter(x=[dict_N[J].X + factor * dist_max,dict_N[J].X],y=[dict_N[J].Y,dict_N[J].Y],mode="lines",line={"color":col_forces,"width":4},name=label)
-            elif D == "DY":
-                Armadura.add_nodal_force(J,{"y":V})
-
-                #list_forces.append([dict_Nudos[J].gdl[1],V])
-                triang = "45" if V >= 0 else "46"
-                posit = "bottom right" if V >=0 else "top right"
-                #if V != 0: plot1.add_scatter(x=[dict_Nudos[J].X],y=[dict_Nudos[J].Y],mode="markers+text",marker={"symbol":triang,"size":20,"color":col_forces},text=str(abs(V))+" "+force_unit,textposition=posit,textfont={"size":18,"color":col_forces})
-                factor = -0.8 if V >= 0 else 0.8
-                #if V != 0: plot1.add_scatter(x=[dict_N[J].X,dict_N[J].X],y=[dict_N[J].Y+factor*dist_max,dict_N[J].Y],mode="lines",line={"color":col_forces,"width":4},name=label)
+            list_forces.append((J,D,V))
 
+colors = {"joint":col_joint,"element":col_elem,"support":col_const,"force":col_forces}
 with G1:
+    plot1 = geometry_figure(Armadura,list_supports,list_forces,colors,length_unit,force_unit)
     st.plotly_chart(plot1,use_container_width=True)
 
+analyzed = False
 with T5: # Analysis
     if st.checkbox("Analyze"):
-        Armadura.Analyze()
-        wb = Armadura.to_excel()
+        supports = tuple(list_supports)
+        loads = tuple(list_forces)
+        try:
+            Armadura = solve(geometry,supports,loads)
+        except ModelError as e:
+            st.error("The structure is unstable:\n\n" + "\n".join(f"- {msg}" for msg in e.errors))
+        except (LinAlgError,RuntimeError) as e:
+            st.error(f"The structure could not be analyzed, check its supports and geometry ({e}).")
+        else:
+            analyzed = True
+            st.download_button("Download Excel",data=lambda: excel_bytes(geometry,supports,loads),mime="xlsx",file_name="TrussStructure.xlsx")
+            with st.expander("Diagnostics"):
+                totals = Armadura.profiler.totals()
+                cols = st.columns(4)
+                cols[0].metric("Degrees of freedom",Armadura.nGdL)
+                cols[1].metric("Nonzeros of K",Armadura.K.nnz)
+                factorization = Armadura.profiler.last("factorization")
+                cols[2].metric("Condition estimate",f"{factorization['condition']:.3g}" if factorization else "-")
+                cols[3].metric("Total time",f"{sum(totals.values())*1e3:.2f} ms")
+                st.dataframe(Armadura.profiler.records,use_container_width=True)
 
-        with NamedTemporaryFile() as tmp:
-            wb.save(tmp.name)
-            data = BytesIO(tmp.read())
-
-        st.download_button("Download Excel",data=data,mime="xlsx",file_name="TrussStructure.xlsx")
+with G2: # Deformada
+    if not analyzed:
+        st.info("Analyze the structure to see its deformed shape.")
+    else:
+        c1,c2 = st.columns([3,1])
+        base_scale = auto_scale(Armadura)
+        with c1: factor = st.slider("Deformation scale",0.0,10.0,1.0,0.1,help=f"1 = {base_scale:.4g}× the displacements")
+        with c2: by_axial = st.checkbox("Color by axial force",value=True)
+        plot2 = deformed_figure(Armadura,factor*base_scale,by_axial,colors={"element":col_elem},length_unit=length_unit,
+                                force_unit=force_unit)
+        st.plotly_chart(plot2,use_container_width=True)
@@ -0,0 +1,228 @@
+"""Suite de pruebas de rendimiento por fases sobre las familias de generators.py.
+
+Uso
+---
+    python benchmark.py                                  familias y tamaños por defecto (10 a 10^4 elementos)
+    python benchmark.py --sizes 10,1e3,1e6 --families warren,grid --output bench.json
+    python benchmark.py --baseline base.json --threshold 0.15
+
+Fases medidas en cada modelo: build (generador), analyze (TrussStructure.Analyze completo) y, dentro de él, según
+los registros del perfilador (profiling.py): assembly (rigideces de los elementos y K en CSR), reduction
+(partición y K_r), solve (factorización y casos de carga) y recovery (fuerzas axiales, más la lectura diferida de
+los resultados y deformaciones de los elementos); por último excel (to_excel en modo write-only a memoria, solo
+hasta --excel-max elementos). Así la suite mide el mismo código que usan los modelos.
+
+El tiempo de cada fase es el mínimo de --repeat repeticiones sin trazado de memoria; la memoria pico de cada fase
+se mide aparte con tracemalloc en una repetición adicional. También se mide el tiempo de "import Gadest" en un
+intérprete nuevo (startup) y se registra si esa importación cargó alguna dependencia pesada (HEAVY_MODULES), que
+solo deben cargarse al resolver o al pedir su formato de salida; el tiempo se compara además con el de importar
+STARTUP_REFERENCE, las dependencias que cargaba "import Gadest" antes de diferirlas, y no debe superarlo. Los resultados se guardan en JSON y, si se indica
+--baseline, se comparan fase por fase; el programa termina con código 1 si hay regresiones.
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tracemalloc
+from datetime import datetime,timezone
+from io import BytesIO
+from os.path import abspath,dirname
+from time import perf_counter
+import numpy
+import scipy
+import generators
+
+PHASES = ("build","analyze","assembly","reduction","solve","recovery","excel")
+HEAVY_MODULES = ("scipy","openpyxl","plotly","streamlit")
+STARTUP_REFERENCE = "import numpy,openpyxl"     # Lo que importaba Gadest al cargarse antes de diferir scipy
+
+def _import_time(statement):
+    """Tiempo de una importación en un intérprete nuevo y dependencias pesadas que quedaron cargadas."""
+    code = (f"import sys,time;t=time.perf_counter();{statement};t=time.perf_counter()-t;"
+            f"print(t);print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))")
+    out = subprocess.run([sys.executable,"-c",code],capture_output=True,text=True,check=True,
+                         cwd=dirname(abspath(__file__))).stdout.split("\n")   # Gadest se importa desde este directorio
+    return float(out[0]),[m for m in out[1].split(",") if m]
+
+def startup(repeat=3):
+    """Tiempo de importación de Gadest y de STARTUP_REFERENCE en intérpretes nuevos (mínimo de repeat, alternados)
+    y dependencias pesadas cargadas por Gadest."""
+    best,reference,heavy = None,None,[]
+    for _ in range(repeat):
+        t,heavy = _import_time("import Gadest")
+        r,_ = _import_time(STARTUP_REFERENCE)
+        best = t if best is None else min(best,t)
+        reference = r if reference is None else min(reference,r)
+    return {"import_time": best,"reference_time": reference,"heavy_modules": heavy}
+
+# Fases de la suite medidas dentro de TrussStructure.Analyze: registros del perfilador que suma cada una
+ANALYZE_PHASES = {"assembly": ("assembly",),"reduction": ("reduction",),"solve": ("factorization","solve"),
+                  "recovery": ("recovery",)}
+
+def _analyze(T,memory=False):
+    """Ejecuta TrussStructure.Analyze con el perfilador y devuelve {fase: (tiempo, memoria pico)}.
+
+    analyze es el tiempo total de Analyze y las demás fases salen de sus registros (ver profiling.py). Las fuerzas
+    y deformaciones de los elementos se calculan recién cuando se leen, por lo que esa lectura se suma a recovery.
+    """
+    T.profile(memory=memory)
+    t = perf_counter()
+    T.Analyze("sparse")
+    total = perf_counter() - t
+    records = T.profiler.records
+    T.profile(False)
+    if memory:
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+    t = perf_counter()
+    T.element_results()
+    T.store.f_l
+    lazy = perf_counter() - t
+    lazy_mb = (tracemalloc.get_traced_memory()[1] - base)/2**20 if memory else None
+    out = {"analyze": (total,max((r["memory_mb"] for r in records),default=None) if memory else None)}
+    for phase,names in ANALYZE_PHASES.items():
+        rec = [r for r in records if r["phase"] in names]
+        out[phase] = (sum(r["time"] for r in rec),max((r["memory_mb"] for r in rec),default=None) if memory else None)
+    t,m = out["recovery"]
+    out["recovery"] = (t + lazy,max(m,lazy_mb) if memory else None)
+    return out
+
+def _measure(family,size,excel_max,memory=False):
+    """Tiempo y memoria pico de cada fase para un modelo nuevo de la familia. Las fases omitidas no aparecen."""
+    out = {}
+    if memory:
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+    t = perf_counter()
+    T = generators.with_elements(family,size)
+    out["build"] = (perf_counter() - t,(tracemalloc.get_traced_memory()[1] - base)/2**20 if memory else None)
+    out.update(_analyze(T,memory))
+    if len(T.Elements) <= excel_max:
+        if memory:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+        t = perf_counter()
+        T.to_excel(BytesIO(),write_only=True,k_format="sparse")
+        out["excel"] = (perf_counter() - t,(tracemalloc.get_traced_memory()[1] - base)/2**20 if memory else None)
+    return T,out
+
+def run_case(family,size,repeat=3,memory=True,excel_max=10**4):
+    """Mide las fases de un modelo de la familia con aproximadamente size elementos."""
+    times = {phase: None for phase in PHASES}
+    for _ in range(repeat):
+        T,out = _measure(family,size,excel_max)
+        for phase,(t,_) in out.items():
+            times[phase] = t if times[phase] is None else min(times[phase],t)
+    peaks = {phase: None for phase in PHASES}
+    if memory:
+        tracemalloc.start()
+        peaks.update({phase: m for phase,(_,m) in _measure(family,size,excel_max,True)[1].items()})
+        tracemalloc.stop()
+    return {"family": family,"size": size,"elements": len(T.Elements),"joints": len(T.Joints),"dofs": T.nGdL,
+            "nnz": int(T.K.nnz),"max_displacement": float(abs(T.U).max()),
+            "phases": {phase: {"time": times[phase],"peak_mb": peaks[phase]} for phase in PHASES}}
+
+def run(families,sizes,repeat=3,memory=True,excel_max=10**4,log=None):
+    """Ejecuta la suite completa y devuelve el documento de resultados."""
+    results = []
+    for family in families:
+        for size in sizes:
+            r = run_case(family,size,repeat,memory,excel_max)
+            results.append(r)
+            if log is not None: log(_row(r))
+    start = startup(repeat)
+    if log is not None:
+        log(f"startup import={_fmt(start['import_time'])} reference={_fmt(start['reference_time'])} "
+            f"heavy={','.join(start['heavy_modules']) or '-'}")
+    return {"startup": start,
+            "meta": {"date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                     "python": platform.python_version(),"numpy": numpy.__version__,"scipy": scipy.__version__,
+                     "machine": platform.machine(),"platform": platform.platform(),"repeat": repeat},
+            "results": results}
+
+def _row(r):
+    t = " ".join(f"{phase}={_fmt(r['phases'][phase]['time'])}" for phase in PHASES)
+    return f"{r['family']:>7} {r['elements']:>8} elem {r['dofs']:>8} GdL  {t}"
+
+def _fmt(t):
+    return "-" if t is None else (f"{t*1e3:.2f}ms" if t < 1 else f"{t:.2f}s")
+
+def compare(current,baseline,threshold=0.10,min_time=1e-3):
+    """Compara dos documentos de resultados fase por fase.
+
+    Una fase es regresión si su tiempo aumenta más de threshold (fracción) y más de min_time segundos, o si su
+    memoria pico aumenta más de threshold y más de 1 MB.
+
+    Returns
+    -------
+    rows : list
+        (familia, elementos, fase, tiempo base, tiempo actual, razón, memoria base, memoria actual, estado)
+    regressions : int
+        Número de fases con regresión.
+    """
+    base = {(r["family"],r["elements"]): r for r in baseline["results"]}
+    rows,regressions = [],0
+    for r in current["results"]:
+        b = base.get((r["family"],r["elements"]))
+        if b is None: continue
+        for phase in PHASES:
+            if phase not in b["phases"]: continue   # Fase que no existía cuando se guardó la base
+            t0,t1 = b["phases"][phase]["time"],r["phases"][phase]["time"]
+            m0,m1 = b["phases"][phase]["peak_mb"],r["phases"][phase]["peak_mb"]
+            if t0 is None or t1 is None: continue
+            ratio = t1/t0 if t0 > 0 else float("inf")
+            status = "ok"
+            if t1 - t0 > min_time and ratio > 1 + threshold: status = "SLOWER"
+            elif t0 - t1 > min_time and ratio < 1/(1 + threshold): status = "faster"
+            if m0 is not None and m1 is not None and m1 - m0 > 1.0 and m1 > m0*(1 + threshold):
+                status = "MEMORY" if status != "SLOWER" else "SLOWER+MEMORY"
+            regressions += status in ("SLOWER","MEMORY","SLOWER+MEMORY")
+            rows.append((r["family"],r["elements"],phase,t0,t1,ratio,m0,m1,status))
+    s0,s1 = baseline.get("startup"),current.get("startup")
+    if s0 and s1:
+        t0,t1 = s0["import_time"],s1["import_time"]
+        ratio = t1/t0 if t0 > 0 else float("inf")
+        status = "SLOWER" if t1 - t0 > min_time and ratio > 1 + threshold else "ok"
+        if t1 > s1.get("reference_time",float("inf")): status = "SLOWER"     # Más lento que sus dependencias previas
+        if s1["heavy_modules"]: status = "HEAVY " + ",".join(s1["heavy_modules"])
+        regressions += status != "ok"
+        rows.append(("startup",0,"import",t0,t1,ratio,None,None,status))
+    return rows,regressions
+
+def report(rows,regressions):
+    """Texto del reporte de comparación."""
+    def mb(m): return "-" if m is None else f"{m:.1f}"
+    lines = [f"{'family':>7} {'elem':>8} {'phase':>9} {'base':>10} {'now':>10} {'ratio':>6} {'MB base':>8} "
+             f"{'MB now':>8}  status"]
+    for family,elements,phase,t0,t1,ratio,m0,m1,status in rows:
+        lines.append(f"{family:>7} {elements:>8} {phase:>9} {_fmt(t0):>10} {_fmt(t1):>10} {ratio:>6.2f} {mb(m0):>8} "
+                     f"{mb(m1):>8}  {status}")
+    lines.append(f"{regressions} regresiones en {len(rows)} fases comparadas")
+    return "\n".join(lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pruebas de rendimiento de Gadest por fases")
+    parser.add_argument("--families",default=",".join(generators.FAMILIES))
+    parser.add_argument("--sizes",default="10,100,1000,10000",help="número aproximado de elementos, ej. 10,1e3,1e6")
+    parser.add_argument("--repeat",type=int,default=3)
+    parser.add_argument("--no-memory",action="store_true",help="no mide la memoria pico (tracemalloc)")
+    parser.add_argument("--excel-max",type=int,default=10**4,help="máximo de elementos para medir to_excel")
+    parser.add_argument("--output",default="benchmark.json")
+    parser.add_argument("--baseline",help="resultados previos para comparar")
+    parser.add_argument("--threshold",type=float,default=0.10,help="aumento relativo considerado regresión")
+    args = parser.parse_args(argv)
+    sizes = [int(float(s)) for s in args.sizes.split(",")]
+    doc = run(args.families.split(","),sizes,args.repeat,not args.no_memory,args.excel_max,log=print)
+    with open(args.output,"w",encoding="utf-8") as f:
+        json.dump(doc,f,indent=1)
+    print(f"Resultados guardados en {args.output}")
+    if args.baseline:
+        with open(args.baseline,encoding="utf-8") as f:
+            rows,regressions = compare(doc,json.load(f),args.threshold)
+        print(report(rows,regressions))
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,176 @@
+"""Análisis de modelos desde la línea de comandos, sin Streamlit.
+
+Uso
+---
+    python cli.py modelo.json                                  resumen de resultados en modelo.results.json
+    python cli.py modelos/ --formats json,csv,xlsx --out-dir resultados
+    python cli.py "casos/*.json" puente_csv/ --solver banded --check --timing
+
+Cada entrada puede ser un archivo JSON, un directorio con las tablas CSV de un modelo (joints.csv, ...), un
+directorio con varios modelos (archivos .json, salvo los resúmenes .results.json, y subdirectorios CSV) o un
+patrón glob. Todos los modelos se resuelven en el mismo proceso.
+
+Formatos de salida (--formats):
+
+    json    resumen por caso y combinación: desplazamientos, reacciones, fuerzas axiales y fuerzas en los
+            extremos de los elementos de pórtico
+    csv     tablas <modelo>.elements.csv y <modelo>.dofs.csv (caso por defecto)
+    npy     directorio <modelo>.results con los arreglos binarios de results.py
+    xlsx    libro de Excel (openpyxl)
+    html    figura de la deformada (plotly)
+
+Las dependencias pesadas se importan solo al escribir el formato que las usa, y Gadest solo después de leer los
+argumentos, por lo que --help no carga numpy ni scipy. Con --timing se informa el tiempo de importación de la
+biblioteca y el de cada etapa de cada modelo.
+"""
+import argparse
+import csv
+import json
+import sys
+from glob import glob
+from os import listdir,makedirs
+from os.path import basename,exists,isdir,isfile,join,normpath,splitext
+from time import perf_counter
+
+FORMATS = ("json","csv","npy","xlsx","html")
+
+def _is_csv_model(path):
+    return isdir(path) and exists(join(path,"joints.csv"))
+
+def find_models(inputs):
+    """Rutas de los modelos de una lista de archivos, directorios y patrones glob, sin repetidos y en orden."""
+    found = []
+    for item in inputs:
+        paths = sorted(glob(item)) if any(c in item for c in "*?[") else [item]
+        if not paths: raise FileNotFoundError(f"Ningún archivo coincide con {item}")
+        for path in paths:
+            if isfile(path) or _is_csv_model(path):
+                found.append(path)
+            elif isdir(path):
+                for name in sorted(listdir(path)):
+                    sub = join(path,name)
+                    model = name.lower().endswith(".json") and not name.lower().endswith(".results.json")
+                    if (isfile(sub) and model) or _is_csv_model(sub): found.append(sub)
+            else:
+                raise FileNotFoundError(f"No existe {path}")
+    return list(dict.fromkeys(normpath(p) for p in found))
+
+def load_model(path):
+    """Lee un modelo JSON o un directorio CSV (ver modelio.py)."""
+    from modelio import load_csv,load_json
+    return load_csv(path) if isdir(path) else load_json(path)
+
+def summary(T):
+    """Resumen de resultados de todos los casos y combinaciones, serializable en JSON."""
+    joints = list(T.Joints.items())
+    out = {"joints": len(T.Joints),"elements": len(T.Elements),"dofs": T.nGdL,"cases": {}}
+    for name in T.cases + list(T.combinations):
+        U = T.displacements(name)[:,0].tolist()
+        R = T.reactions(name)[:,0].tolist()
+        out["cases"][name] = {
+            "max_displacement": max((abs(u) for u in U),default=0.0),
+            "displacements": {j: [U[J.GdL[0]],U[J.GdL[1]]] for j,J in joints},
+            "reactions": {j: [R[J.GdL[0]],R[J.GdL[1]]] for j,J in joints
+                          if J.GdL[0] in T.restrained or J.GdL[1] in T.restrained},
+            "axial": T.axial_forces(name)}
+        if "frame" in T.stores: out["cases"][name]["frame_forces"] = T.frame_forces(name)
+    return out
+
+def _write_rows(path,rows):
+    with open(path,"w",newline="",encoding="utf-8") as f:
+        csv.writer(f).writerows(rows)
+
+def write_outputs(T,base,formats):
+    """Escribe los formatos pedidos con el prefijo base y devuelve los archivos creados."""
+    written = []
+    if "json" in formats:
+        with open(f"{base}.results.json","w",encoding="utf-8") as f:
+            json.dump(summary(T),f)
+        written.append(f"{base}.results.json")
+    if "csv" in formats:
+        _write_rows(f"{base}.elements.csv",T.element_rows())
+        _write_rows(f"{base}.dofs.csv",T.dof_rows())
+        written += [f"{base}.elements.csv",f"{base}.dofs.csv"]
+    if "npy" in formats:
+        T.save_results(f"{base}.results")
+        written.append(f"{base}.results")
+    if "xlsx" in formats:
+        T.to_excel(f"{base}.xlsx")
+        written.append(f"{base}.xlsx")
+    if "html" in formats:
+        from plotting import deformed_figure
+        deformed_figure(T).write_html(f"{base}.html",include_plotlyjs="cdn")
+        written.append(f"{base}.html")
+    return written
+
+def run(paths,formats=("json",),out_dir=None,solver="sparse",check=False,modal=0,log=print):
+    """Resuelve cada modelo y escribe sus resultados.
+
+    Returns
+    -------
+    list
+        Un registro por modelo: path, ok, error, outputs y el tiempo de cada etapa (load, analyze, modal, write).
+    """
+    records = []
+    if out_dir: makedirs(out_dir,exist_ok=True)
+    for path in paths:
+        name = splitext(basename(normpath(path)))[0]
+        base = join(out_dir,name) if out_dir else join(path,name) if isdir(path) else splitext(path)[0]
+        record = {"path": path,"ok": False,"error": None,"outputs": [],"times": {}}
+        try:
+            t = perf_counter()
+            T = load_model(path)
+            record["times"]["load"] = perf_counter() - t
+            t = perf_counter()
+            T.Analyze(solver,check=check)
+            record["times"]["analyze"] = perf_counter() - t
+            if modal:
+                t = perf_counter()
+                T.Modal(modal)
+                record["times"]["modal"] = perf_counter() - t
+            t = perf_counter()
+            record["outputs"] = write_outputs(T,base,formats)
+            record["times"]["write"] = perf_counter() - t
+            record["ok"] = True
+        except Exception as e:  # Un modelo con errores no detiene el lote
+            record["error"] = f"{type(e).__name__}: {e}"
+        records.append(record)
+        if log is not None: log(record)
+    return records
+
+def _line(record,timing):
+    if not record["ok"]: return f"ERROR {record['path']}: {record['error']}"
+    text = f"ok    {record['path']} -> {', '.join(record['outputs'])}"
+    if timing: text += "  (" + ", ".join(f"{k} {v*1e3:.1f} ms" for k,v in record["times"].items()) + ")"
+    return text
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Análisis de armaduras por lotes, sin interfaz gráfica")
+    parser.add_argument("inputs",nargs="+",help="archivos JSON, directorios o patrones glob")
+    parser.add_argument("--formats",default="json",help=f"formatos de salida separados por comas: {','.join(FORMATS)}")
+    parser.add_argument("--out-dir",help="directorio de salida, por defecto junto a cada modelo")
+    parser.add_argument("--solver",default="sparse",choices=("sparse","dense","banded"))
+    parser.add_argument("--check",action="store_true",help="revisa la estabilidad antes de resolver")
+    parser.add_argument("--modal",type=int,default=0,help="número de modos de vibración a calcular")
+    parser.add_argument("--timing",action="store_true",help="informa el tiempo de importación y de cada etapa")
+    parser.add_argument("--quiet",action="store_true",help="solo informa los errores")
+    args = parser.parse_args(argv)
+    formats = [f.strip() for f in args.formats.split(",") if f.strip()]
+    unknown = [f for f in formats if f not in FORMATS]
+    if unknown: parser.error(f"formatos desconocidos: {', '.join(unknown)}")
+    try:
+        paths = find_models(args.inputs)
+    except FileNotFoundError as e:
+        parser.error(str(e))
+    t = perf_counter()
+    import modelio     # Carga Gadest, numpy y scipy
+    startup = perf_counter() - t
+    if args.timing: print(f"Importación de la biblioteca: {startup*1e3:.1f} ms")
+    log = lambda r: print(_line(r,args.timing)) if not (args.quiet and r["ok"]) else None
+    records = run(paths,formats,args.out_dir,args.solver,args.check,args.modal,log)
+    failed = sum(not r["ok"] for r in records)
+    if not args.quiet or failed: print(f"{len(records) - failed} modelos resueltos, {failed} con errores")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
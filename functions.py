@@ -1,10 +1,13 @@
 # Librerías
+from functools import lru_cache
 from openpyxl import Workbook
-from openpyxl.styles import Font,Alignment,PatternFill,Color
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font,Alignment,PatternFill,Color,NamedStyle
 from openpyxl.styles.borders import Border,Side
 
-#Función de estilo
-def cellStyle(hoja,col,ren,val,mergeCell=False,color="FFFFFF",aline=False,bold=False):
+# Objetos de estilo compartidos, se crean una sola vez por combinación de color y negrita
+@lru_cache(maxsize=None)
+def styleObjects(color="FFFFFF",bold=False):
     # Tamaño y fuente de letra
     ft = Font(name="Arial Narrow",size=10,bold=bold)
     # Alineación
@@ -13,11 +16,17 @@ def cellStyle(hoja,col,ren,val,mergeCell=False,color="FFFFFF",aline=False,bold=F
     borde = Border(left=Side(style="thin"),right=Side(style="thin"),top=Side(style="thin"),bottom=Side(style="thin"))
     # Color de fondo
     bgFill = PatternFill(patternType='solid',fill_type='solid',fgColor=Color(color))
-    
+    return ft,ali,borde,bgFill
+
+#Función de estilo
+def cellStyle(hoja,col,ren,val,mergeCell=False,color="FFFFFF",aline=False,bold=False):
+    ft,ali,borde,bgFill = styleObjects(color,bold)
+
     # Asignar valores y estilo
-    hoja.cell(column=col,row=ren,value=val).font = ft
-    hoja.cell(column=col,row=ren).border = borde
-    hoja.cell(column=col,row=ren).fill = bgFill
+    cell = hoja.cell(column=col,row=ren,value=val)
+    cell.font = ft
+    cell.border = borde
+    cell.fill = bgFill
 
     # Combinarse o no combinarse
     if mergeCell != False:
@@ -25,4 +34,39 @@ def cellStyle(hoja,col,ren,val,mergeCell=False,color="FFFFFF",aline=False,bold=F
 
     # Alinear o no alinear
     if aline:
-        hoja.cell(column=col,row=ren).alignment = ali
+        cell.alignment = ali
+
+class StyledRows():
+    """Escribe filas con estilos con nombre (NamedStyle) compartidos, para hojas write-only.
+
+    Parameters
+    ----------
+    wb : Workbook object
+        Libro donde se registran los estilos.
+    """
+    def __init__(self,wb):
+        self.wb = wb
+        self.names = set()
+
+    def style(self,color,bold=False):
+        name = f"{color}{'-b' if bold else ''}"
+        if name not in self.names:
+            ft,ali,borde,bgFill = styleObjects(color,bold)
+            self.wb.add_named_style(NamedStyle(name=name,font=ft,alignment=ali,border=borde,fill=bgFill))
+            self.names.add(name)
+        return name
+
+    def cell(self,hoja,val,color,bold=False):
+        cell = WriteOnlyCell(hoja,value=val)
+        cell.style = self.style(color,bold)
+        return cell
+
+    def row(self,hoja,values,color,bold=False):
+        """Agrega una fila con el mismo estilo en todas sus celdas."""
+        style = self.style(color,bold)
+        cells = []
+        for val in values:
+            cell = WriteOnlyCell(hoja,value=val)
+            cell.style = style
+            cells.append(cell)
+        hoja.append(cells)
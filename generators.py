@@ -0,0 +1,110 @@
+"""Generadores de armaduras paramétricas de familias típicas, para pruebas de rendimiento y estudios.
+
+Todas las funciones devuelven un TrussStructure con apoyos y un caso de carga "Default", construido con las
+operaciones por columnas (add_joints, add_elements), por lo que sirven hasta ~10^6 elementos.
+"""
+from numpy import arange,column_stack,concatenate,full,repeat,tile
+from Gadest import TrussStructure,Section
+
+def _section(section):
+    return Section("S1",2.0e8,1.0e-3) if section is None else section
+
+def _build(x,y,names,Ji,Jf,section):
+    T = TrussStructure()
+    T.add_joints(x,y,names)
+    T.add_elements(Ji,Jf,[section]*len(Ji),[f"E{k}" for k in range(len(Ji))])
+    return T
+
+def _girder_loads(T,n,load):
+    T.add_constraint("B0",{"x":1,"y":1})
+    T.add_constraint(f"B{n}",{"x":0,"y":1})
+    for i in range(1,n):
+        T.add_nodal_force(f"B{i}",{"y":-load})
+
+def warren(n,span=None,height=None,section=None,load=10.0):
+    """Viga Warren de n paneles: cordón inferior, cordón superior y diagonales alternadas (4n-1 elementos)."""
+    span = 3.0*n if span is None else span
+    h = span/n if height is None else height
+    p = span/n
+    B = [f"B{i}" for i in range(n+1)]
+    Tn = [f"T{i}" for i in range(n)]
+    x = concatenate((arange(n+1)*p,arange(n)*p + p/2))
+    y = concatenate((full(n+1,0.0),full(n,h)))
+    Ji = B[:-1] + B[:-1] + Tn + Tn[:-1]
+    Jf = B[1:] + Tn + B[1:] + Tn[1:]
+    T = _build(x,y,B + Tn,Ji,Jf,_section(section))
+    _girder_loads(T,n,load)
+    return T
+
+def _pratt_howe(n,span,height,section,load,howe):
+    span = 3.0*n if span is None else span
+    h = span/n if height is None else height
+    p = span/n
+    B = [f"B{i}" for i in range(n+1)]
+    Tn = [f"T{i}" for i in range(n+1)]
+    x = concatenate((arange(n+1)*p,arange(n+1)*p))
+    y = concatenate((full(n+1,0.0),full(n+1,h)))
+    Ji = B[:-1] + Tn[:-1] + B
+    Jf = B[1:] + Tn[1:] + Tn
+    for i in range(n):     # Diagonales: en la Pratt bajan hacia el centro, en la Howe suben hacia el centro
+        toward_center = (i < n/2) != howe
+        Ji.append(Tn[i] if toward_center else B[i])
+        Jf.append(B[i+1] if toward_center else Tn[i+1])
+    T = _build(x,y,B + Tn,Ji,Jf,_section(section))
+    _girder_loads(T,n,load)
+    return T
+
+def pratt(n,span=None,height=None,section=None,load=10.0):
+    """Viga Pratt de n paneles con montantes y diagonales que bajan hacia el centro (4n+1 elementos)."""
+    return _pratt_howe(n,span,height,section,load,False)
+
+def howe(n,span=None,height=None,section=None,load=10.0):
+    """Viga Howe de n paneles con montantes y diagonales que suben hacia el centro (4n+1 elementos)."""
+    return _pratt_howe(n,span,height,section,load,True)
+
+def tower(n,width=2.0,panel=2.0,section=None,load=5.0):
+    """Torre reticulada en voladizo de n paneles con arriostramiento en X (5n elementos) y carga lateral."""
+    L = [f"L{i}" for i in range(n+1)]
+    R = [f"R{i}" for i in range(n+1)]
+    x = concatenate((full(n+1,0.0),full(n+1,width)))
+    y = concatenate((arange(n+1)*panel,arange(n+1)*panel))
+    Ji = L[:-1] + R[:-1] + L[1:] + L[:-1] + R[:-1]
+    Jf = L[1:] + R[1:] + R[1:] + R[1:] + L[1:]
+    T = _build(x,y,L + R,Ji,Jf,_section(section))
+    T.add_constraint("L0",{"x":1,"y":1})
+    T.add_constraint("R0",{"x":1,"y":1})
+    for i in range(1,n+1):
+        T.add_nodal_force(L[i],{"x":load})
+    return T
+
+def grid(nx,ny,spacing=1.0,section=None,load=1.0):
+    """Malla plana triangulada de nx×ny celdas (barras horizontales, verticales y una diagonal por celda),
+    apoyada en los extremos del borde inferior y cargada en todos los nudos del borde superior."""
+    ix = tile(arange(nx+1),ny+1)
+    iy = repeat(arange(ny+1),nx+1)
+    names = [f"N{i}_{j}" for i,j in zip(ix.tolist(),iy.tolist())]
+    idx = (iy*(nx+1) + ix).reshape(ny+1,nx+1)
+    h = column_stack((idx[:,:-1].ravel(),idx[:,1:].ravel()))
+    v = column_stack((idx[:-1,:].ravel(),idx[1:,:].ravel()))
+    d = column_stack((idx[:-1,:-1].ravel(),idx[1:,1:].ravel()))
+    e = concatenate((h,v,d))
+    T = _build(ix*spacing,iy*spacing,names,[names[k] for k in e[:,0].tolist()],[names[k] for k in e[:,1].tolist()],
+               _section(section))
+    T.add_constraint(names[idx[0,0]],{"x":1,"y":1})
+    T.add_constraint(names[idx[0,-1]],{"x":0,"y":1})
+    for k in idx[-1].tolist():
+        T.add_nodal_force(names[k],{"y":-load})
+    return T
+
+FAMILIES = {"warren": warren,"pratt": pratt,"howe": howe,"tower": tower,"grid": grid}
+
+def with_elements(family,n_elements,**kwargs):
+    """Modelo de una familia con aproximadamente n_elements elementos."""
+    if family in ("warren","pratt","howe"):
+        return FAMILIES[family](max(n_elements//4,1),**kwargs)
+    if family == "tower":
+        return tower(max(n_elements//5,1),**kwargs)
+    if family == "grid":
+        n = max(int((n_elements/3)**0.5),1)    # Una malla n×n tiene ~3n² barras
+        return grid(n,n,**kwargs)
+    raise ValueError(f"Familia desconocida: {family}")
@@ -0,0 +1,234 @@
+"""Líneas de influencia y cargas móviles.
+
+Una línea de influencia da la fuerza axial de cada elemento cuando una carga unitaria recorre una trayectoria de
+nudos (por ejemplo los nudos del tablero de un puente). Todas las posiciones comparten K_r, por lo que se
+factoriza una sola vez (o se reutiliza la factorización del último Analyze) y se resuelven todas juntas:
+
+- Directo: un lado derecho por nudo de la trayectoria, da las ordenadas de todos los elementos.
+- Adjunto (reciprocidad): un lado derecho por elemento pedido, K_r·λ = b_e con N_e = b_e'·U, y las ordenadas son
+  los valores de λ en los nudos de la trayectoria. Conviene cuando se piden menos elementos que nudos.
+
+Entre nudos la carga se reparte a los dos nudos vecinos (como un tablero de largueros simplemente apoyados), por
+lo que las líneas de influencia son lineales por tramos y el máximo de un tren de cargas concentradas ocurre con
+algún eje sobre un nudo. La envolvente evalúa exactamente esas posiciones.
+"""
+from numpy import arange,argmax,argmin,asarray,concatenate,cumsum,flatnonzero,full,hypot,interp,searchsorted,unique,\
+    zeros
+from scipy.sparse import coo_matrix
+from solvers import Factorization
+
+class InfluenceLines():
+    """Ordenadas de influencia de la fuerza axial de los elementos sobre una trayectoria de nudos.
+
+    Attributes
+    ----------
+    path : list
+        Nudos de la trayectoria, en orden.
+    stations : ndarray
+        Distancia de cada nudo al inicio de la trayectoria, medida a lo largo de ella.
+    elements : list
+        Elementos con ordenadas.
+    ordinates : ndarray (elementos,nudos)
+        Fuerza axial de cada elemento con la carga unitaria en cada nudo de la trayectoria.
+    """
+    def __init__(self,path,stations,elements,ordinates,load):
+        self.path = list(path)
+        self.stations = stations
+        self.elements = list(elements)
+        self.ordinates = ordinates
+        self.load = dict(load)
+        self._index = None
+
+    @property
+    def length(self):
+        return float(self.stations[-1]) if len(self.stations) else 0.0
+
+    @property
+    def index(self):
+        if self._index is None: self._index = {name: k for k,name in enumerate(self.elements)}
+        return self._index
+
+    def __getitem__(self,name):
+        """Ordenadas de un elemento en los nudos de la trayectoria."""
+        return self.ordinates[self.index[name]]
+
+    def __contains__(self,name):
+        return name in self.index
+
+    def __len__(self):
+        return len(self.elements)
+
+    def at(self,name,s):
+        """Ordenada de un elemento con la carga unitaria a distancia s del inicio (cero fuera de la trayectoria)."""
+        return interp(s,self.stations,self[name],left=0.0,right=0.0)
+
+    def _weights(self,s):
+        """Matriz dispersa (posiciones,nudos) que reparte una carga en s entre los dos nudos vecinos."""
+        s = asarray(s,dtype=float).reshape(-1)
+        st = self.stations
+        inside = (s >= st[0]) & (s <= st[-1])
+        k = searchsorted(st,s,side="right").clip(1,len(st) - 1) - 1     # Tramo de cada posición
+        span = st[k + 1] - st[k]
+        t = (s - st[k])/span.clip(min=1e-300)
+        p = arange(len(s))
+        rows = concatenate((p[inside],p[inside]))
+        cols = concatenate((k[inside],k[inside] + 1))
+        vals = concatenate((1.0 - t[inside],t[inside]))
+        return coo_matrix((vals,(rows,cols)),shape=(len(s),len(st))).tocsr()
+
+    def train_response(self,train,positions):
+        """Fuerza axial de todos los elementos para un tren de cargas en varias posiciones.
+
+        Parameters
+        ----------
+        train : iterable
+            Ejes del tren como pares (distancia detrás del eje de referencia, factor de la carga unitaria), por
+            ejemplo [(0,145),(4.3,145),(8.6,35)].
+        positions : array_like
+            Posiciones del eje de referencia (distancia 0) medidas desde el inicio de la trayectoria.
+
+        Returns
+        -------
+        ndarray (elementos,posiciones)
+        """
+        positions = asarray(positions,dtype=float).reshape(-1)
+        W = None
+        for offset,P in train:
+            w = P*self._weights(positions - offset)
+            W = w if W is None else W + w
+        if W is None: return zeros((len(self.elements),len(positions)))
+        return (W @ self.ordinates.T).T
+
+    def critical_positions(self,train):
+        """Posiciones del eje de referencia con algún eje sobre un nudo: contienen el máximo y el mínimo exactos."""
+        offsets = asarray([offset for offset,_ in train],dtype=float)
+        x = (self.stations[:,None] + offsets[None,:]).ravel()
+        return unique(x)
+
+    def envelope(self,train,positions=None,reverse=True):
+        """Envolvente de fuerzas axiales de un tren de cargas que recorre la trayectoria.
+
+        Parameters
+        ----------
+        train : iterable
+            Ejes del tren (ver train_response).
+        positions : array_like, optional
+            Posiciones del eje de referencia. Por defecto las posiciones críticas (ver critical_positions).
+        reverse : bool
+            Considera también el tren en sentido contrario (distancias de los ejes con signo cambiado).
+
+        Returns
+        -------
+        dict
+            {elemento: (N máxima, N mínima, posición de la máxima, posición de la mínima)}, con las posiciones del
+            eje de referencia.
+        """
+        trains = [list(train)]
+        if reverse: trains.append([(-offset,P) for offset,P in train])
+        Nmax = full(len(self.elements),-float("inf"))
+        Nmin = full(len(self.elements),float("inf"))
+        smax,smin = zeros(len(self.elements)),zeros(len(self.elements))
+        rows = arange(len(self.elements))
+        block = max(1,2**22//max(1,len(self.elements)))
+        for tr in trains:
+            xs = self.critical_positions(tr) if positions is None else asarray(positions,dtype=float).reshape(-1)
+            for start in range(0,len(xs),block):     # Por bloques de posiciones para acotar la memoria
+                x = xs[start:start+block]
+                R = self.train_response(tr,x)
+                imax,imin = argmax(R,axis=1),argmin(R,axis=1)
+                Rmax,Rmin = R[rows,imax],R[rows,imin]
+                better,worse = Rmax > Nmax,Rmin < Nmin
+                Nmax[better],smax[better] = Rmax[better],x[imax][better]
+                Nmin[worse],smin[worse] = Rmin[worse],x[imin][worse]
+        return {name: (float(Nmax[k]),float(Nmin[k]),float(smax[k]),float(smin[k]))
+                for k,name in enumerate(self.elements)}
+
+def _factor(T,solver):
+    """Factorización de K_r: la del último Analyze si sigue vigente, de lo contrario una nueva.
+
+    La del último Analyze se reutiliza si no cambiaron los nudos, los apoyos, los superelementos ni los elementos
+    (ver TrussStructure._base_current); después de set_section, add_element o remove_element se factoriza de nuevo
+    la K_r actual, aunque se haya llamado a Reanalyze.
+    """
+    if T._base_current(): return T._base["factor"],T.free
+    free,fixed = T.partition()
+    return Factorization(T.stiffness()[free][:,free],solver),free
+
+def influence_lines(T,path,elements=None,load={"y":-1},method="auto",solver="sparse"):
+    """Líneas de influencia de la fuerza axial de los elementos para una carga unitaria que recorre path.
+
+    Parameters
+    ----------
+    T : TrussStructure object
+        Estructura. No se modifican sus resultados.
+    path : list
+        Nudos de la trayectoria, en orden.
+    elements : list, optional
+        Elementos pedidos, de cualquier tipo (en los pórticos, su fuerza axial). Por defecto todos los activos.
+    load : dict
+        Componentes de la carga unitaria, por defecto {"y":-1} (hacia abajo).
+    method : str
+        "direct", "adjoint" o "auto" (adjunto si se piden menos elementos que nudos de la trayectoria).
+    solver : str
+        Tipo de factorización si no se puede reutilizar la del último Analyze (ver Factorization).
+
+    Returns
+    -------
+    InfluenceLines object
+    """
+    path = list(path)
+    if not path: raise ValueError("La trayectoria no tiene nudos")
+    missing = [name for name in path if name not in T.Joints]
+    if missing: raise ValueError(f"Nudos de la trayectoria que no existen o no tienen elementos: {missing[:20]}")
+    # Filas pedidas de cada store y su posición en las ordenadas
+    groups = {kind: ([],[]) for kind in T.stores}
+    if elements is None:
+        names = []
+        for kind,st in T.stores.items():
+            rows = flatnonzero(st.active[:st.n]).tolist()
+            groups[kind][0].extend(rows)
+            groups[kind][1].extend(range(len(names),len(names) + len(rows)))
+            names += [st.names[k] for k in rows]
+    else:
+        names = list(elements)
+        for pos,name in enumerate(names):
+            element = T.Elements[name]
+            groups[element.store.kind][0].append(element.row)
+            groups[element.store.kind][1].append(pos)
+    groups = [(T.stores[kind],asarray(rows,dtype=int),asarray(pos,dtype=int))
+              for kind,(rows,pos) in groups.items() if rows]
+    for st,_,_ in groups: st.update()
+    if method == "auto": method = "adjoint" if len(names) < len(path) else "direct"
+    if method not in ("direct","adjoint"): raise ValueError(f"Método desconocido: {method}")
+    xy = asarray([(T.J[name].x,T.J[name].y) for name in path],dtype=float)
+    stations = concatenate(([0.0],cumsum(hypot(*(xy[1:] - xy[:-1]).T))))
+    with T._phase("influence") as stats:
+        factor,free = _factor(T,solver)
+        fidx = full(T.nGdL,-1)
+        fidx[free] = arange(len(free))
+        # Vector de carga unitaria de cada nudo en grados de libertad libres (las cargas sobre apoyos no deforman)
+        dofs = asarray([T.Joints[name].GdL[:2] for name in path],dtype=int).reshape(-1,2)
+        comps = [(d,load.get(c,0.0)) for d,c in enumerate(("x","y")) if load.get(c,0.0) != 0]
+        ordinates = zeros((len(names),len(path)))
+        if method == "direct":
+            P = zeros((len(free),len(path)))
+            for d,v in comps:
+                f = fidx[dofs[:,d]]
+                P[f[f >= 0],flatnonzero(f >= 0)] += v
+            U = zeros((T.nGdL,len(path)))
+            U[free] = factor.solve(P).reshape(len(free),-1)
+            for st,rows,pos in groups: ordinates[pos] = st.axial(U,rows)
+        else:
+            # N_e = k_e·(c_e·u_f - c_e·u_i), con c_e = (cx,cy): b_e tiene 4 términos en las traslaciones de e
+            B = zeros((len(free),len(names)))
+            for st,rows,pos in groups:
+                c = concatenate((-st.cx[rows,None],-st.cy[rows,None],st.cx[rows,None],st.cy[rows,None]),axis=1)
+                g = fidx[st.GdL[rows][:,st.AXIAL]]
+                keep = g >= 0
+                e = pos[:,None].repeat(4,axis=1)
+                B += coo_matrix(((st.k_axial[rows,None]*c)[keep],(g[keep],e[keep])),shape=B.shape).toarray()
+            lam = zeros((T.nGdL,len(names)))
+            lam[free] = factor.solve(B).reshape(len(free),-1)
+            for d,v in comps: ordinates += v*lam[dofs[:,d]].T
+        if stats is not None: stats.update(method=method,positions=len(path),elements=len(names))
+    return InfluenceLines(path,stations,names,ordinates,load)
@@ -0,0 +1,444 @@
+"""Lectura y escritura de modelos completos en JSON y CSV.
+
+Esquema
+-------
+Un modelo está formado por tablas. Cada tabla es un objeto de columnas (listas del mismo largo) en JSON, o un
+archivo <tabla>.csv con las columnas como encabezado dentro de un directorio:
+
+    sections      name, E, A, I (opcional), density (opcional, para el análisis modal)
+    joints        name, x, y
+    elements      name, Ji, Jf, section, type (type opcional: "truss" por defecto o "frame")
+    supports      joint, x, y, rz             (1 restringido, 0 libre; rz opcional, giro de nudos de pórticos)
+    loads         joint, fx, fy, mz, case     (mz opcional, momento en nudos de pórticos; case opcional, "Default")
+    settlements   joint, dx, dy, rz, case     (opcional, desplazamientos prescritos en apoyos)
+    combinations  name, case, factor          (opcional)
+    cases         name                        (opcional, todos los casos de carga en orden, incluso los vacíos)
+
+Los superelementos (ver substructures.py) usan cuatro tablas opcionales más:
+
+    panels          panel, joint, x, y, boundary    nudos de cada panel en sus ejes (boundary 1 en los de borde, en
+                                                    el orden de Substructure.boundary)
+    panel_elements  panel, name, Ji, Jf, E, A, density
+    superelements   name, panel, boundary, joint, x, y, angle
+                                                    una fila por nudo de borde: nudo de la estructura al que se
+                                                    conecta, con la traslación (x, y) y el giro de la instancia
+    panel_loads     superelement, joint, fx, fy, case
+
+Ejemplo en JSON::
+
+    {"sections": {"name": ["S1"], "E": [2e8], "A": [0.001]},
+     "joints": {"name": ["J1","J2","J3"], "x": [0,4,2], "y": [0,0,3]},
+     "elements": {"name": ["T1","T2","T3"], "Ji": ["J1","J2","J1"], "Jf": ["J2","J3","J3"], "section": ["S1","S1","S1"]},
+     "supports": {"joint": ["J1","J2"], "x": [1,0], "y": [1,1]},
+     "loads": {"joint": ["J3"], "fx": [10], "fy": [-20]}}
+
+Las columnas se validan completas antes de construir el modelo y todos los errores se reportan juntos en un
+ModelError. Las columnas type, rz y mz solo se escriben si el modelo tiene elementos de pórtico.
+"""
+import csv
+import json
+from os import makedirs
+from os.path import exists,join
+from numpy import asarray,flatnonzero,hypot,unique
+from Gadest import ELEMENT_TYPES,TrussStructure,Section,ModelError,lookup
+
+SCHEMA = {  # tabla: (columnas obligatorias, columnas opcionales con su valor por defecto)
+    "sections": (("name","E","A"),{"I":1.0,"density":0.0}),
+    "joints": (("name","x","y"),{}),
+    "elements": (("name","Ji","Jf","section"),{"type":"truss"}),
+    "supports": (("joint",),{"x":0,"y":0,"rz":0}),
+    "loads": (("joint",),{"fx":0.0,"fy":0.0,"mz":0.0,"case":"Default"}),
+    "settlements": (("joint",),{"dx":None,"dy":None,"rz":None,"case":"Default"}),
+    "combinations": (("name","case","factor"),{}),
+    "cases": (("name",),{}),
+    "panels": (("panel","joint","x","y"),{"boundary":0}),
+    "panel_elements": (("panel","name","Ji","Jf","E","A"),{"density":0.0}),
+    "superelements": (("name","panel","boundary","joint"),{"x":0.0,"y":0.0,"angle":0.0}),
+    "panel_loads": (("superelement","joint"),{"fx":0.0,"fy":0.0,"case":"Default"}),
+}
+
+def _table(tables,name,errors):
+    """Columnas de una tabla con los valores por defecto completados, None si la tabla no existe."""
+    if name not in tables or tables[name] is None: return None
+    data = tables[name]
+    required,optional = SCHEMA[name]
+    missing = [c for c in required if c not in data]
+    if missing:
+        errors.append(f"Tabla {name}: faltan las columnas {', '.join(missing)}")
+        return None
+    n = len(data[required[0]])
+    cols = {}
+    for c in list(required) + list(optional):
+        if c in data:
+            cols[c] = list(data[c])
+            if len(cols[c]) != n:
+                errors.append(f"Tabla {name}: la columna {c} tiene {len(cols[c])} filas en lugar de {n}")
+                return None
+        else:
+            cols[c] = [optional[c]]*n
+    cols["_n"] = n
+    return cols
+
+def _numbers(cols,table,col,errors,dtype=float,allow_empty=False):
+    """Convierte una columna a número, reportando las filas inválidas."""
+    values = cols[col]
+    if allow_empty: values = [None if v in ("",None) else v for v in values]
+    try:
+        if allow_empty: return asarray([float("nan") if v is None else v for v in values],dtype=dtype)
+        return asarray(values,dtype=dtype)
+    except (TypeError,ValueError):
+        bad = []
+        for k,v in enumerate(values):
+            try: dtype(v)
+            except (TypeError,ValueError): bad.append(k)
+        errors += [f"Tabla {table}, fila {k+1}: valor no numérico en {col} ({values[k]!r})" for k in bad[:100]]
+        return None
+
+def _duplicates(names,table,errors):
+    u,counts = unique(asarray(names,dtype=str),return_counts=True)
+    errors += [f"Tabla {table}: nombre repetido {n}" for n in u[counts > 1][:100]]
+
+def _references(keys,names,table,col,target,errors):
+    """Índices de keys en names, reporta las referencias a nombres inexistentes."""
+    idx = lookup(asarray(keys,dtype=str),asarray(names,dtype=str))
+    errors += [f"Tabla {table}, fila {k+1}: {col} {keys[k]} no existe en {target}" for k in flatnonzero(idx < 0)[:100]]
+    return idx
+
+def _panel_tables(t,jnames,errors):
+    """Valida las tablas de los superelementos (panels, panel_elements, superelements y panel_loads).
+
+    Returns
+    -------
+    dict or None
+        "panels": {panel: (nudos, coordenadas, nudos de borde, filas de panel_elements)}, "instances": {nombre:
+        (panel, origen, ángulo, {nudo de borde: nudo de la estructura})}, "loads": filas (superelemento, nudo, fx,
+        fy, caso) y las columnas numéricas de panel_elements. None si el modelo no tiene superelementos.
+    """
+    P,Pe,Se,Pl = (t[name] for name in ("panels","panel_elements","superelements","panel_loads"))
+    if Se is None:
+        errors += [f"Tabla {name}: no hay tabla superelements" for name,table in
+                   (("panels",P),("panel_elements",Pe),("panel_loads",Pl)) if table is not None and table["_n"]]
+        return None
+    if P is None or Pe is None:
+        errors.append("Los superelementos necesitan las tablas panels y panel_elements")
+        return None
+    x,y,b = _numbers(P,"panels","x",errors),_numbers(P,"panels","y",errors),_numbers(P,"panels","boundary",errors,int)
+    E,A,rho = (_numbers(Pe,"panel_elements",c,errors) for c in ("E","A","density"))
+    ox,oy,angle = (_numbers(Se,"superelements",c,errors) for c in ("x","y","angle"))
+    fx,fy = (_numbers(Pl,"panel_loads",c,errors) for c in ("fx","fy")) if Pl is not None else ([],[])
+    if any(c is None for c in (x,y,b,E,A,rho,ox,oy,angle,fx,fy)): return None
+    errors += [f"Tabla panel_elements, fila {k+1}: E debe ser positivo" for k in flatnonzero(~(E > 0))[:100]]
+    errors += [f"Tabla panel_elements, fila {k+1}: A debe ser positiva" for k in flatnonzero(~(A > 0))[:100]]
+    panels = {}
+    for k,(panel,joint) in enumerate(zip(P["panel"],P["joint"])):
+        joints,xy,border,_ = panels.setdefault(str(panel),([],[],[],[]))
+        joints.append(str(joint))
+        xy.append((x[k],y[k]))
+        if b[k]: border.append(str(joint))
+    for name,(joints,_,border,_) in panels.items():
+        _duplicates(joints,f"panels (panel {name})",errors)
+        if not border: errors.append(f"Tabla panels: el panel {name} no tiene nudos de borde")
+    for k,panel in enumerate(str(p) for p in Pe["panel"]):
+        if panel not in panels:
+            errors.append(f"Tabla panel_elements, fila {k+1}: el panel {panel} no existe en panels")
+            continue
+        errors += [f"Tabla panel_elements, fila {k+1}: {c} {Pe[c][k]} no existe en el panel {panel}"
+                   for c in ("Ji","Jf") if str(Pe[c][k]) not in panels[panel][0]]
+        panels[panel][3].append(k)
+    _references([str(j) for j in Se["joint"]],jnames,"superelements","joint","joints",errors)
+    instances = {}
+    for k,(name,panel,local) in enumerate(zip(Se["name"],Se["panel"],Se["boundary"])):
+        name,panel,local = str(name),str(panel),str(local)
+        if panel not in panels:
+            errors.append(f"Tabla superelements, fila {k+1}: el panel {panel} no existe en panels")
+            continue
+        inst = instances.setdefault(name,(panel,(ox[k],oy[k]),angle[k],{}))
+        if inst[0] != panel:
+            errors.append(f"Tabla superelements, fila {k+1}: el superelemento {name} ya usa el panel {inst[0]}")
+        elif local not in panels[panel][2]:
+            errors.append(f"Tabla superelements, fila {k+1}: {local} no es un nudo de borde del panel {panel}")
+        else:
+            inst[3][local] = str(Se["joint"][k])
+    for name,(panel,_,_,joints) in instances.items():
+        missing = [j for j in panels[panel][2] if j not in joints]
+        if missing: errors.append(f"Tabla superelements: el superelemento {name} no conecta {', '.join(missing)}")
+    loads = []
+    for k,(name,joint) in enumerate(zip(Pl["superelement"],Pl["joint"]) if Pl is not None else ()):
+        name,joint = str(name),str(joint)
+        if name not in instances:
+            errors.append(f"Tabla panel_loads, fila {k+1}: el superelemento {name} no existe en superelements")
+        elif joint not in panels[instances[name][0]][0]:
+            errors.append(f"Tabla panel_loads, fila {k+1}: el nudo {joint} no existe en el panel {instances[name][0]}")
+        else:
+            loads.append((name,joint,fx[k],fy[k],str(Pl["case"][k])))
+    return {"panels": panels,"instances": instances,"loads": loads,"E": E.tolist(),"A": A.tolist(),
+            "rho": rho.tolist(),"elements": Pe}
+
+def _add_superelements(T,data):
+    """Crea los paneles de _panel_tables y agrega sus instancias a T."""
+    from substructures import Substructure
+    Pe = data["elements"]
+    subs = {}
+    for panel,(joints,xy,border,rows) in data["panels"].items():
+        P = TrussStructure()
+        P.add_joints([p[0] for p in xy],[p[1] for p in xy],joints)
+        sections = {}   # Una sección por combinación de E, A y densidad
+        for k in rows:
+            key = (data["E"][k],data["A"][k],data["rho"][k])
+            if key not in sections: sections[key] = Section(f"S{len(sections)+1}",key[0],key[1],1.0,key[2])
+        P.add_elements([str(Pe["Ji"][k]) for k in rows],[str(Pe["Jf"][k]) for k in rows],
+                       [sections[(data["E"][k],data["A"][k],data["rho"][k])] for k in rows],
+                       [str(Pe["name"][k]) for k in rows])
+        subs[panel] = Substructure(P,border,panel)
+    for name,(panel,origin,angle,joints) in data["instances"].items():
+        T.add_superelement(subs[panel],name,origin,angle,joints)
+
+def from_tables(tables):
+    """Construye un TrussStructure a partir de un diccionario de tablas por columnas (ver el esquema del módulo).
+
+    Raises
+    ------
+    ModelError
+        Con la lista de todos los errores encontrados.
+    """
+    errors = []
+    for name in ("sections","joints","elements"):
+        if name not in tables: errors.append(f"Falta la tabla {name}")
+    t = {name: _table(tables,name,errors) for name in SCHEMA}
+    if errors: raise ModelError(errors)
+    S,Jt,El = t["sections"],t["joints"],t["elements"]
+    E = _numbers(S,"sections","E",errors)
+    A = _numbers(S,"sections","A",errors)
+    I = _numbers(S,"sections","I",errors)
+    rho = _numbers(S,"sections","density",errors)
+    x = _numbers(Jt,"joints","x",errors)
+    y = _numbers(Jt,"joints","y",errors)
+    snames = [str(n) for n in S["name"]]
+    jnames = [str(n) for n in Jt["name"]]
+    enames = [str(n) for n in El["name"]]
+    _duplicates(snames,"sections",errors)
+    _duplicates(jnames,"joints",errors)
+    _duplicates(enames,"elements",errors)
+    if E is not None:
+        errors += [f"Tabla sections, fila {k+1}: E debe ser positivo" for k in flatnonzero(~(E > 0))[:100]]
+    if A is not None:
+        errors += [f"Tabla sections, fila {k+1}: A debe ser positiva" for k in flatnonzero(~(A > 0))[:100]]
+    if rho is not None:
+        errors += [f"Tabla sections, fila {k+1}: density no puede ser negativa" for k in flatnonzero(~(rho >= 0))[:100]]
+    kinds = [str(k or "truss").strip() or "truss" for k in El["type"]]
+    errors += [f"Tabla elements, fila {k+1}: tipo de elemento desconocido {c}" for k,c in enumerate(kinds)
+               if c not in ELEMENT_TYPES][:100]
+    Ji = [str(n) for n in El["Ji"]]
+    Jf = [str(n) for n in El["Jf"]]
+    i = _references(Ji,jnames,"elements","Ji","joints",errors)
+    f = _references(Jf,jnames,"elements","Jf","joints",errors)
+    s = _references([str(n) for n in El["section"]],snames,"elements","section","sections",errors)
+    ok = (i >= 0) & (f >= 0)
+    errors += [f"Tabla elements, fila {k+1}: el elemento {enames[k]} une el nudo {Ji[k]} consigo mismo"
+               for k in flatnonzero(ok & (i == f))[:100]]
+    if x is not None and y is not None:
+        L = hypot(x[f[ok]] - x[i[ok]],y[f[ok]] - y[i[ok]])
+        rows = flatnonzero(ok)[(L == 0) & (i[ok] != f[ok])]
+        errors += [f"Tabla elements, fila {k+1}: el elemento {enames[k]} tiene longitud 0" for k in rows[:100]]
+    used = set(Ji) | set(Jf)
+    panels = _panel_tables(t,jnames,errors)
+    if panels is not None: used.update(j for _,_,_,joints in panels["instances"].values() for j in joints.values())
+    rotating = {J for k,c in enumerate(kinds) if c != "truss" for J in (Ji[k],Jf[k])}    # Nudos con giro
+    defined = set(jnames)
+    for table in ("supports","loads","settlements"):
+        if t[table] is None: continue
+        joints = [str(n) for n in t[table]["joint"]]
+        _references(joints,jnames,table,"joint","joints",errors)
+        errors += [f"Tabla {table}, fila {k+1}: el nudo {n} no está conectado a ningún elemento"
+                   for k,n in enumerate(joints) if n in defined and n not in used][:100]
+    if t["supports"] is not None:
+        sx = _numbers(t["supports"],"supports","x",errors,int)
+        sy = _numbers(t["supports"],"supports","y",errors,int)
+        rz = _numbers(t["supports"],"supports","rz",errors,int)
+    if t["loads"] is not None:
+        fx = _numbers(t["loads"],"loads","fx",errors)
+        fy = _numbers(t["loads"],"loads","fy",errors)
+        mz = _numbers(t["loads"],"loads","mz",errors)
+        if mz is not None:
+            errors += [f"Tabla loads, fila {k+1}: el nudo {t['loads']['joint'][k]} no tiene giro (no tiene elementos "
+                       f"de pórtico)" for k in flatnonzero(mz != 0) if str(t["loads"]["joint"][k]) not in rotating][:100]
+    if t["settlements"] is not None:
+        dx = _numbers(t["settlements"],"settlements","dx",errors,allow_empty=True)
+        dy = _numbers(t["settlements"],"settlements","dy",errors,allow_empty=True)
+        dr = _numbers(t["settlements"],"settlements","rz",errors,allow_empty=True)
+        if dr is not None:
+            errors += [f"Tabla settlements, fila {k+1}: el nudo {t['settlements']['joint'][k]} no tiene giro (no "
+                       f"tiene elementos de pórtico)" for k in flatnonzero(dr == dr)
+                       if str(t["settlements"]["joint"][k]) not in rotating][:100]
+    if t["combinations"] is not None:
+        factors = _numbers(t["combinations"],"combinations","factor",errors)
+        cases = {"Default"}
+        for table in ("loads","settlements","panel_loads","cases"):
+            if t[table] is not None: cases.update(str(c) for c in t[table]["case" if table != "cases" else "name"])
+        errors += [f"Tabla combinations, fila {k+1}: el caso {c} no ha sido definido"
+                   for k,c in enumerate(t["combinations"]["case"]) if str(c) not in cases][:100]
+    if errors: raise ModelError(errors)
+
+    T = TrussStructure()
+    sections = [Section(n,e,a,inertia,d) for n,e,a,inertia,d in zip(snames,E.tolist(),A.tolist(),I.tolist(),rho.tolist())]
+    T.add_joints(x,y,jnames)
+    truss = [k for k,c in enumerate(kinds) if c == "truss"]     # Las barras se agregan por columnas
+    T.add_elements([Ji[k] for k in truss],[Jf[k] for k in truss],[sections[s[k]] for k in truss],
+                   [enames[k] for k in truss])
+    for k,c in enumerate(kinds):
+        if c != "truss": T.add_element(Ji[k],Jf[k],sections[s[k]],enames[k],c)
+    for sec in sections: T.Sections[sec.name] = sec
+    if t["cases"] is not None:
+        for case in t["cases"]["name"]: T.add_load_case(str(case))
+    if panels is not None: _add_superelements(T,panels)
+    if t["supports"] is not None:
+        for J,cx,cy,cr in zip(t["supports"]["joint"],sx.tolist(),sy.tolist(),rz.tolist()):
+            T.add_constraint(str(J),{"x":cx,"y":cy,"rz":cr})
+    if t["loads"] is not None:
+        for J,vx,vy,vm,case in zip(t["loads"]["joint"],fx.tolist(),fy.tolist(),mz.tolist(),t["loads"]["case"]):
+            T.add_nodal_force(str(J),{"x":vx,"y":vy,"rz":vm},str(case))
+    if t["settlements"] is not None:
+        for J,vx,vy,vr,case in zip(t["settlements"]["joint"],dx.tolist(),dy.tolist(),dr.tolist(),
+                                   t["settlements"]["case"]):
+            disp = {d: v for d,v in (("x",vx),("y",vy),("rz",vr)) if v == v}     # NaN = dirección sin desplazamiento prescrito
+            T.add_support_displacement(str(J),disp,str(case))
+    if panels is not None:
+        for name,joint,vx,vy,case in panels["loads"]: T.add_panel_force(name,joint,{"x":vx,"y":vy},case)
+    if t["combinations"] is not None:
+        combos = {}
+        for name,case,factor in zip(t["combinations"]["name"],t["combinations"]["case"],factors.tolist()):
+            combos.setdefault(str(name),{})[str(case)] = factor
+        for name,f in combos.items():
+            T.add_combination(name,f)
+    return T
+
+def _panel_rows(T):
+    """Tablas panels, panel_elements, superelements y panel_loads de los superelementos de T."""
+    panels = {"panel": [],"joint": [],"x": [],"y": [],"boundary": []}
+    elements = {"panel": [],"name": [],"Ji": [],"Jf": [],"E": [],"A": [],"density": []}
+    instances = {"name": [],"panel": [],"boundary": [],"joint": [],"x": [],"y": [],"angle": []}
+    loads = {"superelement": [],"joint": [],"fx": [],"fy": [],"case": []}
+    names = {}      # Nombre de cada Substructure, las instancias del mismo panel lo comparten
+    for inst in T.superelements.values():
+        sub = inst.sub
+        if id(sub) not in names:
+            name,k = sub.name,len(names)
+            while not name or name in names.values():    # Los paneles sin nombre o con nombre repetido se numeran
+                k += 1
+                name = f"{sub.name or 'P'}{k}"
+            names[id(sub)] = name
+            nb = len(sub.boundary)
+            for k,(j,(x,y)) in enumerate(zip(sub.joints,sub.xy.tolist())):
+                for col,v in zip(panels,(name,j,x,y,int(k < nb))): panels[col].append(v)
+            Ji,Jf = (sub.GdL[:,0]//2).tolist(),(sub.GdL[:,-1]//2).tolist()
+            for k,e in enumerate(sub.elements):
+                for col,v in zip(elements,(name,e,sub.joints[Ji[k]],sub.joints[Jf[k]],float(sub.E[k]),float(sub.A[k]),
+                                           float(sub.rho[k]))):
+                    elements[col].append(v)
+        x,y = inst.origin.tolist()
+        for local,joint in zip(sub.boundary,inst.joints):
+            for col,v in zip(instances,(inst.name,names[id(sub)],local,joint,x,y,inst.angle)): instances[col].append(v)
+        for case,f in inst.loads.items():
+            for k in flatnonzero(f.any(axis=1)).tolist():
+                for col,v in zip(loads,(inst.name,sub.joints[k],float(f[k,0]),float(f[k,1]),case)): loads[col].append(v)
+    return {"panels": panels,"panel_elements": elements,"superelements": instances,"panel_loads": loads}
+
+def to_tables(T):
+    """Tablas por columnas (ver el esquema del módulo) de un TrussStructure, incluidos los casos de carga vacíos y
+    los superelementos."""
+    frames = any(st.n for st in T._other_stores())  # Se escriben las columnas type, rz y mz
+    elements = {"name": [],"Ji": [],"Jf": [],"section": [],"type": []}
+    for st in T.stores.values():
+        rows = flatnonzero(st.active[:st.n]).tolist()
+        elements["name"] += [st.names[k] for k in rows]
+        elements["Ji"] += [st.Ji[k] for k in rows]
+        elements["Jf"] += [st.Jf[k] for k in rows]
+        elements["section"] += [st.sections[k] for k in rows]
+        elements["type"] += [st.kind]*len(rows)
+    label = {}  # Grado de libertad -> (nudo, dirección)
+    for name,J in T.Joints.items():
+        for d,g in zip(("x","y","rz"),J.GdL):
+            label[g] = (name,d)
+    tables = {
+        "sections": {"name": [s.name for s in T.Sections.values()],"E": [s.E for s in T.Sections.values()],
+                     "A": [s.A for s in T.Sections.values()],"I": [s.I for s in T.Sections.values()],
+                     "density": [s.rho for s in T.Sections.values()]},
+        "joints": {"name": list(T.J),"x": [J.x for J in T.J.values()],"y": [J.y for J in T.J.values()]},
+        "elements": elements,
+    }
+    supports = {}
+    for g in T.constraints:
+        name,d = label[g]
+        supports.setdefault(name,{"x":0,"y":0,"rz":0})[d] = 1
+    tables["supports"] = {"joint": list(supports),"x": [v["x"] for v in supports.values()],
+                          "y": [v["y"] for v in supports.values()],"rz": [v["rz"] for v in supports.values()]}
+    loads = {"joint": [],"fx": [],"fy": [],"mz": [],"case": []}
+    for case,forces in T.load_cases.items():
+        for g,v in forces:
+            name,d = label[g]
+            loads["joint"].append(name)
+            loads["fx"].append(float(v) if d == "x" else 0.0)
+            loads["fy"].append(float(v) if d == "y" else 0.0)
+            loads["mz"].append(float(v) if d == "rz" else 0.0)
+            loads["case"].append(case)
+    tables["loads"] = loads
+    settlements = {"joint": [],"dx": [],"dy": [],"rz": [],"case": []}
+    for case,values in T.settlements.items():
+        for g,v in values.items():
+            name,d = label[g]
+            settlements["joint"].append(name)
+            settlements["dx"].append(float(v) if d == "x" else None)
+            settlements["dy"].append(float(v) if d == "y" else None)
+            settlements["rz"].append(float(v) if d == "rz" else None)
+            settlements["case"].append(case)
+    tables["settlements"] = settlements
+    if not frames:
+        for table,col in (("elements","type"),("supports","rz"),("loads","mz"),("settlements","rz")):
+            del tables[table][col]
+    combinations = {"name": [],"case": [],"factor": []}
+    for name,factors in T.combinations.items():
+        for case,factor in factors.items():
+            combinations["name"].append(name)
+            combinations["case"].append(case)
+            combinations["factor"].append(float(factor))
+    tables["combinations"] = combinations
+    tables["cases"] = {"name": list(T.load_cases)}
+    if T.superelements: tables.update(_panel_rows(T))
+    return tables
+
+def load_json(path):
+    """Lee un modelo desde un archivo JSON (o un diccionario ya cargado)."""
+    if isinstance(path,dict): return from_tables(path)
+    with open(path,encoding="utf-8") as f:
+        return from_tables(json.load(f))
+
+def save_json(T,path):
+    """Guarda un modelo en un archivo JSON."""
+    with open(path,"w",encoding="utf-8") as f:
+        json.dump(to_tables(T),f)
+
+def read_csv(path):
+    """Lee un archivo CSV como un diccionario de columnas."""
+    with open(path,newline="",encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = [h.strip() for h in next(reader)]
+        columns = list(zip(*reader))
+    if not columns: columns = [()]*len(header)
+    return {h: list(c) for h,c in zip(header,columns)}
+
+def load_csv(directory):
+    """Lee un modelo desde un directorio con un archivo <tabla>.csv por tabla."""
+    tables = {}
+    for name in SCHEMA:
+        path = join(directory,f"{name}.csv")
+        if exists(path): tables[name] = read_csv(path)
+    return from_tables(tables)
+
+def save_csv(T,directory):
+    """Guarda un modelo como un archivo <tabla>.csv por tabla en un directorio."""
+    makedirs(directory,exist_ok=True)
+    for name,cols in to_tables(T).items():
+        with open(join(directory,f"{name}.csv"),"w",newline="",encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(list(cols))
+            writer.writerows(zip(*[["" if v is None else v for v in c] for c in cols.values()]))
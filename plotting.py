@@ -0,0 +1,159 @@
+"""Figuras de Plotly de la geometría y de la deformada, dibujadas con pocas trazas WebGL.
+
+Todos los elementos van en una sola traza Scattergl de líneas separadas por huecos (NaN entre segmentos), y los
+nudos, apoyos y cargas en una traza cada uno, por lo que el número de trazas no crece con el tamaño del modelo.
+En la deformada los elementos se agrupan en unos pocos intervalos de fuerza axial, uno por traza, con una traza
+de marcadores en el centro de cada elemento que da la barra de colores y el valor de cada uno al pasar el mouse.
+Los elementos de pórtico se dibujan como la cuerda entre sus extremos (desplazados, en la deformada).
+"""
+from numpy import abs as npabs,asarray,column_stack,concatenate,digitize,flatnonzero,full,linspace,nan,ravel,sqrt,vstack
+import plotly.graph_objects as go
+from plotly.colors import sample_colorscale
+
+LABELS_MAX = 200    # Con más nudos o elementos no se escriben sus nombres sobre la figura
+
+def segments(xi,yi,xf,yf):
+    """Coordenadas x, y de varios segmentos en una sola polilínea, con un hueco (NaN) después de cada uno."""
+    gap = full(len(xi),nan)
+    return ravel(column_stack((xi,xf,gap))),ravel(column_stack((yi,yf,gap)))
+
+def _repeat_names(names):
+    """Texto de cada punto de segments: el nombre del elemento en sus dos extremos y None en el hueco."""
+    text = []
+    for name in names: text += [name,name,None]
+    return text
+
+def _extent(x,y):
+    """Tamaño característico del modelo, para escalar flechas de carga y deformadas."""
+    if len(x) == 0: return 1.0
+    d = max(x.max() - x.min(),y.max() - y.min())
+    return d if d > 0 else 1.0
+
+def _layout(fig,length_unit,height):
+    fig.update_layout(showlegend=False,height=height,xaxis_title=f"x ({length_unit})",yaxis_title=f"y ({length_unit})",
+                      margin={"l":20,"r":20,"t":30,"b":20})
+    fig.update_yaxes(scaleanchor="x",scaleratio=1)
+    return fig
+
+def _elements(T):
+    """Nombres, coordenadas de los extremos (filas xi, yi, xf, yf) y traslaciones de los extremos (m,4: ux_i, uy_i,
+    ux_f, uy_f) de los elementos activos de todos los tipos, en el orden de TrussStructure.element_results."""
+    names,xy,u = [],[],[]
+    for st in T.stores.values():
+        st.update()
+        rows = flatnonzero(st.active[:st.n])
+        names += [st.names[k] for k in rows]
+        xy.append(column_stack((st.xi[rows],st.yi[rows],st.xf[rows],st.yf[rows])))
+        u.append(st.u_g[rows][:,st.AXIAL])
+    return names,vstack(xy).T,vstack(u)
+
+def geometry_figure(T,supports=(),loads=(),colors=None,length_unit="m",force_unit="kN",height=600):
+    """Figura de la geometría con elementos, nudos, apoyos y cargas.
+
+    Parameters
+    ----------
+    T : TrussStructure object
+        Estructura (no necesita estar analizada).
+    supports : iterable
+        Tuplas (nudo, restringido en X, restringido en Y).
+    loads : iterable
+        Tuplas (nudo, "DX" o "DY", valor).
+    colors : dict, optional
+        Colores "joint", "element", "support" y "force".
+    """
+    colors = {"joint":"#FD0606","element":"#07F7C0","support":"#1200FF","force":"#E000FF",**(colors or {})}
+    names,(xi,yi,xf,yf),_ = _elements(T)
+    fig = go.Figure()
+    x,y = segments(xi,yi,xf,yf)
+    fig.add_trace(go.Scattergl(x=x,y=y,mode="lines",line={"color":colors["element"],"width":3},
+                               text=_repeat_names(names),hoverinfo="text",name="Elements"))
+    if 0 < len(names) <= LABELS_MAX:
+        fig.add_trace(go.Scattergl(x=(xi+xf)/2,y=(yi+yf)/2,mode="text",text=names,
+                                   textposition="bottom center",hoverinfo="skip",name="Element labels"))
+    jnames = list(T.J)
+    jx = asarray([J.x for J in T.J.values()],dtype=float)
+    jy = asarray([J.y for J in T.J.values()],dtype=float)
+    fig.add_trace(go.Scattergl(x=jx,y=jy,mode="markers+text" if len(jnames) <= LABELS_MAX else "markers",
+                               marker={"color":colors["joint"],"size":10 if len(jnames) <= LABELS_MAX else 4},
+                               text=jnames,textposition="top center",hoverinfo="text",name="Joints"))
+    d = 0.15*_extent(jx,jy)
+    sx,sy,symbol,stext = [],[],[],[]
+    for J,DX,DY in supports:
+        if not (DX or DY): continue
+        sx.append(T.J[J].x)
+        sy.append(T.J[J].y)
+        symbol.append("triangle-up" if DX and DY else ("triangle-up-open" if DY else "triangle-right-open"))
+        stext.append(f"{J}: {'RX ' if DX else ''}{'RY' if DY else ''}")
+    fig.add_trace(go.Scattergl(x=sx,y=sy,mode="markers",marker={"symbol":symbol,"size":18,"color":colors["support"]},
+                               text=stext,hoverinfo="text",name="Supports"))
+    lx,ly,hx,hy,hsym,htext = [],[],[],[],[],[]   # Líneas de las flechas y puntas en el nudo cargado
+    for J,D,V in loads:
+        if V == 0: continue
+        x0,y0 = T.J[J].x,T.J[J].y
+        ux,uy = (1 if V > 0 else -1,0) if D == "DX" else (0,1 if V > 0 else -1)
+        lx += [x0 - ux*d,x0,None]
+        ly += [y0 - uy*d,y0,None]
+        hx.append(x0)
+        hy.append(y0)
+        hsym.append({(1,0):"triangle-right",(-1,0):"triangle-left",(0,1):"triangle-up",(0,-1):"triangle-down"}[(ux,uy)])
+        htext.append(f"{abs(V):g} {force_unit}")
+    fig.add_trace(go.Scattergl(x=lx,y=ly,mode="lines",line={"color":colors["force"],"width":3},hoverinfo="skip",
+                               name="Load lines"))
+    fig.add_trace(go.Scattergl(x=hx,y=hy,mode="markers+text",marker={"symbol":hsym,"size":14,"color":colors["force"]},
+                               text=htext,textposition="top left",textfont={"color":colors["force"]},hoverinfo="text",
+                               name="Loads"))
+    return _layout(fig,length_unit,height)
+
+def auto_scale(T,fraction=0.1):
+    """Factor de escala que hace que el mayor desplazamiento de un nudo sea fraction del tamaño del modelo."""
+    _,(xi,yi,xf,yf),u = _elements(T)
+    umax = sqrt(u[:,0::2]**2 + u[:,1::2]**2).max(initial=0.0)
+    size = _extent(concatenate((xi,xf)),concatenate((yi,yf)))
+    return fraction*size/umax if umax > 0 else 1.0
+
+def deformed_figure(T,scale=None,color_by_axial=True,case="Default",bins=11,colorscale="RdBu_r",colors=None,
+                    length_unit="m",force_unit="kN",height=600):
+    """Figura de la deformada de una estructura analizada.
+
+    Parameters
+    ----------
+    T : TrussStructure object
+        Estructura analizada. Se dibuja el estado de T.U (ver select_case).
+    scale : float, optional
+        Factor de amplificación de los desplazamientos. Por defecto auto_scale(T).
+    color_by_axial : bool
+        Colorea los elementos según su fuerza axial (case), agrupados en bins intervalos simétricos.
+    case : str
+        Caso de carga o combinación de las fuerzas axiales.
+    """
+    colors = {"element":"#07F7C0","undeformed":"#BBBBBB",**(colors or {})}
+    names,(xi,yi,xf,yf),u = _elements(T)
+    if scale is None: scale = auto_scale(T)
+    fig = go.Figure()
+    x,y = segments(xi,yi,xf,yf)
+    fig.add_trace(go.Scattergl(x=x,y=y,mode="lines",line={"color":colors["undeformed"],"width":1,"dash":"dot"},
+                               hoverinfo="skip",name="Undeformed"))
+    xi,yi = xi + scale*u[:,0],yi + scale*u[:,1]
+    xf,yf = xf + scale*u[:,2],yf + scale*u[:,3]
+    if not color_by_axial or len(names) == 0:
+        x,y = segments(xi,yi,xf,yf)
+        fig.add_trace(go.Scattergl(x=x,y=y,mode="lines",line={"color":colors["element"],"width":3},
+                                   text=_repeat_names(names),hoverinfo="text",name="Deformed"))
+        return _layout(fig,length_unit,height)
+    N = T.element_results(case).N
+    nmax = float(npabs(N).max()) or 1.0
+    edges = linspace(-nmax,nmax,bins+1)
+    level = digitize(N,edges[1:-1])     # Intervalo de cada elemento, 0..bins-1
+    palette = sample_colorscale(colorscale,[(k + 0.5)/bins for k in range(bins)])
+    for k in range(bins):
+        sel = flatnonzero(level == k)
+        if not len(sel): continue
+        x,y = segments(xi[sel],yi[sel],xf[sel],yf[sel])
+        fig.add_trace(go.Scattergl(x=x,y=y,mode="lines",line={"color":palette[k],"width":3},hoverinfo="skip",
+                                   name=f"{edges[k]:.3g} to {edges[k+1]:.3g}"))
+    fig.add_trace(go.Scattergl(x=(xi+xf)/2,y=(yi+yf)/2,mode="markers",
+                               marker={"size":6 if len(names) <= LABELS_MAX else 2,"color":N,"colorscale":colorscale,
+                                       "cmin":-nmax,"cmax":nmax,"colorbar":{"title":f"N ({force_unit})"}},
+                               text=[f"{name}: N = {n:.4g} {force_unit}" for name,n in zip(names,N.tolist())],
+                               hoverinfo="text",name="Axial force"))
+    return _layout(fig,length_unit,height)
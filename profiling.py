@@ -0,0 +1,130 @@
+"""Instrumentación opcional del análisis: tiempo, memoria y datos numéricos de cada fase.
+
+Un TrussStructure sin perfilador (el caso por defecto) solo comprueba un atributo en None por fase. Con
+TrussStructure.profile() cada fase de Analyze, solve_loads, Reanalyze, Modal, influence_lines y to_excel agrega
+un registro:
+
+    phase         "stability", "assembly", "reduction", "factorization", "solve", "recovery", "reanalysis",
+                  "modal", "influence" o "excel"
+    time          tiempo de reloj en segundos
+    memory_mb     memoria pico asignada durante la fase (solo con memory=True, usa tracemalloc)
+    ...           datos propios de la fase: tamaño y no nulos de K y K_r, tipo de factorización, número de
+                  condición estimado (con condition=True), residuo relativo de la solución, etc.
+
+Cada registro se entrega además a los hooks del perfilador y a los globales (add_hook), por ejemplo para
+enviarlos a un sistema de monitoreo.
+"""
+import tracemalloc
+from time import perf_counter
+from contextlib import contextmanager
+from numpy import abs as npabs,eye,where
+from scipy.sparse.linalg import LinearOperator,onenormest
+
+_HOOKS = []     # Hooks globales, reciben los registros de todos los perfiladores
+
+def add_hook(fn):
+    """Registra una función fn(label, record) que recibe cada registro de todos los perfiladores."""
+    if fn not in _HOOKS: _HOOKS.append(fn)
+    return fn
+
+def remove_hook(fn):
+    """Quita un hook global registrado con add_hook."""
+    if fn in _HOOKS: _HOOKS.remove(fn)
+
+class Profiler():
+    """Registro de las fases de un análisis.
+
+    Parameters
+    ----------
+    label : str, optional
+        Nombre del modelo, se entrega a los hooks junto con cada registro.
+    memory : bool
+        Mide la memoria pico de cada fase con tracemalloc (hace más lentas las fases con muchas asignaciones).
+    condition : bool
+        Estima el número de condición de K_r en norma 1 después de factorizar (algunas soluciones adicionales).
+    hooks : iterable, optional
+        Funciones fn(label, record) propias de este perfilador.
+    """
+    def __init__(self,label=None,memory=False,condition=False,hooks=()):
+        self.label = label
+        self.memory = memory
+        self.condition = condition
+        self.hooks = list(hooks)
+        self.records = []
+
+    def copy(self):
+        """Perfilador con la misma configuración y una copia de los registros, para copias de un modelo."""
+        p = Profiler(self.label,self.memory,self.condition,self.hooks)
+        p.records = [dict(r) for r in self.records]
+        return p
+
+    @contextmanager
+    def phase(self,name):
+        """Mide el bloque como la fase name. Entrega un diccionario para agregar datos propios de la fase."""
+        stats = {}
+        started = False
+        if self.memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started = True
+            tracemalloc.reset_peak()
+            mem0 = tracemalloc.get_traced_memory()[0]
+        t0 = perf_counter()
+        try:
+            yield stats
+        finally:
+            record = {"phase": name,"time": perf_counter() - t0}
+            if self.memory:
+                record["memory_mb"] = (tracemalloc.get_traced_memory()[1] - mem0)/2**20
+                if started: tracemalloc.stop()
+            record.update(stats)
+            self.record(record)
+
+    def record(self,record):
+        """Agrega un registro y lo entrega a los hooks."""
+        self.records.append(record)
+        for fn in self.hooks + _HOOKS:
+            fn(self.label,record)
+
+    def clear(self):
+        self.records = []
+
+    def last(self,phase):
+        """Último registro de una fase, o None."""
+        for r in reversed(self.records):
+            if r["phase"] == phase: return r
+        return None
+
+    def totals(self):
+        """Tiempo total por fase, en segundos."""
+        out = {}
+        for r in self.records:
+            out[r["phase"]] = out.get(r["phase"],0.0) + r["time"]
+        return out
+
+    def report(self):
+        """Texto con una línea por registro."""
+        lines = []
+        for r in self.records:
+            extra = " ".join(f"{k}={_fmt(v)}" for k,v in r.items() if k not in ("phase","time"))
+            lines.append(f"{r['phase']:>13} {r['time']*1e3:10.3f} ms  {extra}")
+        return "\n".join(lines)
+
+def _fmt(v):
+    return f"{v:.4g}" if isinstance(v,float) else str(v)
+
+def condition_estimate(K,factor):
+    """Estimación del número de condición en norma 1, ||K||·||K⁻¹||, usando la factorización para K⁻¹."""
+    n = K.shape[0]
+    if n == 0: return 0.0
+    if n < 8:   # onenormest calcula la norma exacta en matrices pequeñas, pero necesita la matriz explícita
+        return float(npabs(K.toarray() if hasattr(K,"toarray") else K).sum(axis=0).max()*
+                     npabs(factor.solve(eye(n))).sum(axis=0).max())
+    inv = LinearOperator((n,n),matvec=factor.solve,rmatvec=factor.solve,dtype=float)   # K es simétrica
+    return float(onenormest(K)*onenormest(inv))
+
+def residual(K_r,U_r,rhs):
+    """Residuo relativo ||K_r·U_r - rhs|| / ||rhs|| (máximo sobre los casos de carga)."""
+    r = npabs(K_r @ U_r - rhs).max(axis=0)
+    scale = npabs(rhs).max(axis=0)
+    return float((r/where(scale != 0,scale,1.0)).max(initial=0.0))
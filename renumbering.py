@@ -0,0 +1,57 @@
+from numpy import arange,argsort,concatenate,full,ones,where,minimum,zeros
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import reverse_cuthill_mckee
+
+def joint_owner(Joints,nGdL):
+    """Número de nudo (en el orden de Joints) al que pertenece cada grado de libertad."""
+    owner = zeros(nGdL,dtype=int)
+    GdL = [J.GdL for J in Joints.values()]
+    owner[[g for dofs in GdL for g in dofs]] = arange(len(GdL)).repeat([len(dofs) for dofs in GdL])
+    return owner
+
+def joint_graph(GdL,owner,nJoints):
+    """Grafo de conectividad entre nudos (matriz de adyacencia simétrica) a partir de los GdL de los elementos."""
+    a = owner[GdL[:,0]]
+    b = owner[GdL[:,-1]]
+    data = ones(2*len(a))
+    return coo_matrix((data,(concatenate((a,b)),concatenate((b,a)))),shape=(nJoints,nJoints)).tocsr()
+
+def rcm_dof_rank(GdL,Joints,nGdL):
+    """Numeración interna de los grados de libertad con Cuthill-McKee inverso sobre el grafo de nudos.
+
+    Returns
+    -------
+    ndarray (nGdL,)
+        rank[g] es el número interno del grado de libertad g (numeración del usuario en Joint.GdL).
+    """
+    owner = joint_owner(Joints,nGdL)
+    order = reverse_cuthill_mckee(joint_graph(GdL,owner,len(Joints)),symmetric_mode=True)
+    joint_rank = zeros(len(Joints),dtype=int)
+    joint_rank[order] = arange(len(order))
+    # Los grados de libertad de cada nudo quedan consecutivos, en el orden del nudo
+    return argsort(argsort(joint_rank[owner]*nGdL + arange(nGdL),kind="stable"),kind="stable")
+
+def bandwidth_profile(GdL,free,nGdL):
+    """Semiancho de banda y perfil (envolvente) de K_r para un orden de los grados de libertad libres.
+
+    Parameters
+    ----------
+    GdL : ndarray (m,4)
+        Grados de libertad de cada elemento.
+    free : ndarray
+        Grados de libertad libres en el orden en que se numeran en K_r.
+    nGdL : int
+        Número total de grados de libertad.
+    """
+    if len(free) == 0 or len(GdL) == 0: return 0,0
+    pos = full(nGdL,-1)
+    pos[free] = arange(len(free))
+    P = pos[GdL]
+    valid = P >= 0
+    emin = where(valid,P,len(free)).min(axis=1)
+    emax = where(valid,P,-1).max(axis=1)
+    bandwidth = int(max((emax - emin)[emax >= 0].max(initial=0),0))
+    rowmin = arange(len(free))
+    minimum.at(rowmin,P[valid],emin.repeat(valid.shape[1]).reshape(valid.shape)[valid])
+    profile = int((arange(len(free)) - rowmin).sum())
+    return bandwidth,profile
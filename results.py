@@ -0,0 +1,174 @@
+"""Paquete binario de resultados: un directorio de arreglos .npy que se leen con memory-mapping.
+
+Contenido del directorio
+------------------------
+    meta.json                       casos de carga, combinaciones, número de grados de libertad y lista de arreglos
+    joint_names, joint_xy           nombres (nJ,) y coordenadas (nJ,2) de los nudos usados
+    joint_dofs                      grados de libertad (nJ,d) de cada nudo, d = 3 si hay elementos de pórtico
+    element_names, element_joints   nombres (m,) y nudos inicial/final (m,2, índice en joint_names)
+    element_kind                    tipo de cada elemento (m,), "truss" o "frame"
+    E, A, L, GdL                    propiedades y grados de libertad (m,4), (m,6) si hay pórticos, de los elementos
+    U, F, R                         desplazamientos, fuerzas y reacciones (nGdL, casos)
+    N, stress                       fuerza axial y esfuerzo axial (m, casos)
+    K_data, K_indices, K_indptr     matriz K en formato CSR (opcional)
+    joint_sort, element_sort        órdenes alfabéticos para buscar por nombre sin leer todo el arreglo
+    frequencies, modes, modal_mass  frecuencias (Hz), modos (nGdL, modos) y fracción de masa efectiva en X e Y
+                                    (modos,2), si se ejecutó TrussStructure.Modal
+
+Los elementos de todos los tipos van en los mismos arreglos, uno a continuación de otro. Las filas de GdL y
+joint_dofs más cortas que el ancho del arreglo se completan con -1.
+"""
+import json
+from os import makedirs
+from os.path import join
+from numpy import argsort,asarray,concatenate,flatnonzero,full,load,save,searchsorted
+from scipy.sparse import csr_matrix
+
+VERSION = 2
+
+def save_results(T,directory,include_K=False):
+    """Guarda el modelo analizado y sus resultados en un directorio de arreglos .npy.
+
+    Parameters
+    ----------
+    T : TrussStructure object
+        Estructura ya analizada.
+    directory : str
+        Directorio de destino, se crea si no existe.
+    include_K : bool
+        Guarda también la matriz de rigidez global en formato CSR.
+    """
+    makedirs(directory,exist_ok=True)
+    jnames = list(T.Joints)
+    jindex = {name: k for k,name in enumerate(jnames)}
+    d = max((len(J.GdL) for J in T.Joints.values()),default=2)
+    joint_dofs = full((len(jnames),d),-1)
+    for k,J in enumerate(T.Joints.values()): joint_dofs[k,:len(J.GdL)] = J.GdL
+    width = max((st.width for st in T.stores.values() if st.n),default=4)
+    cols = {key: [] for key in ("names","joints","kind","E","A","L","GdL","N")}
+    start = 0   # Primera fila de cada store en N_cases
+    for st in T.stores.values():
+        st.update()
+        rows = flatnonzero(st.active[:st.n])
+        GdL = full((len(rows),width),-1)
+        GdL[:,:st.width] = st.GdL[rows]
+        cols["names"] += [st.names[k] for k in rows]
+        cols["joints"] += [(jindex[st.Ji[k]],jindex[st.Jf[k]]) for k in rows]
+        cols["kind"] += [st.kind]*len(rows)
+        for key in ("E","A","L"): cols[key].append(getattr(st,key)[rows])
+        cols["GdL"].append(GdL)
+        cols["N"].append(T.N_cases[start + rows])
+        start += st.n
+    arrays = {
+        "joint_names": asarray(jnames,dtype=str),
+        "joint_xy": asarray([(J.x,J.y) for J in T.Joints.values()],dtype=float).reshape(-1,2),
+        "joint_dofs": joint_dofs,
+        "element_names": asarray(cols["names"],dtype=str),
+        "element_joints": asarray(cols["joints"],dtype=int).reshape(-1,2),
+        "element_kind": asarray(cols["kind"],dtype=str),
+        "E": concatenate(cols["E"]),
+        "A": concatenate(cols["A"]),
+        "L": concatenate(cols["L"]),
+        "GdL": concatenate(cols["GdL"]),
+        "U": T.U_cases,
+        "F": T.F_cases,
+        "R": T.R_cases,
+        "N": concatenate(cols["N"]),
+    }
+    arrays["stress"] = arrays["N"]/arrays["A"][:,None]
+    arrays["joint_sort"] = argsort(arrays["joint_names"],kind="stable")
+    arrays["element_sort"] = argsort(arrays["element_names"],kind="stable")
+    if T.modes is not None:
+        arrays["frequencies"],arrays["modes"],arrays["modal_mass"] = T.frequencies,T.modes,T.modal_mass
+    if include_K:
+        K = csr_matrix(T.K)
+        arrays["K_data"],arrays["K_indices"],arrays["K_indptr"] = K.data,K.indices,K.indptr
+    for name,a in arrays.items():
+        save(join(directory,f"{name}.npy"),a)
+    meta = {"version": VERSION,"cases": list(T.cases),"combinations": T.combinations,"nGdL": T.nGdL,
+            "modes": 0 if T.modes is None else T.modes.shape[1],"arrays": sorted(arrays)}
+    with open(join(directory,"meta.json"),"w",encoding="utf-8") as f:
+        json.dump(meta,f)
+
+class ResultsBundle():
+    """Resultados guardados con save_results. Los arreglos se abren con memory-mapping recién cuando se usan,
+    por lo que consultar un elemento o un nudo solo lee las páginas necesarias del archivo.
+
+    Parameters
+    ----------
+    directory : str
+        Directorio creado por save_results.
+    """
+    def __init__(self,directory):
+        self.directory = directory
+        with open(join(directory,"meta.json"),encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self.cases = self.meta["cases"]
+        self.combinations = self.meta["combinations"]
+        self._arrays = {}
+
+    def __getitem__(self,name):
+        if name not in self._arrays:
+            if name not in self.meta["arrays"]: raise KeyError(name)
+            self._arrays[name] = load(join(self.directory,f"{name}.npy"),mmap_mode="r")
+        return self._arrays[name]
+
+    def __contains__(self,name):
+        return name in self.meta["arrays"]
+
+    def _find(self,names,order,name):
+        """Búsqueda binaria sobre los nombres ordenados."""
+        pos = int(searchsorted(self[names],name,sorter=self[order]))
+        if pos < len(self[order]):
+            idx = int(self[order][pos])
+            if self[names][idx] == name: return idx
+        raise KeyError(name)
+
+    def _dofs(self,array,k):
+        """Grados de libertad de la fila k de GdL o joint_dofs, sin el relleno -1."""
+        GdL = asarray(self[array][k])
+        return GdL[GdL >= 0]
+
+    def _column(self,array,rows,case):
+        """Valores de un caso de carga o combinación en las filas indicadas de un arreglo (filas, casos)."""
+        if case in self.cases:
+            return asarray(array[rows,self.cases.index(case)])
+        factors = self.combinations[case]
+        return sum(f*asarray(array[rows,self.cases.index(c)]) for c,f in factors.items())
+
+    def element(self,name,case="Default"):
+        """Resultados de un elemento para un caso de carga o combinación."""
+        k = self._find("element_names","element_sort",name)
+        N = float(self._column(self["N"],k,case))
+        GdL = self._dofs("GdL",k)
+        i,f = asarray(self["element_joints"][k])
+        kind = str(self["element_kind"][k]) if "element_kind" in self else "truss"
+        return {"name": name,"kind": kind,"Ji": str(self["joint_names"][i]),"Jf": str(self["joint_names"][f]),
+                "E": float(self["E"][k]),"A": float(self["A"][k]),"L": float(self["L"][k]),"GdL": GdL.tolist(),
+                "N": N,"stress": N/float(self["A"][k]),"u_g": self._column(self["U"],GdL,case).tolist()}
+
+    def joint(self,name,case="Default"):
+        """Coordenadas, desplazamientos, fuerzas y reacciones de un nudo para un caso de carga o combinación."""
+        k = self._find("joint_names","joint_sort",name)
+        GdL = self._dofs("joint_dofs",k)
+        return {"name": name,"x": float(self["joint_xy"][k,0]),"y": float(self["joint_xy"][k,1]),"GdL": GdL.tolist(),
+                "U": self._column(self["U"],GdL,case).tolist(),"F": self._column(self["F"],GdL,case).tolist(),
+                "R": self._column(self["R"],GdL,case).tolist()}
+
+    def mode(self,name,i):
+        """Frecuencia y desplazamientos de un nudo en el modo de vibración i (desde 0)."""
+        if "modes" not in self: raise KeyError("El paquete no tiene modos de vibración")
+        k = self._find("joint_names","joint_sort",name)
+        GdL = self._dofs("joint_dofs",k)
+        return {"name": name,"mode": i,"frequency": float(self["frequencies"][i]),"GdL": GdL.tolist(),
+                "U": asarray(self["modes"][GdL,i]).tolist()}
+
+    def K(self):
+        """Matriz de rigidez global (CSR) si se guardó."""
+        if "K_data" not in self: return None
+        n = self.meta["nGdL"]
+        return csr_matrix((self["K_data"],self["K_indices"],self["K_indptr"]),shape=(n,n))
+
+def load_results(directory):
+    """Abre un paquete de resultados guardado con save_results."""
+    return ResultsBundle(directory)
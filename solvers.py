@@ -0,0 +1,225 @@
+from numpy import arange,argsort,asarray,bincount,empty,eye,full,searchsorted,unique,zeros
+from numpy.linalg import svd
+from numpy.linalg import LinAlgError
+from scipy.linalg import cho_factor,cho_solve,lu_factor,lu_solve,cholesky_banded,cho_solve_banded
+from scipy.sparse import coo_matrix,csc_matrix,csr_matrix,issparse
+from scipy.sparse.linalg import splu
+
+try:    # CHOLMOD es opcional, si no está instalado se usa SuperLU
+    from sksparse.cholmod import cholesky as cholmod_cholesky,analyze as cholmod_analyze
+except ImportError:
+    cholmod_cholesky = cholmod_analyze = None
+
+class Factorization():
+    """Factoriza una sola vez la matriz de rigidez reducida y resuelve para uno o varios vectores de carga.
+
+    Parameters
+    ----------
+    K : ndarray or sparse matrix
+        Matriz simétrica a factorizar.
+    method : str
+        "dense" usa Cholesky denso (LU si la matriz no es definida positiva), "sparse" usa CHOLMOD si está disponible
+        o SuperLU con ordenamiento de grado mínimo sobre K+K', "banded" usa Cholesky en banda sobre el orden actual de
+        los grados de libertad (conviene renumerar antes con TrussStructure.renumber).
+    """
+    def __init__(self,K,method="sparse"):
+        self.method = method
+        self.n = K.shape[0]
+        if method == "dense":
+            K = K.toarray() if issparse(K) else asarray(K,dtype=float)
+            try:
+                self.kind = "cholesky"
+                self._f = cho_factor(K)
+            except LinAlgError:
+                self.kind = "lu"
+                self._f = lu_factor(K)
+        elif method == "sparse":
+            K = csc_matrix(K)
+            if cholmod_cholesky is not None:
+                self.kind = "cholmod"
+                self._f = cholmod_cholesky(K)
+            else:
+                self.kind = "superlu"
+                self._f = splu(K,permc_spec="MMD_AT_PLUS_A")
+        elif method == "banded":
+            K = csc_matrix(K)
+            self.bandwidth = bandwidth(K)
+            try:
+                self.kind = "banded"
+                self._f = cholesky_banded(to_banded(K,self.bandwidth))
+            except LinAlgError:
+                self.kind = "superlu"
+                self._f = splu(K,permc_spec="MMD_AT_PLUS_A")
+        else:
+            raise ValueError(f"Método de solución desconocido: {method}")
+
+    def solve(self,b):
+        """Resuelve K·x = b. b puede ser un vector o una matriz con un caso de carga por columna."""
+        if self.n == 0: return asarray(b,dtype=float)
+        if self.kind == "cholesky": return cho_solve(self._f,b)
+        if self.kind == "lu": return lu_solve(self._f,b)
+        if self.kind == "cholmod": return self._f(b)
+        if self.kind == "banded": return cho_solve_banded((self._f,False),b)
+        return self._f.solve(asarray(b,dtype=float))
+
+    def pivots(self):
+        """Pivotes de la factorización (en su orden de eliminación). En las de Cholesky son los cuadrados de la
+        diagonal del factor, comparables con la diagonal de K."""
+        if self.n == 0: return zeros(0)
+        if self.kind == "cholesky": return self._f[0].diagonal()**2
+        if self.kind == "lu": return self._f[0].diagonal()
+        if self.kind == "cholmod": return self._f.D()
+        if self.kind == "banded": return self._f[-1]**2
+        return self._f.U.diagonal()
+
+def bandwidth(K):
+    """Semiancho de banda de una matriz dispersa."""
+    K = K.tocoo()
+    return int(abs(K.row - K.col).max(initial=0))
+
+def to_banded(K,bw):
+    """Forma en banda superior (bw+1,n) de una matriz simétrica, como la usa scipy.linalg.cholesky_banded."""
+    n = K.shape[0]
+    ab = zeros((bw+1,n))
+    for k in range(bw+1):
+        ab[bw-k,k:] = K.diagonal(k)
+    return ab
+
+class UpdatedFactorization():
+    """Resuelve con K0 + C·diag(d)·C' reutilizando una factorización de K0 (identidad de Sherman-Morrison-Woodbury).
+
+    Cada elemento barra modificado aporta una columna de C (su vector de cosenos directores en los grados de
+    libertad libres) y un término d (la variación de su rigidez axial EA/L), por lo que el costo es de m
+    soluciones con la factorización existente y una matriz densa de m×m.
+
+    Parameters
+    ----------
+    base : Factorization object
+        Factorización de K0.
+    C : sparse matrix (n,m)
+        Vectores de la actualización de bajo rango.
+    d : ndarray (m,)
+        Coeficientes de la actualización.
+    """
+    def __init__(self,base,C,d):
+        self.base = base
+        self.method = base.method
+        self.kind = "woodbury"
+        self.n = base.n
+        self.C = csc_matrix(C)
+        self.d = asarray(d,dtype=float)
+        self.Z = base.solve(self.C.toarray()).reshape(self.n,-1)   # K0⁻¹·C
+        S = eye(len(self.d)) + self.d[:,None]*(self.C.T @ self.Z)  # Matriz de capacitancia I + D·C'·K0⁻¹·C
+        if svd(S,compute_uv=False).min() < 1e-10:     # S = I cuando no hay cambio, su escala natural es 1
+            raise LinAlgError("La actualización deja una matriz de rigidez singular")
+        self._S = lu_factor(S)
+
+    def solve(self,b):
+        """Resuelve (K0 + C·D·C')·x = b."""
+        b = asarray(b,dtype=float)
+        y = self.base.solve(b).reshape(self.n,-1)
+        t = self.d[:,None]*(self.C.T @ y)
+        return (y - self.Z @ lu_solve(self._S,t)).reshape(b.shape)
+
+def assemble(GdL,k_glob,n):
+    """Ensambla la matriz de rigidez global en formato CSR a partir de tripletas COO.
+
+    Parameters
+    ----------
+    GdL : ndarray (m,4)
+        Grados de libertad de cada elemento.
+    k_glob : ndarray (m,4,4)
+        Matrices de rigidez de los elementos en ejes globales.
+    n : int
+        Número de grados de libertad de la estructura.
+    """
+    d = GdL.shape[1]
+    rows = GdL[:,:,None].repeat(d,axis=2).ravel()   # Fila de cada término k_glob[e,i,j]
+    cols = GdL[:,None,:].repeat(d,axis=1).ravel()   # Columna de cada término k_glob[e,i,j]
+    return coo_matrix((k_glob.ravel(),(rows,cols)),shape=(n,n)).tocsr()   # Los duplicados se suman al convertir
+
+class PatternAssembler():
+    """Ensambla repetidamente K_r para una conectividad y apoyos fijos.
+
+    El patrón CSR (índices de columna y punteros de fila) y la posición de cada término de los elementos se
+    calculan una sola vez; cada llamada a matrix solo suma los valores con bincount.
+
+    Parameters
+    ----------
+    GdL : ndarray (m,d)
+        Grados de libertad de cada elemento.
+    free : ndarray
+        Grados de libertad libres.
+    nGdL : int
+        Número total de grados de libertad.
+    order : ndarray, optional
+        Orden de las ecuaciones: la ecuación i de la matriz ensamblada es la libre order[i].
+    """
+    def __init__(self,GdL,free,nGdL,order=None):
+        n = len(free)
+        pos = full(nGdL,-1)
+        pos[free] = arange(n) if order is None else argsort(order)
+        P = pos[GdL]
+        d = GdL.shape[1]
+        r = P[:,:,None].repeat(d,axis=2).ravel()
+        c = P[:,None,:].repeat(d,axis=1).ravel()
+        self.keep = (r >= 0) & (c >= 0)
+        key = r[self.keep]*n + c[self.keep]
+        uniq,self.inverse = unique(key,return_inverse=True)    # Ordenado por fila y columna, como CSR
+        self.indices = uniq % n
+        self.indptr = searchsorted(uniq // n,arange(n+1))
+        self.n = n
+        self.order = order
+
+    def matrix(self,k_glob):
+        """K_r en formato CSR para las matrices de rigidez k_glob (m,d,d) de los elementos."""
+        data = bincount(self.inverse,weights=k_glob.reshape(len(k_glob),-1).ravel()[self.keep],minlength=len(self.indices))
+        return csr_matrix((data,self.indices,self.indptr),shape=(self.n,self.n))
+
+class SymbolicFactorization():
+    """Análisis simbólico (ordenamiento que reduce el relleno) hecho una sola vez para un patrón de K_r, que se
+    reutiliza en la factorización numérica de todas las matrices con ese patrón.
+
+    Con CHOLMOD se guarda su análisis simbólico. Con SuperLU se guarda el ordenamiento de grado mínimo y las
+    matrices se ensamblan ya reordenadas (ver order y PatternAssembler), factorizándolas sin reordenar.
+
+    Parameters
+    ----------
+    K : sparse matrix
+        Matriz con el patrón a analizar.
+    """
+    def __init__(self,K):
+        K = csc_matrix(K)
+        self.n = K.shape[0]
+        if cholmod_analyze is not None:
+            self._symbolic = cholmod_analyze(K)
+            self.order = None
+        else:
+            self._symbolic = None
+            self.order = argsort(splu(K,permc_spec="MMD_AT_PLUS_A").perm_c)
+
+    def factor(self,K):
+        """Factorización numérica de K (ensamblada en el orden self.order)."""
+        return NumericFactorization(self,K)
+
+class NumericFactorization():
+    """Factorización numérica creada por SymbolicFactorization.factor, con la misma interfaz solve que
+    Factorization. Recibe y devuelve vectores en el orden original de los grados de libertad libres."""
+    def __init__(self,symbolic,K):
+        self.n = symbolic.n
+        self.order = symbolic.order
+        self.method = "sparse"
+        if symbolic._symbolic is not None:
+            self.kind = "cholmod"
+            self._f = symbolic._symbolic.cholesky(csc_matrix(K))
+        else:
+            self.kind = "superlu"
+            self._f = splu(csc_matrix(K),permc_spec="NATURAL",diag_pivot_thresh=0.0,options={"SymmetricMode":True})
+
+    def solve(self,b):
+        b = asarray(b,dtype=float)
+        if self.n == 0: return b
+        if self.order is None: return self._f(b) if self.kind == "cholmod" else self._f.solve(b)
+        x = empty(b.shape)
+        x[self.order] = self._f.solve(b[self.order])
+        return x
@@ -0,0 +1,199 @@
+"""Índice espacial de nudos: búsqueda por posición, unión de nudos coincidentes y elementos superpuestos.
+
+El índice es un k-d tree (scipy.spatial.cKDTree) sobre las coordenadas de todos los nudos definidos, por lo que las
+operaciones por lotes cuestan O(n log n) y sirven para mallas de 10^5 nudos o más.
+"""
+from numpy import abs as npabs,arange,arctan2,argsort,asarray,column_stack,flatnonzero,hypot,lexsort,maximum,minimum,\
+    ones,pi,repeat,rint,unique,vstack,where
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+from scipy.spatial import cKDTree
+
+class JointIndex():
+    """Índice espacial de los nudos de una estructura.
+
+    Parameters
+    ----------
+    T : TrussStructure object
+        Estructura. El índice considera los nudos de T.J que existen al crearlo.
+    """
+    def __init__(self,T):
+        self.names = list(T.J)
+        self.xy = asarray([(J.x,J.y) for J in T.J.values()],dtype=float).reshape(-1,2)
+        self.tree = cKDTree(self.xy)
+
+    def __len__(self):
+        return len(self.names)
+
+    def nearest(self,x,y,k=1):
+        """Nudos más cercanos a un punto.
+
+        Returns
+        -------
+        list
+            k tuplas (nombre, distancia) ordenadas por distancia.
+        """
+        k = min(k,len(self.names))
+        if k == 0: return []
+        d,i = self.tree.query((x,y),k=k)
+        d,i = asarray(d).reshape(-1),asarray(i).reshape(-1)
+        return [(self.names[j],float(dj)) for dj,j in zip(d.tolist(),i.tolist())]
+
+    def within(self,x,y,r):
+        """Nombres de los nudos a distancia r o menor de un punto, del más cercano al más lejano."""
+        idx = asarray(self.tree.query_ball_point((x,y),r),dtype=int)
+        d = hypot(self.xy[idx,0] - x,self.xy[idx,1] - y)
+        return [self.names[j] for j in idx[argsort(d,kind="stable")].tolist()]
+
+    def snap(self,x,y,tol):
+        """Nombre del nudo más cercano si está a distancia tol o menor, de lo contrario None."""
+        found = self.nearest(x,y)
+        return found[0][0] if found and found[0][1] <= tol else None
+
+    def groups(self,tol):
+        """Grupos de nudos coincidentes: nudos a distancia tol o menor, de forma transitiva.
+
+        Returns
+        -------
+        list
+            Listas de nombres con más de un nudo, cada una en el orden de definición de los nudos.
+        """
+        n = len(self.names)
+        pairs = self.tree.query_pairs(tol,output_type="ndarray")
+        if not len(pairs): return []
+        graph = coo_matrix((ones(len(pairs)),(pairs[:,0],pairs[:,1])),shape=(n,n))
+        ncomp,label = connected_components(graph,directed=False)
+        order = argsort(label,kind="stable")    # Dentro de cada grupo se conserva el orden de definición
+        counts = asarray([0] + list(unique(label,return_counts=True)[1].cumsum()))
+        out = []
+        for c in range(ncomp):
+            members = order[counts[c]:counts[c+1]]
+            if len(members) > 1: out.append([self.names[j] for j in members.tolist()])
+        return out
+
+def merge_joints(T,tol=1e-6,drop_duplicates=False):
+    """Une los nudos coincidentes de una estructura y reasigna sus elementos, superelementos, apoyos y cargas.
+
+    En cada grupo de nudos coincidentes (ver JointIndex.groups) se conserva el primero definido. Los elementos que
+    quedan con el mismo nudo en ambos extremos se eliminan; los apoyos se combinan y las cargas se suman en el nudo
+    conservado.
+
+    Parameters
+    ----------
+    T : TrussStructure object
+        Estructura original, no se modifica.
+    tol : float
+        Distancia máxima entre nudos coincidentes.
+    drop_duplicates : bool
+        Elimina también los elementos que quedan repetidos (mismos nudos), conservando el primero.
+
+    Returns
+    -------
+    TrussStructure object
+        Nueva estructura, construida a partir de las tablas del modelo (ver modelio.py).
+    dict
+        "joints": {nudo eliminado: nudo conservado}, "collapsed": elementos eliminados por quedar con longitud
+        nula, "duplicates": elementos eliminados por repetidos.
+    """
+    from modelio import to_tables,from_tables
+    mapping = {}
+    for group in JointIndex(T).groups(tol):
+        for name in group[1:]: mapping[name] = group[0]
+    tables = to_tables(T)
+    remap = lambda names: [mapping.get(n,n) for n in names]
+    joints = tables["joints"]
+    keep = [k for k,n in enumerate(joints["name"]) if n not in mapping]
+    tables["joints"] = {c: [v[k] for k in keep] for c,v in joints.items()}
+    el = tables["elements"]
+    el["Ji"],el["Jf"] = remap(el["Ji"]),remap(el["Jf"])
+    collapsed = [n for n,i,f in zip(el["name"],el["Ji"],el["Jf"]) if i == f]
+    duplicates = []
+    if drop_duplicates:
+        seen = set()
+        for n,i,f in zip(el["name"],el["Ji"],el["Jf"]):
+            key = (min(i,f),max(i,f))
+            if i != f and key in seen: duplicates.append(n)
+            seen.add(key)
+    drop = set(collapsed) | set(duplicates)
+    rows = [k for k,n in enumerate(el["name"]) if n not in drop]
+    tables["elements"] = {c: [v[k] for k in rows] for c,v in el.items()}
+    for table in ("supports","loads","settlements","superelements"):
+        if table in tables: tables[table]["joint"] = remap(tables[table]["joint"])
+    return from_tables(tables),{"joints": mapping,"collapsed": collapsed,"duplicates": duplicates}
+
+def find_overlaps(T,tol=1e-6,angle_tol=1e-9):
+    """Busca elementos repetidos, elementos superpuestos y nudos que quedan sobre un elemento sin estar conectados.
+
+    Los elementos se agrupan por la recta que los contiene (dirección y distancia al origen) y dentro de cada recta
+    se ordenan por su intervalo, por lo que la búsqueda cuesta O(m log m).
+
+    Parameters
+    ----------
+    T : TrussStructure object
+        Estructura.
+    tol : float
+        Tolerancia de distancia.
+    angle_tol : float
+        Tolerancia de dirección en radianes.
+
+    Returns
+    -------
+    dict
+        "duplicates": grupos de elementos con los mismos nudos, "overlapping": pares de elementos colineales que
+        se superponen en un tramo, "joints_on_elements": pares (elemento, nudo) con el nudo en el interior del
+        elemento sin estar conectado a él.
+    """
+    jindex = {name: k for k,name in enumerate(T.J)}
+    names,a,b,cols = [],[],[],[]     # Elementos activos de todos los tipos, uno a continuación de otro
+    for st in T.stores.values():
+        st.update()
+        rows = flatnonzero(st.active[:st.n] & (st.L > 0))
+        names += [st.names[k] for k in rows]
+        a += [jindex[st.Ji[k]] for k in rows]
+        b += [jindex[st.Jf[k]] for k in rows]
+        cols.append(column_stack((st.xi[rows],st.yi[rows],st.xf[rows],st.yf[rows],st.L[rows])))
+    report = {"duplicates": [],"overlapping": [],"joints_on_elements": []}
+    if not names: return report
+    # Elementos repetidos: mismo par de nudos sin importar el sentido
+    a,b = asarray(a),asarray(b)
+    key = minimum(a,b)*len(jindex) + maximum(a,b)
+    _,inverse,counts = unique(key,return_inverse=True,return_counts=True)
+    groups = {}
+    for k in flatnonzero(counts[inverse] > 1).tolist(): groups.setdefault(inverse[k],[]).append(names[k])
+    report["duplicates"] = list(groups.values())
+    # Superposiciones: se agrupan por recta (ángulo en [0, π) y distancia con signo al origen)
+    xi,yi,xf,yf,L = vstack(cols).T
+    ux,uy = (xf - xi)/L,(yf - yi)/L
+    flip = (uy < 0) | ((uy == 0) & (ux < 0))    # Sentido canónico, con ángulo en [0, π)
+    ang = arctan2(where(flip,-uy,uy),where(flip,-ux,ux))
+    flip ^= ang > pi - angle_tol                # Un ángulo casi igual a π es la misma recta que 0
+    ux,uy = where(flip,-ux,ux),where(flip,-uy,uy)
+    ang = where(ang > pi - angle_tol,0.0,ang)
+    offset = xi*uy - yi*ux      # Distancia con signo de la recta al origen
+    t0,t1 = xi*ux + yi*uy,xf*ux + yf*uy
+    t0,t1 = minimum(t0,t1),maximum(t0,t1)
+    line = unique(column_stack((rint(ang/angle_tol),rint(offset/tol))),axis=0,return_inverse=True)[1].reshape(-1)
+    order = lexsort((t0,line)).tolist()
+    line,start,end,pair = line.tolist(),t0.tolist(),t1.tolist(),key.tolist()
+    reach,owner = None,None
+    for k in order:
+        if reach is not None and line[k] == line[owner] and start[k] < reach - tol:
+            if pair[k] != pair[owner]:      # Los repetidos ya se informan en "duplicates"
+                report["overlapping"].append((names[owner],names[k]))
+            if end[k] > reach: reach,owner = end[k],k
+        else:
+            reach,owner = end[k],k
+    # Nudos sobre el interior de un elemento: candidatos en el círculo que contiene al elemento
+    index = JointIndex(T)
+    mx,my = (xi + xf)/2,(yi + yf)/2
+    candidates = index.tree.query_ball_point(column_stack((mx,my)),L/2 + tol)
+    counts = asarray([len(c) for c in candidates])
+    k = repeat(arange(len(names)),counts)     # Pares (elemento, nudo candidato) en arreglos planos
+    j = asarray([i for c in candidates for i in c],dtype=int)
+    ex,ey = ux*where(flip,-1,1),uy*where(flip,-1,1)     # Dirección de Ji a Jf
+    px,py = index.xy[j,0] - xi[k],index.xy[j,1] - yi[k]
+    t = px*ex[k] + py*ey[k]
+    dist = npabs(px*ey[k] - py*ex[k])
+    inside = (dist <= tol) & (t > tol) & (t < L[k] - tol) & (j != a[k]) & (j != b[k])
+    report["joints_on_elements"] = [(names[e],index.names[i]) for e,i in zip(k[inside].tolist(),j[inside].tolist())]
+    return report
@@ -0,0 +1,185 @@
+"""Revisión de estabilidad de una armadura antes de resolverla.
+
+La revisión tiene dos etapas:
+
+1. Topológica, de costo casi lineal en el número de elementos: nudos definidos que ningún elemento usa, nudos
+   coincidentes, elementos de longitud o rigidez nula, componentes desconectadas de la estructura (sobre el
+   grafo de nudos, con los elementos y los superelementos) y grados de libertad restringidos en cada
+   componente. Una componente con más de un nudo necesita al menos 3 apoyos y un nudo aislado 2 (3 si tiene
+   giro).
+2. Numérica, solo si la etapa topológica no encontró errores: una factorización dispersa con pivotes en la
+   diagonal de K_r + ε·diag(K_r). Los pivotes casi nulos revelan el rango de K_r; para cada uno se resuelve un
+   sistema con la misma factorización, cuya solución es el modo de mecanismo, y se informan los nudos y grados de
+   libertad que se mueven en él (ver mechanisms).
+
+check_stability hace las dos etapas y cuesta un ensamblaje y una factorización adicionales. Analyze(check=True)
+solo hace antes la etapa topológica: reutiliza su propia K_r y su factorización, y hace la etapa numérica solo si
+la factorización falla o tiene pivotes casi nulos (ver needs_rank_check), por lo que en una estructura estable la
+revisión cuesta poco más que la etapa topológica.
+"""
+from numpy import abs as npabs,arange,bincount,flatnonzero,isfinite,sqrt,vstack,where,zeros
+from scipy.sparse import csc_matrix,diags
+from scipy.sparse.csgraph import connected_components
+from scipy.sparse.linalg import splu
+from renumbering import joint_owner,joint_graph
+
+class StabilityReport():
+    """Resultado de TrussStructure.check_stability.
+
+    Attributes
+    ----------
+    ok : bool
+        True si no hay errores.
+    errors : list
+        Descripción de cada problema que impide resolver la estructura.
+    warnings : list
+        Problemas que no impiden resolverla, como nudos sin usar.
+    unreferenced : list
+        Nudos definidos que ningún elemento usa.
+    zero_length : list
+        Elementos de longitud nula.
+    coincident : list
+        Grupos de nudos en la misma posición, que suelen dividir la estructura en partes desconectadas.
+    components : list
+        Nudos de cada componente conectada.
+    supports : list
+        Grados de libertad restringidos de cada componente.
+    mechanisms : list
+        Modos de mecanismo encontrados en la etapa numérica, cada uno {"joints": [...], "dofs": [(nudo, "x"|"y"|"rz"), ...]}.
+    """
+    def __init__(self):
+        self.errors = []
+        self.warnings = []
+        self.unreferenced = []
+        self.zero_length = []
+        self.coincident = []
+        self.components = []
+        self.supports = []
+        self.mechanisms = []
+        self.rank_deficiency = 0
+
+    @property
+    def ok(self):
+        return not self.errors
+
+    def __repr__(self):
+        return f"StabilityReport(ok={self.ok}, errors={len(self.errors)}, warnings={len(self.warnings)})"
+
+def _names(names,limit=20):
+    names = list(names)
+    return ", ".join(names[:limit]) + (f" y {len(names) - limit} más" if len(names) > limit else "")
+
+def check_stability(T,numeric=True,tol=1e-9,max_modes=10,coincident_tol=1e-9):
+    """Revisa la estabilidad de una estructura sin resolverla (ver el docstring del módulo).
+
+    Parameters
+    ----------
+    T : TrussStructure object
+        Estructura a revisar.
+    numeric : bool
+        Hace la etapa numérica si la topológica no encontró errores.
+    tol : float
+        Pivote relativo a la diagonal de K_r por debajo del cual un grado de libertad se considera un mecanismo.
+    max_modes : int
+        Número máximo de modos de mecanismo que se describen.
+    coincident_tol : float or None
+        Distancia por debajo de la cual dos nudos se informan como coincidentes. None omite la búsqueda.
+
+    Returns
+    -------
+    StabilityReport object
+    """
+    report = StabilityReport()
+    report.unreferenced = [name for name,J in T.J.items() if not J.is_used]
+    if report.unreferenced:
+        report.warnings.append(f"Nudos definidos que ningún elemento usa: {_names(report.unreferenced)}")
+    report.coincident = T.joint_index().groups(coincident_tol) if coincident_tol is not None and T.J else []
+    if report.coincident:
+        report.warnings.append(f"{len(report.coincident)} grupos de nudos coincidentes, por ejemplo "
+                               f"{_names(report.coincident[0],8)} (ver TrussStructure.merge_joints)")
+    weak,edges = [],[]  # edges: pares de grados de libertad de nudos conectados por elementos con rigidez
+    for st in T.stores.values():
+        st.update()
+        rows = flatnonzero(st.active[:st.n])
+        report.zero_length += [st.names[k] for k in rows[st.L[rows] == 0]]
+        weak += [st.names[k] for k in rows[(st.L[rows] != 0) & (st.k_axial[rows] == 0)]]
+        edges.append(st.GdL[rows[st.k_axial[rows] != 0]][:,[0,-1]])
+    if report.zero_length:
+        report.errors.append(f"Elementos de longitud nula: {_names(report.zero_length)}")
+    if weak:
+        report.errors.append(f"Elementos con rigidez axial nula (E o A igual a 0): {_names(weak)}")
+    if T.nGdL == 0: return report
+    # Componentes conectadas sobre el grafo de nudos, solo con los elementos que aportan rigidez
+    joints = list(T.Joints)
+    owner = joint_owner(T.Joints,T.nGdL)
+    for G,_ in T._superelement_blocks():    # Cada superelemento conecta su primer nudo de borde con los demás
+        edges += [G[:,[0,2*k]] for k in range(1,G.shape[1]//2)]
+    ncomp,label = connected_components(joint_graph(vstack(edges),owner,len(joints)),directed=False)
+    restrained = zeros(T.nGdL,dtype=bool)
+    restrained[T.constraints] = True
+    supports = bincount(label[owner],weights=restrained,minlength=ncomp).astype(int)
+    size = bincount(label,minlength=ncomp)
+    members = [[] for _ in range(ncomp)]
+    for k,c in enumerate(label.tolist()): members[c].append(joints[k])
+    report.components = members
+    report.supports = supports.tolist()
+    ndof = bincount(label,weights=bincount(owner,minlength=len(joints)),minlength=ncomp).astype(int)
+    for c in range(ncomp):
+        need = ndof[c] if size[c] == 1 else 3
+        if supports[c] < need:
+            kind = "El nudo aislado" if size[c] == 1 else f"La componente de {size[c]} nudos"
+            report.errors.append(f"{kind} {_names(members[c],8)} tiene {supports[c]} grados de libertad restringidos, "
+                                 f"necesita al menos {need}")
+    if report.errors or not numeric: return report
+    free,fixed = T.partition()
+    if len(free) == 0: return report
+    return mechanisms(T,report,T.stiffness()[free][:,free],free,tol,max_modes)
+
+def needs_rank_check(factor,K_r,tol=1e-9):
+    """True si la factorización de K_r tiene pivotes casi nulos (relativos a la mayor diagonal de K_r) o no finitos,
+    señal de un posible mecanismo que confirma mechanisms."""
+    p = npabs(factor.pivots())
+    if not len(p): return False
+    return bool(not isfinite(p).all() or p.min() < tol*K_r.diagonal().max())
+
+def mechanisms(T,report,K_r,free,tol=1e-9,max_modes=10):
+    """Etapa numérica de la revisión sobre una K_r ya ensamblada, agrega a report el rango y los mecanismos.
+
+    Parameters
+    ----------
+    T : TrussStructure object
+        Estructura.
+    report : StabilityReport object
+        Reporte de la etapa topológica.
+    K_r : sparse matrix
+        Matriz de rigidez reducida, con los grados de libertad libres free en sus filas.
+    """
+    joints = list(T.Joints)
+    # Factorización con pivotes en la diagonal de K_r regularizada
+    K_r = csc_matrix(K_r)
+    d = K_r.diagonal()
+    scale = where(d > 0,d,1.0)
+    eps = tol*1e-3
+    lu = splu(csc_matrix(K_r + diags(eps*scale)),permc_spec="MMD_AT_PLUS_A",diag_pivot_thresh=0.0,
+              options={"SymmetricMode":True})
+    pivots = lu.U.diagonal()[lu.perm_c]     # Pivote de cada grado de libertad libre
+    deficient = flatnonzero((npabs(pivots) < tol*scale) | (d <= 0))
+    report.rank_deficiency = len(deficient)
+    if not len(deficient): return report
+    dof_joint = [None]*T.nGdL
+    for name,J in T.Joints.items():
+        for d,g in zip(("x","y","rz"),J.GdL): dof_joint[g] = (name,d)
+    b = zeros((len(free),min(len(deficient),max_modes)))
+    b[deficient[:b.shape[1]],arange(b.shape[1])] = 1.0
+    modes = lu.solve(b).reshape(len(free),-1)   # Dominados por el espacio nulo de K_r
+    moving = set()
+    for m in range(modes.shape[1]):
+        v = modes[:,m]*sqrt(scale)
+        v = npabs(v)/npabs(v).max()
+        dofs = [dof_joint[g] for g in free[v > 1e-3].tolist()]
+        jnames = list(dict.fromkeys(name for name,_ in dofs))
+        report.mechanisms.append({"joints": jnames,"dofs": dofs})
+        moving.update(jnames)
+    report.errors.append(f"K_r es singular ({len(deficient)} grados de libertad sin rigidez), los nudos "
+                         f"{_names(j for j in joints if j in moving)} forman un mecanismo")
+    return report
@@ -0,0 +1,230 @@
+"""Subestructuras: paneles condensados a sus nudos de borde (superelementos).
+
+Un panel se define una sola vez como una estructura propia (nudos y elementos) y una lista de nudos de borde. Su
+rigidez se condensa estáticamente a esos nudos,
+
+    K_c = K_bb - K_bi·K_ii⁻¹·K_ib
+
+y se guarda en una caché por la firma del panel (coordenadas, conectividad, E, A, densidad y nudos de borde), de
+modo que todos los paneles iguales, aunque se definan por separado, comparten la misma condensación. Cada
+instancia se ubica con una traslación y una rotación, que solo rotan K_c; las matrices rotadas también se
+comparten entre las instancias con el mismo ángulo.
+
+En el sistema global solo quedan los grados de libertad de borde. Los desplazamientos interiores y las fuerzas de
+los elementos del panel se recuperan cuando se piden (TrussStructure.superelement_results),
+
+    u_i = K_ii⁻¹·f_i - K_ii⁻¹·K_ib·u_b
+
+Las cargas sobre nudos interiores se condensan al borde (f_b - K_bi·K_ii⁻¹·f_i). La masa para el análisis modal
+se condensa con la misma transformación (reducción de Guyan), que es aproximada para los modos con movimiento
+interior importante.
+"""
+from hashlib import sha1
+from numpy import array,asarray,concatenate,cos,einsum,float64,int64,rint,sin,where,zeros
+from solvers import Factorization,assemble
+
+CACHE_MAX = 256     # Paneles condensados que se conservan en la caché
+_CACHE = {}         # Firma del panel: CondensedPanel
+
+def clear_cache():
+    """Vacía la caché de paneles condensados."""
+    _CACHE.clear()
+
+def _rotation(angle):
+    c,s = cos(angle),sin(angle)
+    return array([[c,-s],[s,c]])
+
+class Substructure():
+    """Definición de un panel que se repite en la estructura.
+
+    Parameters
+    ----------
+    T : TrussStructure object
+        Panel en sus ejes locales, solo se usan sus nudos y elementos (no sus apoyos ni cargas).
+    boundary : list
+        Nudos del panel que se conectan con el resto de la estructura.
+    name : str, optional
+        Nombre del panel.
+    """
+    def __init__(self,T,boundary,name=None):
+        from Gadest import ModelError
+        self.name = name
+        self.boundary = list(boundary)
+        errors = [f"El nudo de borde {j} no existe o ningún elemento del panel lo usa" for j in self.boundary
+                  if j not in T.Joints]
+        if len(set(self.boundary)) < len(self.boundary): errors.append("Nudos de borde repetidos")
+        if any(st.n for st in T._other_stores()): errors.append("El panel solo puede tener elementos barra")
+        if errors: raise ModelError(errors)
+        border = set(self.boundary)
+        self.interior = [j for j in T.Joints if j not in border]
+        self.joints = self.boundary + self.interior     # Numeración local: primero los nudos de borde
+        self.xy = asarray([(T.J[j].x,T.J[j].y) for j in self.joints],dtype=float).reshape(-1,2)
+        st = T.store
+        st.update()
+        rows = [k for k in range(st.n) if st.active[k]]
+        self.elements = [st.names[k] for k in rows]
+        local = zeros(T.nGdL,dtype=int)     # Grado de libertad del panel de cada grado de libertad de T
+        for k,j in enumerate(self.joints): local[T.Joints[j].GdL[:2]] = [2*k,2*k + 1]
+        self.GdL = local[st.GdL[rows]]
+        self.k = st.k[rows]
+        self.E,self.A,self.L,self.rho = st.E[rows],st.A[rows],st.L[rows],st.rho[rows]
+        self.cx,self.cy,self.k_axial = st.cx[rows],st.cy[rows],st.k_axial[rows]
+        self.m = {kind: st.mass(kind)[rows] for kind in ("lumped","consistent")}
+        digest = sha1()
+        for a in (self.xy,self.GdL,self.E,self.A,self.rho):
+            digest.update(asarray(a,dtype=int64 if a is self.GdL else float64).tobytes())
+        digest.update(str(len(self.boundary)).encode())
+        self.signature = digest.hexdigest()
+
+    @property
+    def nb(self):
+        return 2*len(self.boundary)
+
+    def condensed(self):
+        """Panel condensado, de la caché si ya se calculó para un panel con la misma firma."""
+        panel = _CACHE.get(self.signature)
+        if panel is None:
+            if len(_CACHE) >= CACHE_MAX: _CACHE.pop(next(iter(_CACHE)))
+            panel = _CACHE[self.signature] = CondensedPanel(self)
+        return panel
+
+class CondensedPanel():
+    """Rigidez condensada de un panel y los datos para recuperar su estado interior.
+
+    Attributes
+    ----------
+    K : ndarray (nb,nb)
+        Rigidez condensada en los ejes locales del panel.
+    X : ndarray (ni,nb)
+        K_ii⁻¹·K_ib, da los desplazamientos interiores producidos por los de borde.
+    """
+    def __init__(self,sub):
+        from Gadest import ModelError
+        n = 2*len(sub.joints)
+        nb = sub.nb
+        K = assemble(sub.GdL,sub.k,n).toarray()
+        self.K_ii = K[nb:,nb:]
+        self.factor = Factorization(self.K_ii,"dense")
+        if self.factor.kind != "cholesky":
+            raise ModelError([f"Los nudos interiores del panel {sub.name or ''} forman un mecanismo"])
+        self.X = self.factor.solve(K[nb:,:nb]).reshape(n - nb,nb)
+        Kc = K[:nb,:nb] - K[:nb,nb:] @ self.X
+        self.K = (Kc + Kc.T)/2
+        self.nb = nb
+        self._rotated = {}
+        self._mass = {}
+        self.sub = sub
+
+    def stiffness(self,angle):
+        """Rigidez condensada en ejes globales para un panel rotado angle radianes (R·K_c·R' por nudo)."""
+        key = float(rint(angle*1e12))   # Los ángulos que solo difieren por redondeo comparten la matriz
+        K = self._rotated.get(key)
+        if K is None:
+            K = self._rotated[key] = self._rotate(self.K,angle)
+        return K
+
+    def _rotate(self,K,angle):
+        if angle == 0: return K
+        R = _rotation(angle)
+        m = self.nb//2
+        return einsum("ij,ajbk,lk->aibl",R,K.reshape(m,2,m,2),R).reshape(self.nb,self.nb)
+
+    def mass(self,kind,angle):
+        """Masa condensada (reducción de Guyan) en ejes globales."""
+        if kind not in self._mass:
+            sub = self.sub
+            M = assemble(sub.GdL,sub.m[kind],2*len(sub.joints)).toarray()
+            nb = self.nb
+            Mc = M[:nb,:nb] - M[:nb,nb:] @ self.X - self.X.T @ M[nb:,:nb] + self.X.T @ M[nb:,nb:] @ self.X
+            self._mass[kind] = (Mc + Mc.T)/2
+        return self._rotate(self._mass[kind],angle)
+
+class SuperElement():
+    """Instancia de una subestructura en la estructura global (ver TrussStructure.add_superelement).
+
+    Attributes
+    ----------
+    joints : list
+        Nudos globales de los nudos de borde, en el orden de Substructure.boundary.
+    GdL : list
+        Grados de libertad globales de los nudos de borde.
+    loads : dict
+        {caso: ndarray (nudos del panel,2)} cargas en ejes globales sobre los nudos del panel.
+    """
+    def __init__(self,name,sub,origin,angle,joints,GdL):
+        self.name = name
+        self.sub = sub
+        self.panel = sub.condensed()
+        self.origin = asarray(origin,dtype=float)
+        self.angle = float(angle)
+        self.R = _rotation(self.angle)
+        self.joints = list(joints)
+        self.GdL = list(GdL)
+        self.loads = {}
+
+    def position(self,xy):
+        """Coordenadas globales de puntos en ejes del panel."""
+        return self.origin + asarray(xy,dtype=float) @ self.R.T
+
+    @property
+    def stiffness(self):
+        return self.panel.stiffness(self.angle)
+
+    def add_nodal_force(self,joint,force,case="Default"):
+        """Agrega una fuerza (ejes globales) sobre un nudo del panel."""
+        k = self.sub.joints.index(joint)
+        f = self.loads.setdefault(case,zeros((len(self.sub.joints),2)))
+        f[k] += (force.get("x",0.0),force.get("y",0.0))
+
+    def condensed_load(self,case):
+        """Cargas del caso llevadas a los nudos de borde, vector (nb,) en ejes globales."""
+        f = self.loads.get(case)
+        if f is None: return None
+        local = f @ self.R          # R'·f de cada nudo
+        nb = self.panel.nb
+        fb = local[:nb//2].ravel() - self.panel.X.T @ local[nb//2:].ravel()
+        return (fb.reshape(-1,2) @ self.R.T).ravel()
+
+    def recover(self,u_b,case=None):
+        """Desplazamientos de todos los nudos del panel en ejes locales a partir de los de borde (ejes globales).
+
+        Parameters
+        ----------
+        u_b : ndarray (nb,)
+            Desplazamientos globales de los nudos de borde.
+        case : str, optional
+            Caso de carga o combinación con cargas interiores.
+        """
+        ub = (asarray(u_b,dtype=float).reshape(-1,2) @ self.R).ravel()
+        ui = -self.panel.X @ ub
+        f = self._interior_load(case)
+        if f is not None: ui += self.panel.factor.solve(f)
+        return concatenate((ub,ui))
+
+    def element_forces(self,u):
+        """Alargamiento, fuerza axial, esfuerzo y deformación unitaria de los elementos del panel.
+
+        Parameters
+        ----------
+        u : ndarray
+            Desplazamientos de los nudos del panel en ejes locales (ver recover).
+        """
+        sub = self.sub
+        g = u[sub.GdL]
+        elong = sub.cx*(g[:,2] - g[:,0]) + sub.cy*(g[:,3] - g[:,1])
+        N = sub.k_axial*elong
+        stress = N/where(sub.A != 0,sub.A,1.0)
+        strain = where(sub.L != 0,elong/where(sub.L != 0,sub.L,1.0),0.0)
+        return elong,N,stress,strain
+
+    def _interior_load(self,case):
+        """Cargas interiores en ejes locales de un caso o una combinación (factores en combinations)."""
+        if case is None: return None
+        cases = case if isinstance(case,dict) else {case: 1.0}
+        nb = self.panel.nb
+        total = None
+        for name,factor in cases.items():
+            if name not in self.loads: continue
+            f = factor*(self.loads[name] @ self.R)[nb//2:].ravel()
+            total = f if total is None else total + f
+        return total
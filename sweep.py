@@ -0,0 +1,165 @@
+"""Estudios paramétricos: análisis de muchas variantes de un modelo base en un grupo de procesos.
+
+Cada variante es un diccionario con cualquiera de estas claves:
+
+    name          etiqueta de la variante
+    sections      {nombre de sección: Section}, cambia E y A de todos los elementos con esa sección
+    elements      {nombre de elemento: Section}, cambia E y A de elementos puntuales
+    scale         factor (o par (sx, sy)) que multiplica las coordenadas de los nudos, por ejemplo para variar la luz
+    load_factor   factor de todas las cargas, o {caso: factor}
+    allowable     esfuerzo admisible para la utilización, reemplaza al indicado en sweep
+
+Todas las variantes comparten conectividad y apoyos, por lo que cada proceso calcula una sola vez el patrón de
+K_r y su análisis simbólico, y para cada variante solo ensambla valores y hace la factorización numérica.
+"""
+from itertools import product
+from multiprocessing import get_all_start_methods,get_context
+from numpy import array,asarray,flatnonzero,hypot,sqrt,stack,where
+from solvers import PatternAssembler,SymbolicFactorization,assemble
+
+def grid(**axes):
+    """Genera variantes con todas las combinaciones de los valores de cada parámetro.
+
+    Ejemplo: grid(scale=[1.0,1.2],load_factor=[1.0,1.5]) genera 4 variantes.
+    """
+    keys = list(axes)
+    for values in product(*axes.values()):
+        yield dict(zip(keys,values))
+
+class SweepModel():
+    """Datos del modelo base que comparten todas las variantes: geometría, conectividad, apoyos y cargas.
+
+    Parameters
+    ----------
+    base : TrussStructure object
+        Modelo base. No necesita estar analizado.
+    allowable : float, optional
+        Esfuerzo admisible para calcular la utilización.
+    """
+    def __init__(self,base,allowable=None):
+        if any(st.n for st in base._other_stores()):
+            raise ValueError("Los estudios paramétricos solo admiten modelos con elementos barra")
+        st = base.store
+        st.update()
+        rows = flatnonzero(st.active[:st.n])
+        self.names = [st.names[k] for k in rows]
+        self.index = {name: k for k,name in enumerate(self.names)}
+        self.sections = array([st.sections[k] for k in rows],dtype=str)
+        self.xi,self.yi,self.xf,self.yf = st.xi[rows],st.yi[rows],st.xf[rows],st.yf[rows]
+        self.E,self.A = st.E[rows],st.A[rows]
+        self.GdL = st.GdL[rows]
+        self.joint_dofs = array([J.GdL[:2] for J in base.Joints.values()],dtype=int).reshape(-1,2)
+        self.nGdL = base.nGdL
+        self.free,self.fixed = base.partition()
+        self.F,self.U_s = base.load_matrix()
+        self.cases = list(base.cases)
+        self.allowable = allowable
+        self._assembler = None
+        self._symbolic = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_assembler"] = state["_symbolic"] = None     # El análisis simbólico se rehace en cada proceso
+        return state
+
+    def prepare(self):
+        """Calcula el patrón de K_r y su análisis simbólico (una vez por proceso)."""
+        if self._assembler is not None: return
+        k = self._stiffness(self.xi,self.yi,self.xf,self.yf,self.E,self.A)[0]
+        K0 = PatternAssembler(self.GdL,self.free,self.nGdL).matrix(k)
+        self._symbolic = SymbolicFactorization(K0)
+        self._assembler = PatternAssembler(self.GdL,self.free,self.nGdL,self._symbolic.order)
+
+    @staticmethod
+    def _stiffness(xi,yi,xf,yf,E,A):
+        dx,dy = xf - xi,yf - yi
+        L = hypot(dx,dy)
+        L1 = where(L != 0,L,1.0)
+        cx,cy = where(L != 0,dx/L1,0.0),where(L != 0,dy/L1,0.0)
+        k_axial = where(L != 0,E*A/L1,0.0)
+        c = stack((cx,cy,-cx,-cy),axis=1)
+        return k_axial[:,None,None]*c[:,:,None]*c[:,None,:],cx,cy,k_axial
+
+    def run(self,i,variant):
+        """Analiza una variante y devuelve su resumen."""
+        self.prepare()
+        summary = {"index": i,"name": variant.get("name",i)}
+        try:
+            E,A = self.E.copy(),self.A.copy()
+            for name,section in variant.get("sections",{}).items():
+                mask = self.sections == name
+                E[mask],A[mask] = section.E,section.A
+            for name,section in variant.get("elements",{}).items():
+                E[self.index[name]],A[self.index[name]] = section.E,section.A
+            sx = sy = variant.get("scale",1.0)
+            if not isinstance(sx,(int,float)): sx,sy = sx
+            k,cx,cy,k_axial = self._stiffness(sx*self.xi,sy*self.yi,sx*self.xf,sy*self.yf,E,A)
+            factor = variant.get("load_factor",1.0)
+            if isinstance(factor,dict):
+                factor = asarray([factor.get(case,1.0) for case in self.cases])
+            F = self.F*factor
+            U = self.U_s.copy()
+            rhs = F[self.free]
+            if U[self.fixed].any():
+                K = assemble(self.GdL,k,self.nGdL)
+                rhs = rhs - K[self.free][:,self.fixed] @ U[self.fixed]
+            U[self.free] = self._symbolic.factor(self._assembler.matrix(k)).solve(rhs).reshape(len(self.free),-1)
+            u = U[self.GdL]
+            N = k_axial[:,None]*(cx[:,None]*(u[:,2]-u[:,0]) + cy[:,None]*(u[:,3]-u[:,1]))
+            stress = abs(N/A[:,None]).max(axis=1)
+            crit = int(stress.argmax()) if len(stress) else None
+            allowable = variant.get("allowable",self.allowable)
+            d = U[self.joint_dofs]
+            summary.update({
+                "max_displacement": float(sqrt(d[:,0]**2 + d[:,1]**2).max(initial=0.0)),
+                "max_axial": float(abs(N).max(initial=0.0)),
+                "max_stress": float(stress.max(initial=0.0)),
+                "utilization": float(stress.max(initial=0.0)/allowable) if allowable else None,
+                "critical_element": self.names[crit] if crit is not None else None,
+                "error": None})
+        except Exception as e:     # Una variante inestable no detiene el estudio
+            summary["error"] = f"{type(e).__name__}: {e}"
+        return summary
+
+_MODEL = None   # Modelo base de cada proceso del grupo
+
+def _init(model):
+    global _MODEL
+    _MODEL = model
+    _MODEL.prepare()
+
+def _run(task):
+    return _MODEL.run(*task)
+
+def sweep(base,variants,processes=None,allowable=None,chunksize=1):
+    """Analiza variantes de un modelo base en paralelo y entrega cada resumen apenas termina.
+
+    El modelo base se envía una sola vez a cada proceso (con fork se hereda sin serializarlo), no con cada tarea.
+
+    Parameters
+    ----------
+    base : TrussStructure object
+        Modelo base.
+    variants : iterable
+        Variantes (ver el docstring del módulo), por ejemplo las que genera grid.
+    processes : int, optional
+        Número de procesos. Por defecto uno por núcleo; con 1 se analiza en el proceso actual.
+    allowable : float, optional
+        Esfuerzo admisible para la utilización.
+    chunksize : int
+        Variantes por tarea enviada a cada proceso.
+
+    Yields
+    ------
+    dict
+        index, name, max_displacement, max_axial, max_stress, utilization, critical_element y error, en el
+        orden en que terminan.
+    """
+    model = SweepModel(base,allowable)
+    if processes == 1:
+        for i,variant in enumerate(variants):
+            yield model.run(i,variant)
+        return
+    ctx = get_context("fork") if "fork" in get_all_start_methods() else get_context()
+    with ctx.Pool(processes,initializer=_init,initargs=(model,)) as pool:
+        yield from pool.imap_unordered(_run,enumerate(variants),chunksize)
@@ -0,0 +1,4 @@
+import sys
+from os.path import abspath,dirname
+
+sys.path.insert(0,dirname(dirname(abspath(__file__))))     # Los módulos están en la raíz del repositorio
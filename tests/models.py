@@ -0,0 +1,18 @@
+"""Modelos pequeños para las pruebas, construidos elemento por elemento con la API de TrussStructure."""
+from Gadest import TrussStructure,Section
+
+def pratt(n=6,panel=3.0,height=3.0,load=10.0):
+    """Armadura Pratt de n paneles apoyada en sus extremos, con cargas verticales en los nudos del cordón inferior."""
+    T = TrussStructure()
+    S = Section("S1",2.0e8,1.0e-3)
+    for i in range(n + 1):
+        T.add_joint(i*panel,0.0,f"B{i}")
+        T.add_joint(i*panel,height,f"T{i}")
+    bars = [(f"B{i}",f"B{i+1}") for i in range(n)] + [(f"T{i}",f"T{i+1}") for i in range(n)]
+    bars += [(f"B{i}",f"T{i}") for i in range(n + 1)]
+    bars += [(f"T{i}",f"B{i+1}") if i < n/2 else (f"B{i}",f"T{i+1}") for i in range(n)]
+    for k,(Ji,Jf) in enumerate(bars): T.add_element(Ji,Jf,S,f"E{k}")
+    T.add_constraint("B0",{"x":1,"y":1})
+    T.add_constraint(f"B{n}",{"x":0,"y":1})
+    for i in range(1,n): T.add_nodal_force(f"B{i}",{"x":0,"y":-load})
+    return T
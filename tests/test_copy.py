@@ -0,0 +1,17 @@
+from models import pratt
+
+def test_copies_keep_their_own_element_state():
+    base = pratt(6)
+    base.Analyze()
+    joint = list(base.Joints)[-1]
+    A,B = base.copy(),base.copy()
+    A.add_nodal_force(joint,{"y":-10},"Default")
+    B.add_nodal_force(joint,{"x":25},"Default")
+    A.solve_loads()
+    fA = A.store.f_l.copy()
+    B.solve_loads()
+    assert (A.store.f_l == fA).all()
+    assert not (A.store.f_l == B.store.f_l).all()
+    assert A.factor is base.factor and A.store is not base.store
+    assert len(base.load_cases["Default"]) < len(A.load_cases["Default"])
+    assert A.Elements[next(iter(A.Elements))].store is A.store
@@ -0,0 +1,81 @@
+import pytest
+from Gadest import TrussStructure,Section
+
+def cantilever(n=2,L=3.0,P=10.0):
+    """Voladizo de n elementos de pórtico empotrado en J0 con una carga vertical en el extremo."""
+    T = TrussStructure()
+    S = Section("S",2e8,1e-2,1e-4,7.85)
+    for k in range(n + 1): T.add_joint(k*L/n,0.0,f"J{k}")
+    for k in range(n): T.add_element(f"J{k}",f"J{k+1}",S,f"F{k}",kind="frame")
+    T.add_constraint("J0",{"x":1,"y":1,"rz":1})
+    T.add_nodal_force(f"J{n}",{"y":-P})
+    T.Analyze()
+    return T
+
+def test_cantilever_deflection():
+    T = cantilever(8)
+    u = T.displacements()[T.Joints["J8"].GdL[1],0]
+    assert abs(u + 10.0*3.0**3/(3*2e8*1e-4)) < 1e-12
+
+def test_excel_dense_block_has_every_dof():
+    T = cantilever(2)
+    assert T.nGdL == 9
+    sheet = T.to_excel(k_format="dense")["Truss"]
+    n = T.nGdL
+    U = [sheet.cell(row=4 + i,column=11 + n).value for i in range(n + 1)]
+    assert U[:n] == T.U[:,0].tolist() and U[n] is None
+    K = [sheet.cell(row=4 + n - 1,column=10 + j).value for j in range(n)]
+    assert K == T.K.toarray()[n - 1].tolist()
+
+def portal(joint="B",force={"x":5.0,"y":-2.0}):
+    """Pórtico de dos columnas y una viga arriostrado con una diagonal de barra, con una carga en un nudo."""
+    T = TrussStructure()
+    S = Section("S",2e8,1e-2,1e-4,7.85)
+    for name,x,y in (("A",0,0),("B",0,3),("C",4,3),("D",4,0)): T.add_joint(x,y,name)
+    for name,Ji,Jf in (("F1","A","B"),("F2","B","C"),("F3","C","D")): T.add_element(Ji,Jf,S,name,kind="frame")
+    T.add_element("A","C",S,"T1")
+    T.add_constraint("A",{"x":1,"y":1,"rz":1})
+    T.add_constraint("D",{"x":1,"y":1})
+    T.add_nodal_force(joint,force)
+    T.Analyze()
+    return T
+
+def test_results_bundle_keeps_every_element_kind(tmp_path):
+    from results import load_results
+    T = portal()
+    T.save_results(tmp_path/"res")
+    R = load_results(tmp_path/"res")
+    N = T.axial_forces()
+    for name in ("F1","F2","F3","T1"):
+        e = R.element(name)
+        assert e["kind"] == ("truss" if name == "T1" else "frame")
+        assert abs(e["N"] - N[name]) < 1e-9
+        assert e["GdL"] == list(T.Elements[name].GdL)
+    assert R.joint("C")["U"] == T.U[T.Joints["C"].GdL,0].tolist()
+
+def test_find_overlaps_sees_frames():
+    T = portal()
+    T.add_element("B","C",Section("S",2e8,1e-2),"T2")
+    T.add_joint(0.0,1.5,"M")
+    report = T.find_overlaps()
+    assert report["duplicates"] == [["T2","F2"]]
+    assert report["joints_on_elements"] == [("F1","M")]
+
+def test_influence_lines_of_frames_and_bars():
+    T = portal()
+    path = ["B","C"]
+    for method in ("direct","adjoint"):
+        lines = T.influence_lines(path,["T1","F2","F1"],method=method)
+        for k,joint in enumerate(path):
+            N = portal(joint,{"y":-1.0}).axial_forces()
+            for name in ("T1","F2","F1"): assert abs(lines[name][k] - N[name]) < 1e-9
+    assert T.influence_lines(path).elements == ["T1","F1","F2","F3"]
+
+def test_cli_writes_results_and_figure_of_frames(tmp_path):
+    pytest.importorskip("plotly")
+    from cli import run
+    from modelio import save_json
+    save_json(portal(),tmp_path/"portal.json")
+    record, = run([str(tmp_path/"portal.json")],("npy","html"),str(tmp_path/"out"),log=None)
+    assert record["ok"],record["error"]
+    assert len(record["outputs"]) == 2
@@ -0,0 +1,24 @@
+from Gadest import Section
+from models import pratt
+
+def braced(n=8):
+    """Pratt con los dos apoyos fijos: hiperestática, sus líneas de influencia dependen de las secciones."""
+    T = pratt(n)
+    T.add_constraint(f"B{n}",{"x":1,"y":1})
+    return T
+
+def test_influence_lines_follow_section_changes():
+    path = [f"B{i}" for i in range(9)]
+    T = braced()
+    T.Analyze()
+    before = T.influence_lines(path).ordinates
+    T.set_section("E3",Section("S2",2.0e8,0.1))
+    ref = braced()
+    ref.set_section("E3",Section("S2",2.0e8,0.1))
+    ref.Analyze()
+    expected = ref.influence_lines(path).ordinates
+    assert abs(expected - before).max() > 1e-3     # El cambio de sección sí modifica las ordenadas
+    for method in ("direct","adjoint"):
+        assert abs(T.influence_lines(path,method=method).ordinates - expected).max() < 1e-9
+    T.Reanalyze()
+    assert abs(T.influence_lines(path).ordinates - expected).max() < 1e-9
@@ -0,0 +1,17 @@
+from Gadest import Section
+from models import pratt
+
+def test_modal_reuses_the_analyze_factorization():
+    S = Section("S1",2.0e8,1.0e-3,1.0,7.85)
+    T,ref = pratt(8),pratt(8)
+    for name in list(T.Elements):
+        T.set_section(name,S)
+        ref.set_section(name,S)
+    T.Analyze()
+    T.profile()
+    f = T.Modal(4)
+    assert T.profiler.records[-1]["reused"] and T.profiler.records[-1]["kind"] == "eigsh"
+    assert abs(f - ref.Modal(4)).max() < 1e-8*f.max()
+    T.set_section("E3",Section("S2",2.0e8,3.0e-3,1.0,7.85))
+    T.Modal(4)
+    assert not T.profiler.records[-1]["reused"]
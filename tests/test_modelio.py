@@ -0,0 +1,67 @@
+from math import pi
+from Gadest import TrussStructure,Section
+from substructures import Substructure
+from models import pratt
+
+def joint_displacements(T,case="Default"):
+    U = T.displacements(case)[:,0]
+    return {name: U[J.GdL].tolist() for name,J in T.Joints.items()}
+
+def assert_same_results(T,R,cases):
+    assert list(R.load_cases) == list(T.load_cases)
+    for case in cases:
+        UT,UR = joint_displacements(T,case),joint_displacements(R,case)
+        assert UT.keys() == UR.keys()
+        assert max(abs(a - b) for j in UT for a,b in zip(UT[j],UR[j])) < 1e-12
+
+def paneled():
+    """Dos paneles condensados iguales (uno girado) unidos por una barra, con una carga interior."""
+    S = Section("S1",2.0e8,1.0e-3)
+    P = TrussStructure()
+    for name,x,y in (("a",0,0),("b",2,0),("c",2,2),("d",0,2),("e",1,1)): P.add_joint(x,y,name)
+    for k,(i,f) in enumerate((("a","b"),("b","c"),("c","d"),("d","a"),("a","e"),("b","e"),("c","e"),("d","e"))):
+        P.add_element(i,f,S,f"p{k}")
+    panel = Substructure(P,["a","b","c","d"],"panel")
+    T = TrussStructure()
+    T.add_superelement(panel,"P1")
+    T.add_superelement(panel,"P2",origin=(4,0),angle=pi/2)
+    T.add_element("P1.b","P2.a",S,"link")
+    T.add_constraint("P1.a",{"x":1,"y":1})
+    T.add_constraint("P2.b",{"x":0,"y":1})
+    T.add_panel_force("P1","e",{"y":-10})
+    T.add_panel_force("P2","e",{"x":3},"W")
+    T.add_nodal_force("P1.c",{"x":2})
+    T.add_combination("C",{"Default":1.0,"W":1.5})
+    return T
+
+def test_round_trip_keeps_empty_cases(tmp_path):
+    T = pratt(6)
+    T.add_load_case("Empty")
+    T.add_combination("C",{"Default":1.2,"Empty":1.6})
+    T.to_json(tmp_path/"model.json")
+    T.to_csv(tmp_path/"csv")
+    T.Analyze()
+    for R in (TrussStructure.from_json(tmp_path/"model.json"),TrussStructure.from_csv(tmp_path/"csv")):
+        R.Analyze()
+        assert_same_results(T,R,["Default","Empty","C"])
+
+def test_round_trip_keeps_superelements(tmp_path):
+    T = paneled()
+    T.to_json(tmp_path/"model.json")
+    T.to_csv(tmp_path/"csv")
+    T.Analyze()
+    for R in (TrussStructure.from_json(tmp_path/"model.json"),TrussStructure.from_csv(tmp_path/"csv")):
+        assert list(R.superelements) == ["P1","P2"]
+        R.Analyze()
+        assert_same_results(T,R,["Default","W","C"])
+        for name in ("P1","P2"):
+            NT,NR = T.superelement_results(name,"C")[0],R.superelement_results(name,"C")[0]
+            assert max(abs(NT.as_dict()[e] - NR.as_dict()[e]) for e in NT) < 1e-9
+
+def test_merge_joints_reconnects_superelements():
+    T = paneled()
+    T.add_joint(4.0,1e-9,"dup")     # Coincide con P2.a
+    T.add_superelement(T.superelements["P1"].sub,"P3",origin=(2,-2),joints={"c":"dup"})
+    M,report = T.merge_joints(1e-6)
+    assert report["joints"] == {"dup": "P2.a"}
+    assert M.superelements["P3"].joints == ["P3.a","P3.b","P2.a","P1.b"]
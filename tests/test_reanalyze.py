@@ -0,0 +1,18 @@
+from Gadest import Section
+from models import pratt
+
+def test_reanalyze_recovers_only_the_changed_elements():
+    T = pratt(8)
+    T.Analyze()
+    idle = "E0"     # Cordón inferior junto al apoyo fijo: no trabaja, su fuerza es solo redondeo
+    assert abs(T.axial_forces()[idle]) < 1e-9
+    recovered = []
+    axial = T.store.axial
+    T.store.axial = lambda U,rows=None: (recovered.append(len(rows)),axial(U,rows))[1]
+    T.set_section(idle,Section("S2",2.0e8,3.0e-3))
+    assert T.Reanalyze() == "woodbury"
+    assert recovered == [1]
+    ref = pratt(8)
+    ref.set_section(idle,Section("S2",2.0e8,3.0e-3))
+    ref.Analyze()
+    assert abs(T.U - ref.U).max() <= 1e-12*abs(ref.U).max()
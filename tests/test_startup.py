@@ -0,0 +1,6 @@
+from benchmark import startup
+
+def test_import_does_not_load_scipy_nor_exceed_its_former_dependencies():
+    start = startup(repeat=5)
+    assert start["heavy_modules"] == []
+    assert start["import_time"] < start["reference_time"]